@@ -0,0 +1,197 @@
+"""
+Time and memory benchmarks of the preprocessing stages on synthetic data.
+
+    python3 benchmarks/run_benchmarks.py --size small [--stages load_csv,fill_mean] [--save-baseline]
+
+Every stage runs on a fresh copy of the generated frame: the wall time is the best of --repeat runs and the
+peak memory is measured in one more run under tracemalloc (Python and NumPy allocations; Arrow buffers are not
+traced, so Parquet stages report little). Results are compared with benchmarks/baselines.json
+and the script exits with status 1 if a stage got slower or bigger than --tolerance times its baseline.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+warnings.filterwarnings("ignore")
+
+from termcolor import cprint
+import pandas as pd
+from synthetic import SIZES, make_frame
+from data_loader import load_data, save_dataframe
+from missing_data import IMPUTATION_METHODS, fill_missing, regression_imputation
+from utils import remove_duplicates
+from categorical_data import encode_column
+from encoders import ENCODERS
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_MEGABYTES = 1.0
+# Models are trained on a sample so the large sizes stay tractable
+TRAIN_ROWS = 100_000
+
+
+def _fill(method):
+    return lambda df, files: fill_missing(df, method, value=0)
+
+
+def _encode(method):
+    params = {"target": "label"} if method == "target" else {}
+    return lambda df, files: encode_column(df, "cat_0", method, **params)
+
+
+def _train(model_name):
+    def stage(df, files):
+        from model_menu import train_model
+        sample = df.dropna().iloc[:TRAIN_ROWS]
+        features = [col for col in sample.columns if col.startswith("num_")]
+        return train_model(sample, model_name, "label", features, cv=3)
+    return stage
+
+
+def _remove_duplicates(df, files):
+    with mock.patch("builtins.input", return_value="y"):
+        remove_duplicates(df)
+
+
+STAGES = {
+    "load_csv": lambda df, files: load_data(files["csv"]),
+    "load_parquet": lambda df, files: load_data(files["parquet"]),
+    **{f"fill_{method}": _fill(method) for method in IMPUTATION_METHODS},
+    "regression_imputation": lambda df, files: regression_imputation(df, "num_1"),
+    "remove_duplicates": _remove_duplicates,
+    **{f"encode_{method}": _encode(method) for method in ENCODERS},
+    "train_decision_tree": _train("decision_tree"),
+    "train_random_forest": _train("random_forest"),
+    "train_linear_regression": _train("linear_regression"),
+    "save_csv": lambda df, files: save_dataframe(df, os.path.join(files["dir"], "saved.csv")),
+    "save_parquet": lambda df, files: save_dataframe(df, os.path.join(files["dir"], "saved.parquet"))
+}
+
+
+def measure(stage, df, files, repeat=3, memory=True):
+    """Best wall time of repeat runs of a stage, and its peak traced memory in MB (None if not measured)."""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            frame = df.copy()
+            start = time.perf_counter()
+            stage(frame, files)
+            times.append(time.perf_counter() - start)
+        peak = None
+        if memory:
+            frame = df.copy()
+            tracemalloc.start()
+            try:
+                stage(frame, files)
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+            finally:
+                tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak}
+
+
+def run_benchmarks(rows, stages=None, repeat=3, memory=True, **frame_options):
+    """Generate a frame of the given number of rows and measure the stages on it. Returns {stage: result}."""
+    stages = stages or list(STAGES)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark stages: {', '.join(unknown)}")
+    df = make_frame(rows, **frame_options)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        files = {"dir": directory, "csv": os.path.join(directory, "data.csv"),
+                 "parquet": os.path.join(directory, "data.parquet")}
+        df.to_csv(files["csv"], index=False)
+        df.to_parquet(files["parquet"], index=False)
+        for stage in stages:
+            cprint(f"[*] {stage}...", "blue")
+            results[stage] = measure(STAGES[stage], df, files, repeat, memory)
+    return results
+
+
+def compare(results, baseline, tolerance=1.5):
+    """List the stages slower or bigger than tolerance times their baseline as (stage, metric, value, baseline)."""
+    limits = {"seconds": MIN_SECONDS, "peak_mb": MIN_MEGABYTES}
+    regressions = []
+    for stage, result in results.items():
+        for metric, minimum in limits.items():
+            value, reference = result.get(metric), baseline.get(stage, {}).get(metric)
+            if value is None or reference is None:
+                continue
+            if value > tolerance * reference and value - reference > minimum:
+                regressions.append((stage, metric, value, reference))
+    return regressions
+
+
+def print_results(results, baseline):
+    """Print the results next to their baseline values."""
+    table = pd.DataFrame.from_dict(results, orient="index")
+    if baseline:
+        reference = pd.DataFrame.from_dict(baseline, orient="index").reindex(table.index)
+        table["baseline_s"] = reference.get("seconds")
+        table["baseline_mb"] = reference.get("peak_mb")
+    cprint(table.to_string(float_format=lambda value: f"{value:.3f}"), "green")
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing stages on synthetic data.")
+    parser.add_argument("--size", choices=list(SIZES), default="small", help="number of rows: " +
+                        ", ".join(f"{name}={rows}" for name, rows in SIZES.items()))
+    parser.add_argument("--rows", type=int, default=None, help="number of rows (overrides --size)")
+    parser.add_argument("--numeric", type=int, default=6, help="number of numeric columns")
+    parser.add_argument("--categorical", type=int, default=3, help="number of text columns")
+    parser.add_argument("--null-ratio", type=float, default=0.05, help="share of missing feature values")
+    parser.add_argument("--cardinality", type=int, default=50, help="distinct values per text column")
+    parser.add_argument("--stages", type=lambda value: [stage.strip() for stage in value.split(",")], default=None,
+                        help=f"comma separated stages (default: all of {', '.join(STAGES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (the best one is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run of every stage")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed ratio to the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rows = args.rows or SIZES[args.size]
+    key = args.size if args.rows is None else str(args.rows)
+    key += f"-{args.numeric}x{args.categorical}-{args.null_ratio}-{args.cardinality}"
+    results = run_benchmarks(rows, args.stages, args.repeat, not args.no_memory, numeric=args.numeric,
+                             categorical=args.categorical, null_ratio=args.null_ratio, cardinality=args.cardinality)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    print_results(results, baselines.get(key))
+    if args.save_baseline:
+        baselines[key] = {**baselines.get(key, {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        cprint(f"[+] Baseline '{key}' saved to {args.baseline}", "green")
+        return 0
+    if key not in baselines:
+        cprint(f"[!] No baseline '{key}' in {args.baseline}; run with --save-baseline to store one.", "yellow")
+        return 0
+    regressions = compare(results, baselines[key], args.tolerance)
+    for stage, metric, value, reference in regressions:
+        cprint(f"[-] {stage}: {metric} {value:.3f} vs baseline {reference:.3f}", "red")
+    if not regressions:
+        cprint("[+] No regressions against the baseline.", "green")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
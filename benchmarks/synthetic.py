@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+SIZES = {
+    "small": 10_000,
+    "medium": 1_000_000,
+    "large": 10_000_000
+}
+
+
+def make_frame(rows, numeric=6, categorical=3, null_ratio=0.05, cardinality=50, duplicate_ratio=0.01, seed=0):
+    """
+        Synthetic frame for the benchmarks: correlated numeric columns (num_0 drives the others), text
+        columns with the given number of distinct values (Zipf distributed), an integer class label and a
+        share of exact duplicate rows. null_ratio of the feature values are missing; the label never is.
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=rows)
+    data = {}
+    for i in range(numeric):
+        data[f"num_{i}"] = base * rng.uniform(-2, 2) + rng.normal(scale=1 + i, size=rows) + 10 * i
+    values = np.array([f"value_{k}" for k in range(cardinality)], dtype=object)
+    for i in range(categorical):
+        data[f"cat_{i}"] = values[(rng.zipf(1.5, rows) - 1) % cardinality]
+    for values in data.values():
+        values[rng.random(rows) < null_ratio] = np.nan
+    data["label"] = (base + rng.normal(scale=0.5, size=rows) > 0).astype(np.int64)
+
+    duplicates = min(int(rows * duplicate_ratio), rows - 1)
+    if duplicates:
+        targets = rng.choice(np.arange(1, rows), duplicates, replace=False)
+        sources = rng.integers(0, targets)
+        for values in data.values():
+            values[targets] = values[sources]
+    return pd.DataFrame(data)
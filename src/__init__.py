@@ -1,12 +1,27 @@
 from .data_loader import load_data, save_dataframe
-from .missing_data import handle_missing_data
+from .missing_data import handle_missing_data, Imputer
 from .categorical_data import handle_non_ordinal_column
-from .model_menu import model_menu
-from .plot_menu import plot_menu
 from .column_operations import index_column, remove_column
 from .utils import inspect_data, remove_duplicates
+from .dtype_optimizer import optimize_dtypes
+from .pipeline import run_pipeline
+from .fitted_pipeline import FittedPipeline
+from .correlation import CorrelationCache
+from .snapshots import SnapshotCache
+from .casting import cast_columns
 from .menu import menu
 from .main import main
 
 
-__version__ = "1.0"
\ No newline at end of file
+__version__ = "1.0"
+
+
+def __getattr__(name):
+    # model_menu and plot_menu pull in scikit-learn, matplotlib and seaborn, so they are imported on first use
+    if name == "model_menu":
+        from .model_menu import model_menu
+        return model_menu
+    if name == "plot_menu":
+        from .plot_menu import plot_menu
+        return plot_menu
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
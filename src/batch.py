@@ -0,0 +1,156 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from termcolor import cprint
+from data_loader import read_data, read_columns, write_data
+from missing_data import ApproximateImputer, Imputer, fill_missing
+from dtype_optimizer import optimize_dtypes
+from dedupe import drop_duplicate_rows
+
+
+def output_path(filename, output_dir):
+    """Return the path of the processed file for an input file."""
+    stem, extension = os.path.splitext(os.path.basename(filename))
+    return os.path.join(output_dir, f"{stem}_processed{extension or '.csv'}")
+
+
+def output_paths(files, output_dir):
+    """
+        Return the path of the processed file of every input file. Files with the same name in different
+        directories (like shards/*/part.csv) are named after their path relative to their common directory.
+        Raises ValueError if two inputs would still be written to the same output (the same file given twice).
+    """
+    paths = [output_path(file, output_dir) for file in files]
+    for path in set(paths):
+        clashing = [i for i, other in enumerate(paths) if other == path]
+        if len(clashing) < 2:
+            continue
+        names = [os.path.abspath(files[i]) for i in clashing]
+        root = os.path.commonpath([os.path.dirname(name) for name in names])
+        for i, name in zip(clashing, names):
+            relative = os.path.relpath(name, root).replace(os.sep, "_")
+            paths[i] = output_path(relative, output_dir)
+    if len(set(paths)) < len(paths):
+        duplicates = sorted({file for file, path in zip(files, paths) if paths.count(path) > 1})
+        raise ValueError(f"These input files would be written to the same output: {', '.join(duplicates)}")
+    return paths
+
+
+def process_file(filename, output_dir, method="mean", value=None, dedupe=True, optimize=False, read_options=None,
+                 imputer=None, subset=None, pipeline=None, output=None):
+    """
+        Run the non-interactive part of the pipeline (load, impute, dedupe, save) on one file.
+        With a fitted imputer its saved fill values are applied instead of recomputing statistics.
+        With a FittedPipeline its recorded operations replace imputation and deduplication, and the
+        columns it drops before using them are not loaded.
+        The result is written to output (by default a file named after the input in output_dir).
+        Never raises: failures are reported in the returned result so one bad file cannot stop a batch.
+    """
+    start = time.perf_counter()
+    result = {"file": filename, "status": "ok", "rows": 0, "missing": 0, "duplicates": 0,
+              "skipped_columns": [], "output": None, "error": None}
+    try:
+        read_options = dict(read_options or {})
+        excluded = pipeline.excluded_columns() if pipeline is not None else None
+        if excluded:
+            read_options["columns"] = [col for col in read_options.get("columns") or read_columns(filename)
+                                       if col not in excluded]
+        df = read_data(filename, **read_options)
+        if optimize:
+            optimize_dtypes(df, report=False)
+        result["missing"] = int(df.isnull().sum().sum())
+        if pipeline is not None:
+            removed = {}
+            pipeline.transform(df, source=filename, removed=removed)
+            result["duplicates"] = removed.get("dedupe", 0)
+        elif result["missing"] and imputer is not None:
+            imputer.transform(df)
+        elif result["missing"]:
+            result["skipped_columns"] = fill_missing(df, method, value)
+        if dedupe and pipeline is None:
+            result["duplicates"] = drop_duplicate_rows(df, subset)
+        result["rows"] = len(df)
+        result["output"] = output or output_path(filename, output_dir)
+        write_data(df, result["output"])
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def sketch_file(filename, method="median", value=None, read_options=None, chunksize=100_000, epsilon=0.001):
+    """Fit the sketches of an ApproximateImputer on one file, chunk by chunk (runs in a worker process)."""
+    imputer = ApproximateImputer(method, fill_value=value, epsilon=epsilon)
+    for chunk in read_data(filename, chunksize=chunksize, **(read_options or {})):
+        imputer.partial_fit(chunk)
+    return imputer
+
+
+def fit_approximate_imputer(files, method="median", value=None, read_options=None, chunksize=100_000, workers=None,
+                            epsilon=0.001):
+    """Sketch every file in parallel and merge the sketches into one ApproximateImputer for all the files."""
+    imputer = ApproximateImputer(method, fill_value=value, epsilon=epsilon)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(sketch_file, file, method, value, read_options, chunksize, epsilon) for file in files]
+        for future in as_completed(futures):
+            imputer.merge(future.result())
+    return imputer.finalize()
+
+
+def prepare_imputer(filename, files, method="mean", value=None, read_options=None, approximate=False, workers=None,
+                    epsilon=0.001):
+    """
+        Load the imputer saved at filename, or fit one on the first input file (on all of its
+        columns, so later files can be filled even where the first one had no gaps) and save it there.
+        With approximate, the fill values are estimated from sketches of all the files, fitted in
+        parallel and merged (filename may then be None to skip saving).
+    """
+    if filename is not None and os.path.exists(filename):
+        cprint(f"[*] Using the fill values saved in '{filename}'.", "blue")
+        return Imputer.load(filename)
+    if approximate:
+        imputer = fit_approximate_imputer(files, method, value, read_options, workers=workers, epsilon=epsilon)
+        source = f"{len(files)} files (approximate)"
+    else:
+        imputer = Imputer(method, fill_value=value)
+        imputer.fit(read_data(files[0], **(read_options or {})), missing_only=False)
+        source = f"'{files[0]}'"
+    if filename is not None:
+        imputer.save(filename)
+        cprint(f"[+] Fill values fitted on {source} and saved to '{filename}'.", "green")
+    return imputer
+
+
+def run_batch(files, output_dir="processed", workers=None, **options):
+    """
+        Process many files in parallel on a process pool and return the per-file results in input order.
+        Raises ValueError before processing anything if two files would be written to the same output.
+    """
+    outputs = output_paths(files, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count()
+    cprint(f"[*] Processing {len(files)} files with {workers} workers...", "blue")
+    results = [None] * len(files)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_file, file, output_dir, output=outputs[i], **options): i for i, file in enumerate(files)}
+        for future in as_completed(futures):
+            file = files[futures[future]]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"file": file, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+            results[futures[future]] = result
+            if result["status"] == "ok":
+                cprint(f"[+] {file}: {result['rows']} rows, {result['missing']} missing values, "
+                       f"{result['duplicates']} duplicates removed ({result['seconds']:.2f}s)", "green")
+                for col in result["skipped_columns"]:
+                    cprint(f"[!] {file}: non-numeric column '{col}' was not imputed.", "yellow")
+            else:
+                cprint(f"[-] {file}: {result['error']}", "red")
+
+    failed = sum(result["status"] != "ok" for result in results)
+    cprint(f"[*] Batch complete in {time.perf_counter() - start:.2f}s: {len(files) - failed} succeeded, "
+           f"{failed} failed.", "green" if failed == 0 else "yellow")
+    return results
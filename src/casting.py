@@ -0,0 +1,160 @@
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+from utils import is_text_column
+
+CAST_TYPES = ("numeric", "integer", "float", "datetime", "bool", "category", "string")
+TRUE_VALUES = ("true", "t", "yes", "y", "1")
+FALSE_VALUES = ("false", "f", "no", "n", "0")
+INTEGER_PATTERN = r"^[+-]?\d{1,18}$"
+FLOAT_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$|^[+-]?inf(inity)?$"
+# Datetime directives Arrow's strptime does not parse; formats using them are parsed by pandas
+PANDAS_DATETIME_DIRECTIVES = ("%f", "%z", "%Z")
+
+
+def parse_cast(value):
+    """Parse a cast like 'age:integer' or 'when:datetime:%Y-%m-%d' into a (column, type, format) tuple."""
+    parts = value.split(":", 2)
+    if len(parts) < 2 or parts[1].strip() not in CAST_TYPES:
+        raise ValueError(f"Invalid cast '{value}', expected <column>:<{'|'.join(CAST_TYPES)}>[:<format>]")
+    return parts[0].strip(), parts[1].strip(), parts[2] if len(parts) == 3 else None
+
+
+def _strings(series):
+    """The values of a column as an Arrow string array without surrounding whitespace (Arrow strings are not copied)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    if not isinstance(series.array, pd.arrays.ArrowStringArray):
+        series = series.astype("str")
+    if isinstance(series.array, pd.arrays.ArrowStringArray):
+        values = series.array.__arrow_array__()
+    else:
+        values = pa.array(series.to_numpy(dtype=object, na_value=None), type=pa.large_string())
+    return pc.utf8_trim_whitespace(values)
+
+
+def _parse_numbers(strings, kind):
+    """Parse numbers with Arrow: strings that do not match the number pattern become missing instead of raising."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    integers = pc.match_substring_regex(strings, INTEGER_PATTERN)
+    floats = pc.cast(pc.if_else(pc.match_substring_regex(strings, FLOAT_PATTERN, ignore_case=True), strings, None),
+                     pa.float64())
+    if kind == "float" or (kind == "numeric" and not pc.all(pc.or_(integers, pc.is_null(floats))).as_py()):
+        return floats.to_numpy(zero_copy_only=False)
+    # Integers are cast from their text to stay exact beyond 2**53; other integral numbers (like '3.0') are accepted
+    whole = pc.and_(pc.equal(floats, pc.round(floats)), pc.less(pc.abs(floats), 2.0 ** 53))
+    values = pc.if_else(integers, pc.cast(pc.if_else(integers, strings, None), pa.int64()),
+                        pc.cast(pc.if_else(whole, floats, None), pa.int64()))
+    if values.null_count == 0:
+        return values.to_numpy()
+    return pd.Int64Dtype().__from_arrow__(values)
+
+
+def _parse_datetimes(strings, series, fmt=None):
+    """Parse dates with Arrow's strptime (the format is guessed from the first value if not given)."""
+    import pyarrow.compute as pc
+    if fmt is None:
+        first = series.dropna().head(1)
+        fmt = pd.tseries.api.guess_datetime_format(str(first.iloc[0])) if len(first) else None
+    if fmt is None or any(directive in fmt for directive in PANDAS_DATETIME_DIRECTIVES):
+        return pd.to_datetime(series, format=fmt, errors="coerce").to_numpy()
+    return pc.strptime(strings, format=fmt, unit="us", error_is_null=True).to_numpy(zero_copy_only=False)
+
+
+def _parse_booleans(strings):
+    """Map true/false words (and 1/0) to booleans, any other value becomes missing."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    lowered = pc.utf8_lower(strings)
+    values = pc.if_else(pc.is_in(lowered, value_set=pa.array(TRUE_VALUES)), True,
+                        pc.if_else(pc.is_in(lowered, value_set=pa.array(FALSE_VALUES)), False, None))
+    if values.null_count == 0:
+        return values.to_numpy(zero_copy_only=False)
+    return pd.BooleanDtype().__from_arrow__(values)
+
+
+def cast_series(series, kind, fmt=None):
+    """
+        Convert a column to numeric, integer, float, datetime, bool, category or string. Text is parsed
+        with vectorized Arrow kernels and values that do not parse become missing instead of raising.
+        Returns the converted column and the number of values that failed to parse.
+    """
+    if kind not in CAST_TYPES:
+        raise ValueError(f"Unknown type '{kind}', expected one of {', '.join(CAST_TYPES)}")
+    if kind == "category":
+        return series.astype("category"), 0
+    if kind == "string":
+        return series.astype("str"), 0
+    is_number = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    if kind == "float" and is_number:
+        return series.astype(np.float64), 0
+    if (kind == "numeric" and is_number) or (kind == "integer" and pd.api.types.is_integer_dtype(series)) \
+            or (kind == "datetime" and pd.api.types.is_datetime64_any_dtype(series)) \
+            or (kind == "bool" and pd.api.types.is_bool_dtype(series)):
+        return series, 0
+    if kind == "bool" and is_number:
+        # Numbers are compared with 0 instead of parsed from their text, where 1.0 would match no true value
+        missing = series.isnull().to_numpy()
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan) != 0
+        if missing.any():
+            values = pd.arrays.BooleanArray(values, missing)
+        return pd.Series(values, index=series.index, name=series.name, copy=False), 0
+
+    strings = _strings(series)
+    if kind == "datetime":
+        values = _parse_datetimes(strings, series, fmt)
+    elif kind == "bool":
+        values = _parse_booleans(strings)
+    else:
+        values = _parse_numbers(strings, kind)
+    converted = pd.Series(values, index=series.index, name=series.name, copy=False)
+    return converted, int(converted.isnull().sum() - strings.null_count)
+
+
+def _cast_options(cast):
+    return (cast, None) if isinstance(cast, str) else tuple(cast)
+
+
+def cast_columns(df, casts, report=True):
+    """
+        Cast the columns of df in place. casts maps a column to its type, or to a (type, format) pair for
+        datetimes; columns that are not in df are skipped. Returns the number of failed values per column.
+    """
+    failures = {}
+    for col, cast in casts.items():
+        if col not in df.columns:
+            continue
+        kind, fmt = _cast_options(cast)
+        df[col], failures[col] = cast_series(df[col], kind, fmt)
+    if report:
+        report_casts(casts, failures)
+    return failures
+
+
+def report_casts(casts, failures):
+    """Print the type every column was cast to and the number of values that failed to parse."""
+    for col, failed in failures.items():
+        kind = _cast_options(casts[col])[0]
+        if failed:
+            cprint(f"[!] '{col}': {failed} values could not be parsed as {kind} and are now missing.", "yellow")
+        else:
+            cprint(f"[+] '{col}' cast to {kind}.", "green")
+
+
+class Caster:
+    """Casts applied to every chunk of a streamed file, with the parse failures counted over all the chunks."""
+
+    def __init__(self, casts):
+        self.casts = casts
+        self.failures = {}
+
+    def transform(self, chunk):
+        """Cast the columns of a chunk in place and return it."""
+        for col, failed in cast_columns(chunk, self.casts, report=False).items():
+            self.failures[col] = self.failures.get(col, 0) + failed
+        return chunk
+
+    def report(self):
+        """Print the failures counted so far."""
+        report_casts(self.casts, self.failures)
@@ -1,10 +1,15 @@
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import OrdinalEncoder
 from termcolor import cprint
+from utils import is_text_column
+from encoders import ENCODERS
+from inplace import CopyLog, drop_columns
 
-def handle_non_ordinal_column(df, col):
-    """Handle non-numeric columns when numeric imputation is attempted."""
+def handle_non_ordinal_column(df, col, pipeline=None):
+    """
+        Handle non-numeric columns when numeric imputation is attempted. Returns the fitted encoder, if any.
+        The operation is recorded in the FittedPipeline, if given.
+    """
     cprint(f"[!] Cannot perform requested operation on non-numeric column '{col}'.", "red")
     cprint("[?] How do you want to resolve the imputation into object-type column?", "yellow")
 
@@ -12,7 +17,10 @@ def handle_non_ordinal_column(df, col):
         "Change imputation method",
         "Ordinal encode the column",
         "Remove records with missing values and skip the column",
-        "Drop the column"
+        "Drop the column",
+        "One-hot encode the column",
+        "Hashing encode the column (high cardinality)",
+        "Target encode the column (high cardinality)"
     ]
     
     for i, choice in enumerate(choices, 1):
@@ -24,6 +32,7 @@ def handle_non_ordinal_column(df, col):
             if choice == 1:
                 return
             elif choice == 2:
+                method, params = "ordinal", {}
                 if df[col].nunique() > 2:
                     cprint(f"[!] Column '{col}' has more than 2 unique values, please order them.", "yellow")
                     values = df[col].dropna().unique()
@@ -41,31 +50,91 @@ def handle_non_ordinal_column(df, col):
                         except IndexError:
                             cprint("[-] Invalid choice. Please try again!", "red")
                             continue
-
-                    df[col].replace(order, inplace=True)
-                    cprint(f"[+] Column '{col}' has been ordinal encoded.", "green")
-                else:
-                    ordinal_encoder = OrdinalEncoder()
-                    df[col] = ordinal_encoder.fit_transform(df[[col]]).astype(int)
-                    cprint(f"[+] Column '{col}' has been ordinal encoded.", "green")
-                return
+                    params = {"order": sorted(order, key=order.get)}
             elif choice == 3:
                 df.dropna(subset=[col], inplace=True)
                 cprint(f"[+] Records with missing values in column '{col}' have been removed.", "green")
+                if pipeline is not None:
+                    pipeline.record("dropna", subset=[col])
                 return
             elif choice == 4:
-                df.drop(columns=[col], inplace=True)
+                drop_columns(df, [col])
                 cprint(f"[+] Column '{col}' has been dropped.", "green")
+                if pipeline is not None:
+                    pipeline.record("drop", columns=[col])
                 return
+            elif choice == 5:
+                method, params = "onehot", {}
+            elif choice == 6:
+                method, params = "hashing", {}
+            elif choice == 7:
+                target = choose_target(df, col)
+                if target is None:
+                    continue
+                method, params = "target", {"target": target}
             else:
                 cprint("[-] Invalid choice. Please try again!", "red")
+                continue
+        except ValueError:
+            cprint("[-] Invalid input. Please enter a number.", "red")
+            continue
+
+        log = CopyLog()
+        with log.track(df, f"Encoding of '{col}'"):
+            encoder = encode_column(df, col, method, **params)
+        if method == "ordinal":
+            cprint(f"[+] Column '{col}' has been ordinal encoded.", "green")
+        elif method == "onehot":
+            cprint(f"[+] Column '{col}' has been one-hot encoded into {len(encoder.categories_)} columns.", "green")
+        elif method == "hashing":
+            cprint(f"[+] Column '{col}' has been hashed into {encoder.n_components} columns.", "green")
+        else:
+            cprint(f"[+] Column '{col}' has been target encoded with '{params['target']}'.", "green")
+        log.report(df)
+        if pipeline is not None:
+            pipeline.record("encode", encoder=encoder)
+        return encoder
+
+def ordinal_encode(df, col, order=None):
+    """
+        Ordinal encode a column without prompting and return the fitted encoder. order is a list of
+        the values from smallest to largest (or a value -> code mapping); without it the values are
+        encoded in sorted order.
+    """
+    if isinstance(order, dict):
+        order = sorted(order, key=order.get)
+    return encode_column(df, col, "ordinal", order=order)
+
+def encode_column(df, col, method="ordinal", **params):
+    """Fit one of the ENCODERS on a column, encode the column in place and return the fitted encoder."""
+    if method not in ENCODERS:
+        raise ValueError(f"Unknown encoding '{method}', expected one of {', '.join(ENCODERS)}")
+    encoder = ENCODERS[method](col, **params).fit(df)
+    encoder.transform(df)
+    return encoder
+
+def choose_target(df, col):
+    """Prompt the user to select the numeric target column for target encoding."""
+    columns = [c for c in df.columns if c != col and not is_text_column(df[c])]
+    if not columns:
+        cprint("[-] There is no numeric column to use as target.", "red")
+        return None
+    cprint("[?] Select the target column:", "yellow")
+    for i, c in enumerate(columns, 1):
+        cprint(f"[{i}] {c}", "yellow")
+    while True:
+        try:
+            choice = int(input("Select column number: "))
+            if 1 <= choice <= len(columns):
+                return columns[choice - 1]
+            cprint("[-] Invalid choice. Please try again!", "red")
         except ValueError:
             cprint("[-] Invalid input. Please enter a number.", "red")
-            
+
 def choose_column(df):
     """Display a menu to the user to select a column for categorical data handling."""
     columns = df.columns
-    columns = [col for col in columns if df[col].dtype == 'object']
+    columns = [col for col in columns if is_text_column(df[col])]
     for i, col in enumerate(columns, 1):
         cprint(f"[{i}] {col}", "yellow")
     
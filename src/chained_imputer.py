@@ -0,0 +1,141 @@
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+from inplace import set_values
+
+
+class ChainedImputer:
+    """
+        Regression imputation of several incomplete numeric columns in one chained-equations loop.
+        Every column is regressed on its n_predictors most correlated numeric columns, fitted on at most
+        max_fit_rows observed rows by accumulating the normal equations over chunks of chunk_size rows,
+        and the predictions are fed to the next column, for up to max_iter rounds.
+    """
+
+    def __init__(self, columns=None, max_iter=5, n_predictors=10, max_fit_rows=200_000, chunk_size=100_000,
+                 tol=1e-3, random_state=0):
+        self.columns = columns
+        self.max_iter = max_iter
+        self.n_predictors = n_predictors
+        self.max_fit_rows = max_fit_rows
+        self.chunk_size = chunk_size
+        self.tol = tol
+        self.random_state = random_state
+        self.means_ = {}
+        self.order_ = []
+        self.models_ = {}
+
+    def _numeric_columns(self, df):
+        return [col for col in df.columns
+                if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+
+    def _select_predictors(self, df, numeric, rng, correlation=None):
+        """
+            Pick the most correlated predictors of every target, from the given correlation matrix if it covers
+            the numeric columns, otherwise on a sample of rows.
+        """
+        if correlation is not None and set(numeric) <= set(correlation.columns):
+            correlation = correlation.loc[numeric, numeric].abs().fillna(0)
+        else:
+            sample = df[numeric]
+            if self.max_fit_rows is not None and len(sample) > self.max_fit_rows:
+                sample = sample.iloc[np.sort(rng.choice(len(sample), self.max_fit_rows, replace=False))]
+            correlation = sample.corr().abs().fillna(0)
+        predictors = {}
+        for col in self.order_:
+            ranked = correlation[col].drop(col).sort_values(ascending=False)
+            predictors[col] = list(ranked.index[:self.n_predictors])
+        return predictors
+
+    def _design(self, arrays, predictors, rows):
+        """Build the design matrix of the given rows, filling gaps in predictors with their means."""
+        design = np.empty((len(rows), len(predictors) + 1))
+        design[:, 0] = 1.0
+        for j, col in enumerate(predictors, 1):
+            values = arrays[col][rows]
+            design[:, j] = np.where(np.isnan(values), self.means_[col], values)
+        return design
+
+    def _fit_column(self, arrays, col, predictors, fit_rows):
+        """Solve the normal equations of one target, accumulated chunk by chunk."""
+        size = len(predictors) + 1
+        xtx = np.zeros((size, size))
+        xty = np.zeros(size)
+        for start in range(0, len(fit_rows), self.chunk_size):
+            rows = fit_rows[start:start + self.chunk_size]
+            design = self._design(arrays, predictors, rows)
+            xtx += design.T @ design
+            xty += design.T @ arrays[col][rows]
+        ridge = 1e-9 * max(np.trace(xtx), 1.0) * np.eye(size)
+        try:
+            return np.linalg.solve(xtx + ridge, xty)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(xtx, xty, rcond=None)[0]
+
+    def _predict_column(self, arrays, col, predictors, coef, missing_rows):
+        predictions = np.empty(len(missing_rows))
+        for start in range(0, len(missing_rows), self.chunk_size):
+            rows = missing_rows[start:start + self.chunk_size]
+            predictions[start:start + len(rows)] = self._design(arrays, predictors, rows) @ coef
+        return predictions
+
+    def _arrays(self, df, numeric, missing):
+        """Float views of the numeric columns, with writable copies of the targets filled with their means."""
+        arrays = {col: df[col].to_numpy(dtype=float, na_value=np.nan) for col in numeric}
+        for col, rows in missing.items():
+            arrays[col] = arrays[col].copy()
+            arrays[col][rows] = self.means_[col]
+        return arrays
+
+    def fit_transform(self, df, correlation=None):
+        """
+            Impute the target columns of df in place and keep the fitted models for transform.
+            A precomputed correlation matrix of df (e.g. from a CorrelationCache) spares the predictor selection.
+        """
+        rng = np.random.default_rng(self.random_state)
+        numeric = self._numeric_columns(df)
+        null_counts = df[numeric].isnull().sum()
+        targets = self.columns if self.columns is not None else list(null_counts.index[null_counts > 0])
+        targets = [col for col in targets if col in numeric and null_counts[col] > 0]
+        if not targets:
+            return df
+        self.order_ = sorted(targets, key=lambda col: null_counts[col])
+        self.means_ = df[numeric].mean().fillna(0).to_dict()
+
+        missing = {col: np.flatnonzero(df[col].isnull().to_numpy()) for col in self.order_}
+        predictors = self._select_predictors(df, numeric, rng, correlation)
+        arrays = self._arrays(df, numeric, missing)
+
+        for iteration in range(self.max_iter):
+            change = 0.0
+            for col in self.order_:
+                observed = np.setdiff1d(np.arange(len(df)), missing[col], assume_unique=True)
+                if self.max_fit_rows is not None and len(observed) > self.max_fit_rows:
+                    observed = np.sort(rng.choice(observed, self.max_fit_rows, replace=False))
+                coef = self._fit_column(arrays, col, predictors[col], observed)
+                predictions = self._predict_column(arrays, col, predictors[col], coef, missing[col])
+                previous = arrays[col][missing[col]]
+                scale = np.nanstd(arrays[col]) or 1.0
+                change = max(change, float(np.max(np.abs(predictions - previous))) / scale)
+                arrays[col][missing[col]] = predictions
+                self.models_[col] = (predictors[col], coef)
+            if change < self.tol:
+                break
+
+        for col in self.order_:
+            set_values(df, col, missing[col], arrays[col][missing[col]])
+        cprint(f"[+] Filled missing values in {len(self.order_)} columns using regression imputation "
+               f"({iteration + 1} rounds)!", "green")
+        return df
+
+    def transform(self, df):
+        """Impute df in place with the fitted models, without refitting (one round in the fitted order)."""
+        numeric = [col for col in self.means_ if col in df.columns]
+        missing = {col: np.flatnonzero(df[col].isnull().to_numpy()) for col in self.order_ if col in df.columns}
+        arrays = self._arrays(df, numeric, missing)
+        for col, rows in missing.items():
+            predictors, coef = self.models_[col]
+            if len(rows):
+                arrays[col][rows] = self._predict_column(arrays, col, predictors, coef, rows)
+            set_values(df, col, rows, arrays[col][rows])
+        return df
@@ -1,29 +1,60 @@
 from termcolor import cprint
+from inplace import drop_columns
+from keys import find_keys, generate_uids, has_key_name, is_unique
+from casting import CAST_TYPES, cast_columns
 
-def index_column(df):
-    """Add or remove an index column from the DataFrame."""
-    columns = df.columns
-    index = [col for col in columns if ('index' in col.lower() or "id" in col.lower() or "key" in col.lower() or "idx" in col.lower()) and df[col].nunique() == len(df)]
-    if len(index) == 0:
+def index_column(df, pipeline=None, profile=None, source=None):
+    """
+        Add or remove an index column from the DataFrame (recorded in the FittedPipeline, if given).
+        A DataProfile of the current frame rules out columns with missing or repeated values without scanning them.
+        When no column named like an identifier is unique, the other keys of the frame (single or composite) are
+        listed and a sequential index or a UID column can be added: UIDs hash the first key, if there is one,
+        or else the source file name and the row position.
+    """
+    names = [col for col in df.columns if has_key_name(col)]
+    if profile is not None:
+        names = [col for col in names if profile.may_be_unique(col)]
+    index = next((col for col in names if is_unique(df[col])), None)
+    if index is None:
         cprint("[!] No index column found!", "blue")
+        keys = find_keys(df, profile=profile)
+        for key in keys:
+            cprint(f"[*] {'Composite key' if len(key) > 1 else 'Key'} found: {', '.join(key)}", "blue")
         cprint("[+] Do you want to add an index column? (y/n)", "green")
         if input("Choice: ").lower() == 'y':
+            cprint("[1] Sequential numbers", "yellow")
+            cprint(f"[2] UIDs (64-bit hashes of {'the key ' + ', '.join(keys[0]) if keys else 'the row positions'},"
+                   f" stable across chunks and files)", "yellow")
+            if input("Choice: ") == '2':
+                key = keys[0] if keys else None
+                df.insert(0, 'uid', generate_uids(df, source=source, key=key))
+                cprint("[+] UID column added!", "green")
+                if pipeline is not None:
+                    pipeline.record("add_uid", column='uid', key=key)
+                return
             df.insert(0, 'index', range(1, 1 + len(df)))
             cprint("[+] Index column added!", "green")
+            if pipeline is not None:
+                pipeline.record("add_index", column='index')
         else:
             cprint("[+] Index column not added.", "blue")
         return
     else:
-        index_column = index[0]
-        cprint(f"[!] Index column found: {index_column}", "blue")
+        cprint(f"[!] Index column found: {index}", "blue")
         cprint(f"[+] Do you want to remove the index column? (y/n)", "green")
         if input().lower() == 'y':
-            df.drop(columns=[index_column], inplace=True)
+            drop_columns(df, [index])
             cprint("[+] Index column removed!", "green")
+            if pipeline is not None:
+                pipeline.record("drop", columns=[index])
         else:
             cprint("[+] Index column not removed.", "blue")
         
-def remove_column(df):
+def remove_column(df, pipeline=None, correlations=None):
+    """
+        Prompt the user to remove a column (recorded in the FittedPipeline, if given).
+        The column is also dropped from the CorrelationCache of the frame, if given.
+    """
     columns = df.columns
     cprint("[*] Columns in the dataset:", "blue")
     for i, col in enumerate(columns, 1):
@@ -35,10 +66,62 @@ def remove_column(df):
                 break
             choice = int(choice)
             if 1 <= choice <= len(columns):
-                df.drop(columns=[columns[choice - 1]], inplace=True)
+                column = columns[choice - 1]
+                drop_columns(df, [column])
                 cprint("[+] Column removed!", "green")
+                if pipeline is not None:
+                    pipeline.record("drop", columns=[column])
+                if correlations is not None:
+                    correlations.drop_columns([column])
                 return
             else:
                 cprint("[-] Invalid choice. Please try again!", "red")
         except ValueError:
-            cprint("[-] Invalid input. Please enter a number.", "red")
\ No newline at end of file
+            cprint("[-] Invalid input. Please enter a number.", "red")
+
+
+def cast_column(df, pipeline=None, correlations=None):
+    """
+        Prompt the user to convert columns to a type (recorded in the FittedPipeline, if given).
+        Values that do not parse become missing and are counted; columns that became numeric
+        are added to the CorrelationCache of the frame, if given.
+    """
+    columns = df.columns
+    cprint("[*] Columns in the dataset:", "blue")
+    for i, col in enumerate(columns, 1):
+        cprint(f"[{i}] {col} ({df[col].dtype})", "blue")
+    while True:
+        choice = input("Select column numbers to cast (comma separated) or type \'back\' to return to menu: ")
+        if choice == 'back':
+            return
+        try:
+            numbers = [int(number) for number in choice.split(",")]
+        except ValueError:
+            cprint("[-] Invalid input. Please enter numbers.", "red")
+            continue
+        if all(1 <= number <= len(columns) for number in numbers):
+            selected = [columns[number - 1] for number in numbers]
+            break
+        cprint("[-] Invalid choice. Please try again!", "red")
+
+    for i, kind in enumerate(CAST_TYPES, 1):
+        cprint(f"[{i}] {kind}", "yellow")
+    while True:
+        try:
+            choice = int(input("Select the type: "))
+            if 1 <= choice <= len(CAST_TYPES):
+                kind = CAST_TYPES[choice - 1]
+                break
+            cprint("[-] Invalid choice. Please try again!", "red")
+        except ValueError:
+            cprint("[-] Invalid input. Please enter a number.", "red")
+    fmt = None
+    if kind == "datetime":
+        fmt = input("Enter the date format (e.g. %Y-%m-%d) or leave empty to detect it: ") or None
+
+    casts = {col: (kind, fmt) for col in selected}
+    cast_columns(df, casts)
+    if pipeline is not None:
+        pipeline.record("cast", casts=casts)
+    if correlations is not None:
+        correlations.refresh_columns(df, selected)
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+CORRELATION_CHUNK_ROWS = 1_000_000
+
+
+def numeric_columns(df):
+    """Numeric, non-boolean columns of a frame."""
+    return [col for col in df.columns
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+
+
+def _blocks(values, mask):
+    """Shifted values with gaps set to 0, their squares and the presence mask as floats."""
+    filled = np.where(mask, values, 0.0)
+    return filled, filled * filled, mask.astype(float)
+
+
+class CorrelationCache:
+    """
+        Pairwise correlations and covariances of the numeric columns of a frame, kept as sufficient
+        statistics: for every pair of columns the number of rows where both are present and the sums,
+        sums of squares and cross-products over those rows (so missing values are handled like
+        DataFrame.corr). The statistics are built once in O(n·k²); added chunks and removed rows are
+        added or subtracted, a dropped column is deleted from the matrices and a changed column only
+        recomputes its own row and column in O(n·k). Values are shifted by a per-column reference to
+        avoid cancellation.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Forget every statistic (the cache is rebuilt on the next sync)."""
+        self.columns = []
+        self.rows = 0
+        self.shift = np.empty(0)
+        self.pairs = np.empty((0, 0))
+        self.sums = np.empty((0, 0))
+        self.squares = np.empty((0, 0))
+        self.products = np.empty((0, 0))
+        return self
+
+    @property
+    def built(self):
+        return bool(self.columns) or self.rows > 0
+
+    def _values(self, df, columns):
+        values = np.column_stack([df[col].to_numpy(dtype=float, na_value=np.nan) for col in columns]) \
+            if columns else np.empty((len(df), 0))
+        mask = ~np.isnan(values)
+        return values, mask
+
+    def _add(self, df, sign=1.0):
+        for start in range(0, len(df), CORRELATION_CHUNK_ROWS):
+            values, mask = self._values(df.iloc[start:start + CORRELATION_CHUNK_ROWS], self.columns)
+            filled, squared, present = _blocks(values - self.shift, mask)
+            self.pairs += sign * (present.T @ present)
+            self.sums += sign * (filled.T @ present)
+            self.squares += sign * (squared.T @ present)
+            self.products += sign * (filled.T @ filled)
+        self.rows += int(sign) * len(df)
+
+    def update(self, chunk):
+        """Add the rows of a chunk (the numeric columns are those of the first chunk)."""
+        if not self.built:
+            self.columns = numeric_columns(chunk)
+            k = len(self.columns)
+            self.shift = np.nan_to_num(np.array([chunk[col].mean() for col in self.columns], dtype=float)) \
+                if k else np.empty(0)
+            self.pairs, self.sums, self.squares, self.products = (np.zeros((k, k)) for _ in range(4))
+        self._add(chunk)
+        return self
+
+    def remove_rows(self, rows):
+        """Subtract the statistics of rows about to be removed from the frame (call before dropping them)."""
+        if self.built and len(rows):
+            self._add(rows, sign=-1.0)
+        return self
+
+    def drop_columns(self, columns):
+        """Forget dropped columns."""
+        columns = set(columns)
+        keep = [i for i, col in enumerate(self.columns) if col not in columns]
+        if len(keep) < len(self.columns):
+            self.columns = [self.columns[i] for i in keep]
+            self.shift = self.shift[keep]
+            self.pairs, self.sums, self.squares, self.products = (
+                matrix[np.ix_(keep, keep)] for matrix in (self.pairs, self.sums, self.squares, self.products))
+        return self
+
+    def refresh_columns(self, df, columns):
+        """
+            Recompute the statistics involving columns whose values changed or that were added to df; columns
+            that are gone or no longer numeric are dropped. If rows were added or removed without telling the
+            cache, it is emptied and rebuilt on the next sync.
+        """
+        if not self.built:
+            return self
+        if len(df) != self.rows:
+            return self.clear()
+        numeric = set(numeric_columns(df))
+        columns = list(dict.fromkeys(columns))
+        self.drop_columns([col for col in columns if col not in numeric])
+        columns = [col for col in columns if col in numeric]
+        if not columns:
+            return self
+        new = [col for col in columns if col not in self.columns]
+        if new:
+            k, extra = len(self.columns), len(new)
+            self.columns += new
+            self.shift = np.concatenate([self.shift, np.zeros(extra)])
+            self.pairs, self.sums, self.squares, self.products = (
+                np.pad(matrix, ((0, extra), (0, extra))) for matrix in (self.pairs, self.sums, self.squares, self.products))
+        changed = [self.columns.index(col) for col in columns]
+        for i, col in zip(changed, columns):
+            self.shift[i] = np.nan_to_num(df[col].mean())
+        for matrix in (self.pairs, self.sums, self.squares, self.products):
+            matrix[changed, :] = 0.0
+            matrix[:, changed] = 0.0
+        for start in range(0, len(df), CORRELATION_CHUNK_ROWS):
+            chunk = df.iloc[start:start + CORRELATION_CHUNK_ROWS]
+            values, mask = self._values(chunk, self.columns)
+            filled, squared, present = _blocks(values - self.shift, mask)
+            pairs = present[:, changed].T @ present
+            sums = filled[:, changed].T @ present
+            sums_t = filled.T @ present[:, changed]
+            squares = squared[:, changed].T @ present
+            squares_t = squared.T @ present[:, changed]
+            products = filled[:, changed].T @ filled
+            self.pairs[changed, :] += pairs
+            self.sums[changed, :] += sums
+            self.squares[changed, :] += squares
+            self.products[changed, :] += products
+            others = [j for j in range(len(self.columns)) if j not in changed]
+            self.pairs[np.ix_(others, changed)] += pairs[:, others].T
+            self.sums[np.ix_(others, changed)] += sums_t[others]
+            self.squares[np.ix_(others, changed)] += squares_t[others]
+            self.products[np.ix_(others, changed)] += products[:, others].T
+        return self
+
+    def sync(self, df):
+        """
+            Bring the cache in line with the columns of df (built on first use): dropped columns are removed
+            and new numeric columns computed, without touching the other pairs.
+        """
+        if not self.built or len(df) != self.rows:
+            self.clear()
+            for start in range(0, max(len(df), 1), CORRELATION_CHUNK_ROWS):
+                self.update(df.iloc[start:start + CORRELATION_CHUNK_ROWS])
+            return self
+        numeric = numeric_columns(df)
+        self.drop_columns(set(self.columns) - set(numeric))
+        return self.refresh_columns(df, [col for col in numeric if col not in self.columns])
+
+    def _centered(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = self.sums / self.pairs
+            cov = self.products - self.sums * self.sums.T / self.pairs
+            variances = self.squares - self.sums * means
+        return cov, variances
+
+    def cov(self, columns=None):
+        """Pairwise covariance matrix (like DataFrame.cov), NaN for pairs with fewer than 2 common rows."""
+        cov, _ = self._centered()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = np.where(self.pairs >= 2, cov / (self.pairs - 1), np.nan)
+        return self._frame(cov, columns)
+
+    def corr(self, columns=None):
+        """Pairwise Pearson correlation matrix (like DataFrame.corr) of the cached columns, or of the given ones."""
+        cov, variances = self._centered()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.clip(cov / np.sqrt(variances * variances.T), -1.0, 1.0)
+        corr[(self.pairs < 2) | (variances <= 0) | (variances.T <= 0)] = np.nan
+        np.fill_diagonal(corr, np.where(np.diag(self.pairs) >= 2, 1.0, np.nan))
+        return self._frame(corr, columns)
+
+    def _frame(self, matrix, columns):
+        frame = pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+        return frame if columns is None else frame.loc[columns, columns]
+
+    def correlated_with(self, target, columns=None):
+        """Absolute correlation of every other cached column (or of the given ones) with target, highest first."""
+        corr = self.corr()[target].drop(target).abs()
+        if columns is not None:
+            corr = corr[corr.index.isin(columns)]
+        return corr.dropna().sort_values(ascending=False)
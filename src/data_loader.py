@@ -1,11 +1,137 @@
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from termcolor import cprint
 import sys
+from casting import Caster
 
-def load_data(filename):
-    """Load a CSV file into a pandas DataFrame."""
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+FEATHER_EXTENSIONS = (".feather", ".arrow", ".ipc")
+FILTER_OPERATORS = ("==", "!=", "<=", ">=", "<", ">", " not in ", " in ")
+
+def file_format(filename):
+    """Detect the file format ('csv', 'parquet' or 'feather') from the file extension."""
+    extension = os.path.splitext(str(filename))[1].lower()
+    if extension in PARQUET_EXTENSIONS:
+        return "parquet"
+    if extension in FEATHER_EXTENSIONS:
+        return "feather"
+    return "csv"
+
+def parse_filter(expression):
+    """Parse a filter like 'age>=30' or 'city in Paris,Rome' into a (column, operator, value) tuple."""
+    for operator in FILTER_OPERATORS:
+        if operator in expression:
+            column, value = expression.split(operator, 1)
+            operator = operator.strip()
+            if operator in ("in", "not in"):
+                value = [_parse_value(v) for v in value.split(",")]
+            else:
+                value = _parse_value(value)
+            return column.strip(), operator, value
+    raise ValueError(f"Invalid filter '{expression}'")
+
+def _parse_value(value):
+    value = value.strip()
+    if re.fullmatch(r"[+-]?\d+", value):
+        return int(value)
     try:
-        return pd.read_csv(filename)
+        return float(value)
+    except ValueError:
+        return value.strip("'\"")
+
+def filter_mask(df, filters):
+    """Evaluate a list of (column, operator, value) filters on a DataFrame (all of them must hold)."""
+    mask = pd.Series(True, index=df.index)
+    for column, operator, value in filters:
+        values = df[column]
+        if operator == "==":
+            mask &= values == value
+        elif operator == "!=":
+            mask &= values != value
+        elif operator == "<":
+            mask &= values < value
+        elif operator == "<=":
+            mask &= values <= value
+        elif operator == ">":
+            mask &= values > value
+        elif operator == ">=":
+            mask &= values >= value
+        elif operator == "in":
+            mask &= values.isin(value)
+        elif operator == "not in":
+            mask &= ~values.isin(value)
+        else:
+            raise ValueError(f"Invalid filter operator '{operator}'")
+    return mask
+
+def _arrow_dataset(filename, fmt):
+    try:
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise ImportError(f"Reading .{fmt} files requires pyarrow. Install it with 'pip install pyarrow'.")
+    if not os.path.exists(filename):
+        raise FileNotFoundError(filename)
+    return ds.dataset(filename, format="parquet" if fmt == "parquet" else "ipc")
+
+def _arrow_expression(filters):
+    if not filters:
+        return None
+    import pyarrow.parquet as pq
+    return pq.filters_to_expression([tuple(f) for f in filters])
+
+def _select(df, columns, filters):
+    if filters:
+        df = df[filter_mask(df, filters)]
+    return df[list(columns)] if columns is not None else df
+
+def read_data(filename, chunksize=None, columns=None, filters=None, casts=None):
+    """
+        Read a CSV, Parquet or Feather file. Only the given columns are read, and for the
+        columnar formats the filters are pushed down so that non-matching row groups are skipped.
+        casts ({column: type or (type, format)}, or a Caster counting the failures of a streamed
+        file) converts columns as soon as each chunk is read, before the CSV filters are applied.
+        Returns a DataFrame, or an iterator of DataFrames if chunksize is given.
+    """
+    counted = hasattr(casts, "transform")
+    caster = casts if counted or not casts else Caster(casts)
+    cast = caster.transform if caster else (lambda df: df)
+    fmt = file_format(filename)
+    if fmt == "csv":
+        usecols = None
+        if columns is not None:
+            usecols = list(columns) + [f[0] for f in filters or [] if f[0] not in columns]
+        reader = pd.read_csv(filename, chunksize=chunksize, usecols=usecols)
+        if chunksize is None:
+            df = _select(cast(reader), columns, filters)
+            df = df.reset_index(drop=True) if filters else df
+        else:
+            return (_select(cast(chunk), columns, filters) for chunk in reader)
+    else:
+        dataset = _arrow_dataset(filename, fmt)
+        expression = _arrow_expression(filters)
+        if chunksize is not None:
+            batches = dataset.to_batches(columns=columns, filter=expression, batch_size=chunksize)
+            return (cast(batch.to_pandas()) for batch in batches)
+        df = cast(dataset.to_table(columns=columns, filter=expression).to_pandas())
+    if caster and not counted:
+        caster.report()
+    return df
+
+def read_columns(filename):
+    """Return the column names of a data file without reading its rows."""
+    fmt = file_format(filename)
+    if fmt == "csv":
+        return list(pd.read_csv(filename, nrows=0).columns)
+    return list(_arrow_dataset(filename, fmt).schema.names)
+
+def load_data(filename, chunksize=None, columns=None, filters=None, casts=None):
+    """Load a data file into a pandas DataFrame, or into an iterator of DataFrame chunks if chunksize is given."""
+    try:
+        return read_data(filename, chunksize=chunksize, columns=columns, filters=filters, casts=casts)
     except FileNotFoundError:
         cprint("[-] Input file not found. Ensure it is in the same directory as the script!", "red")
         sys.exit(1)
@@ -13,12 +139,155 @@ def load_data(filename):
         cprint(f"[-] An error occurred while loading data: {e}", "red")
         sys.exit(1)
 
+def expand_files(patterns):
+    """Expand the glob patterns among the file arguments (sorted; arguments without wildcards are kept as they are)."""
+    files = []
+    for pattern in patterns:
+        if any(char in pattern for char in "*?["):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                cprint(f"[!] No files match '{pattern}'.", "yellow")
+            files += matches
+        else:
+            files.append(pattern)
+    return files
+
+def union_dtype(dtypes, complete=True):
+    """
+        Common dtype of a column read from several files: numeric dtypes are promoted with NumPy's rules,
+        strings stay strings and any other mix becomes object. complete is False if some files lack the
+        column, so its rows there are missing and integer or boolean columns must hold NaN.
+    """
+    if all(isinstance(dtype, pd.StringDtype) for dtype in dtypes):
+        return dtypes[0]
+    if all(isinstance(dtype, np.dtype) for dtype in dtypes):
+        kinds = {dtype.kind for dtype in dtypes}
+        if kinds <= set("biuf"):
+            dtype = np.result_type(*dtypes)
+            if not complete and dtype.kind == "b":
+                return np.dtype(object)
+            return np.dtype(float) if not complete and dtype.kind in "iu" else dtype
+        if kinds == {"M"} or kinds == {"m"}:
+            return np.result_type(*dtypes)
+    return np.dtype(object)
+
+def _union_column(frames, offsets, total, col, dtype):
+    """Assemble one column of the union: a preallocated array filled file by file (strings: one concatenation)."""
+    if isinstance(dtype, pd.StringDtype):
+        return pd.concat([frame[col] if col in frame.columns else pd.Series(np.nan, index=range(len(frame)), dtype=dtype)
+                          for frame in frames], ignore_index=True)
+    values = np.empty(total, dtype=dtype)
+    missing = np.datetime64("NaT") if dtype.kind in "Mm" else np.nan
+    for frame, start in zip(frames, offsets):
+        stop = start + len(frame)
+        if col not in frame.columns:
+            values[start:stop] = missing
+        elif dtype.kind in "fO":
+            values[start:stop] = frame[col].to_numpy(dtype=dtype, na_value=missing)
+        else:
+            values[start:stop] = frame[col].to_numpy(dtype=dtype)
+    return values
+
+def read_union(files, columns=None, filters=None, workers=None, casts=None):
+    """
+        Read several CSV, Parquet or Feather files with the same (or overlapping) schema as one DataFrame.
+        The files are read in parallel threads, the columns are ordered by first appearance, their dtypes
+        promoted with union_dtype and columns missing from a file are missing values for its rows. Every
+        column is written into one preallocated array instead of concatenating the frames.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(lambda filename: read_data(filename, columns=columns, filters=filters,
+                                                                   casts=casts), files))
+        offsets = np.concatenate([[0], np.cumsum([len(frame) for frame in frames])])
+        total = int(offsets[-1])
+        names = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+        dtypes = {col: union_dtype([frame[col].dtype for frame in frames if col in frame.columns],
+                                   all(col in frame.columns for frame in frames)) for col in names}
+        assembled = executor.map(lambda col: _union_column(frames, offsets[:-1], total, col, dtypes[col]), names)
+        df = pd.DataFrame(dict(zip(names, assembled)), copy=False)
+    partial = [col for col in names if not all(col in frame.columns for frame in frames)]
+    promoted = [col for col in names if any(col in frame.columns and frame[col].dtype != dtypes[col] for frame in frames)]
+    cprint(f"[+] {len(files)} files loaded as one table: {total} rows, {len(names)} columns.", "green")
+    if partial:
+        cprint(f"[!] Columns missing from some files (filled with missing values): {', '.join(map(str, partial))}", "yellow")
+    if promoted:
+        cprint(f"[!] Columns with different dtypes across files (promoted): {', '.join(map(str, promoted))}", "yellow")
+    return df
+
+def load_union(files, columns=None, filters=None, workers=None, casts=None):
+    """Load several data files as one DataFrame (see read_union)."""
+    try:
+        return read_union(files, columns=columns, filters=filters, workers=workers, casts=casts)
+    except FileNotFoundError as e:
+        cprint(f"[-] Input file not found: {e}", "red")
+        sys.exit(1)
+    except Exception as e:
+        cprint(f"[-] An error occurred while loading data: {e}", "red")
+        sys.exit(1)
+
+def write_data(df, filename):
+    """Write the DataFrame to a CSV, Parquet or Feather file depending on the file extension."""
+    fmt = file_format(filename)
+    if fmt == "parquet":
+        df.to_parquet(filename, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(filename)
+    else:
+        df.to_csv(filename, index=False)
+
 def save_dataframe(df, filename=None):
-    """Prompt the user to save the DataFrame to a CSV file."""
+    """Prompt the user to save the DataFrame to a CSV, Parquet or Feather file."""
     if filename is None:
         filename = input("Enter the filename to save the DataFrame: ")
     try:
-        df.to_csv(filename, index=False)
+        write_data(df, filename)
         cprint("[+] DataFrame saved successfully!", "green")
     except Exception as e:
         cprint(f"[-] An error occurred while saving the DataFrame: {e}", "red")
+
+def _write_arrow_chunks(chunks, filename, fmt):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                schema = table.schema
+                writer = pq.ParquetWriter(filename, schema) if fmt == "parquet" else pa.ipc.new_file(filename, schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def write_chunks(chunks, filename):
+    """
+        Write an iterator of DataFrame chunks to a single CSV, Parquet or Feather file, one chunk at a time.
+        Returns the number of rows written.
+    """
+    fmt = file_format(filename)
+    if fmt != "csv":
+        return _write_arrow_chunks(chunks, filename, fmt)
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(filename, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+def save_chunks(chunks, filename=None):
+    """Prompt the user to save an iterator of DataFrame chunks (unless a file name is given) and return the rows saved."""
+    if filename is None:
+        filename = input("Enter the filename to save the DataFrame: ")
+    rows = 0
+    try:
+        rows = write_chunks(chunks, filename)
+        cprint(f"[+] {rows} rows saved successfully!", "green")
+    except Exception as e:
+        cprint(f"[-] An error occurred while saving the DataFrame: {e}", "red")
+    return rows
@@ -0,0 +1,182 @@
+import os
+import shutil
+import tempfile
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+from data_loader import read_data, write_chunks
+
+
+# Integer columns reaching this magnitude are hashed as integers: as floats, neighbouring values would collide
+MAX_EXACT_FLOAT = 2 ** 53
+
+
+def _canonical(series):
+    """
+        The values of a column with its numbers as float64, so that 1 and 1.0 hash alike: an integer column is read as
+        floats in a chunk or file where it has gaps. Text hashes the same whether it is object, str or category.
+    """
+    dtype = series.dtype
+    if dtype == np.float64 or pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+        return series.array
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if pd.api.types.is_integer_dtype(dtype) and np.nanmax(np.abs(values), initial=0) >= MAX_EXACT_FLOAT:
+        return series.array
+    return values
+
+
+def row_hashes(df, subset=None):
+    """
+        Return one 64-bit hash per row (of the subset columns only, if given). Numbers are hashed by value,
+        not by dtype, so duplicates are found across chunks and files whose columns were read as int or float.
+    """
+    frame = df[list(subset)] if subset else df
+    canonical = pd.DataFrame({i: _canonical(frame.iloc[:, i]) for i in range(frame.shape[1])}, copy=False)
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def duplicate_mask(hashes):
+    """Mark every row whose hash already appeared earlier in the array."""
+    return pd.Series(hashes).duplicated().to_numpy()
+
+
+def drop_rows(df, mask):
+    """Drop the rows selected by a boolean mask from the DataFrame in place."""
+    if not mask.any():
+        return
+    if df.index.is_unique:
+        df.drop(index=df.index[mask], inplace=True)
+    else:
+        index = df.index
+        df.reset_index(drop=True, inplace=True)
+        df.drop(index=np.flatnonzero(mask), inplace=True)
+        df.index = index[~mask]
+
+
+def drop_duplicate_rows(df, subset=None):
+    """Remove duplicate rows in place (hashing every row once) and return the number of rows removed."""
+    mask = duplicate_mask(row_hashes(df, subset))
+    drop_rows(df, mask)
+    return int(mask.sum())
+
+
+class HashStore:
+    """
+        Set of the 64-bit row hashes seen so far, used to deduplicate across chunks and files.
+        Hashes are kept in sorted runs that are merged like a binary counter, so lookups are a
+        binary search per run. Once more than max_memory_rows hashes are held in memory, the runs
+        are merged and spilled to a .npy file that is memory-mapped for later lookups.
+        Two different rows collide with a probability of about n^2 / 2^65 for n unique rows.
+    """
+
+    def __init__(self, max_memory_rows=50_000_000, directory=None):
+        self.max_memory_rows = max_memory_rows
+        self.directory = directory
+        self.memory_runs = []
+        self.disk_runs = []
+        self._tempdir = None
+
+    def __len__(self):
+        return sum(len(run) for run in self.memory_runs) + sum(len(run) for run in self.disk_runs)
+
+    def __contains__(self, value):
+        return bool(self.contains(np.array([value], dtype=np.uint64))[0])
+
+    def contains(self, hashes):
+        """Return a boolean mask of the hashes that are already in the store."""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.memory_runs + self.disk_runs:
+            if len(run) == 0:
+                continue
+            positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            found |= run[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        """Add hashes to the store."""
+        run = np.unique(np.asarray(hashes, dtype=np.uint64))
+        while self.memory_runs and len(self.memory_runs[-1]) <= len(run):
+            run = np.union1d(self.memory_runs.pop(), run)
+        self.memory_runs.append(run)
+        if sum(len(run) for run in self.memory_runs) > self.max_memory_rows:
+            self._spill()
+
+    def _spill(self):
+        if self._tempdir is None:
+            self._tempdir = tempfile.mkdtemp(prefix="hashstore_", dir=self.directory)
+        run = self.memory_runs[0]
+        for other in self.memory_runs[1:]:
+            run = np.union1d(run, other)
+        filename = os.path.join(self._tempdir, f"run_{len(self.disk_runs)}.npy")
+        np.save(filename, run)
+        self.disk_runs.append(np.load(filename, mmap_mode="r"))
+        self.memory_runs = []
+
+    def filter_new(self, hashes):
+        """Return a mask of the duplicates among hashes (seen before or repeated within) and store the new ones."""
+        duplicated = duplicate_mask(hashes) | self.contains(hashes)
+        self.add(hashes[~duplicated])
+        return duplicated
+
+    def close(self):
+        """Delete the spilled runs."""
+        self.disk_runs = []
+        self.memory_runs = []
+        if self._tempdir is not None:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self._tempdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def dedupe_chunks(chunks, store, subset=None):
+    """Yield the chunks without the rows already seen in this or any earlier chunk."""
+    for chunk in chunks:
+        duplicated = store.filter_new(row_hashes(chunk, subset))
+        yield chunk[~duplicated]
+
+
+def dedupe_files(files, subset=None, chunksize=100_000, store=None):
+    """
+        Remove rows that duplicate a row of the same or of an earlier file, rewriting each file
+        chunk by chunk. A file is only replaced once its rewrite is complete, errors are raised.
+        Returns the number of rows removed per file.
+    """
+    removed = {}
+    own_store = store is None
+    if own_store:
+        store = HashStore()
+    try:
+        for file in files:
+            stem, extension = os.path.splitext(file)
+            temporary = f"{stem}.dedupe{extension}"
+            rows = [0]
+
+            def counted(chunks):
+                for chunk in chunks:
+                    rows[0] += len(chunk)
+                    yield chunk
+
+            # A failed write raises before the input is touched; the partial temporary file is removed
+            try:
+                kept = write_chunks(dedupe_chunks(counted(read_data(file, chunksize=chunksize)), store, subset),
+                                    temporary)
+            except BaseException:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+                raise
+            removed[file] = rows[0] - kept
+            # A file without duplicates is left as it was rather than rewritten with the dtypes pandas read
+            if removed[file]:
+                os.replace(temporary, file)
+            elif os.path.exists(temporary):
+                os.remove(temporary)
+            cprint(f"[+] {file}: {removed[file]} duplicate rows removed across files.", "green")
+    finally:
+        if own_store:
+            store.close()
+    return removed
@@ -0,0 +1,109 @@
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+from utils import is_text_column
+
+DATE_SAMPLE_SIZE = 1000
+
+
+def memory_usage(df):
+    """Return the deep memory usage of the DataFrame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def downcast_numeric(series):
+    """Downcast a numeric column to the smallest dtype that holds its values without loss."""
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        if series.min() >= 0:
+            return pd.to_numeric(series, downcast="unsigned")
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series):
+        downcast = pd.to_numeric(series, downcast="float")
+        if downcast.dtype != series.dtype and np.array_equal(downcast.to_numpy(dtype=series.dtype),
+                                                             series.to_numpy(), equal_nan=True):
+            return downcast
+    return series
+
+
+def parse_dates(series):
+    """Convert a string column to datetime if all of its values are dates, otherwise return it unchanged."""
+    values = series.dropna()
+    if values.empty:
+        return series
+    sample = values.sample(min(len(values), DATE_SAMPLE_SIZE), random_state=0).astype(str)
+    if not sample.str.contains(r"[-/:]").all():
+        return series
+    try:
+        pd.to_datetime(sample, errors="raise")
+        parsed = pd.to_datetime(series, errors="coerce")
+    except (ValueError, TypeError, OverflowError):
+        return series
+    if parsed.isnull().sum() != series.isnull().sum():
+        return series
+    return parsed
+
+
+def to_category(series, max_ratio):
+    """Convert a string column to category if its share of distinct values is at most max_ratio."""
+    if isinstance(series.dtype, pd.CategoricalDtype) or len(series) == 0:
+        return series
+    if series.nunique() / len(series) <= max_ratio:
+        return series.astype("category")
+    return series
+
+
+def optimize_dtypes(df, category_ratio=0.5, dates=True, report=True):
+    """
+        Shrink the DataFrame in place: downcast numeric columns, parse date columns and
+        convert low-cardinality string columns to category. Returns the number of bytes saved.
+    """
+    before = memory_usage(df)
+    changes = {}
+    for col in df.columns:
+        series = df[col]
+        if is_text_column(series):
+            converted = parse_dates(series) if dates else series
+            if converted is series:
+                converted = to_category(series, category_ratio)
+        else:
+            converted = downcast_numeric(series)
+        if converted is not series and converted.dtype != series.dtype:
+            df[col] = converted
+            changes[col] = (series.dtype, converted.dtype)
+    after = memory_usage(df)
+
+    if report:
+        for col, (old, new) in changes.items():
+            cprint(f"[*] '{col}': {old} -> {new}", "blue")
+        saved = before - after
+        percent = 100 * saved / before if before else 0
+        cprint(f"[+] Memory usage reduced from {before / 2**20:.2f} MB to {after / 2**20:.2f} MB "
+               f"({percent:.1f}% saved)!", "green")
+    return before - after
+
+
+def apply_dtypes(df, dtypes):
+    """
+        Convert the columns of df in place to dtypes chosen by optimize_dtypes on another frame, without
+        searching for them again. Numeric columns whose values do not fit the recorded dtype are left unchanged.
+    """
+    for col, dtype in dtypes.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        series = df[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            if is_text_column(series):
+                df[col] = series.astype("category")
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            if is_text_column(series):
+                df[col] = pd.to_datetime(series, errors="coerce")
+        elif pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_integer_dtype(series):
+            info = np.iinfo(dtype)
+            if series.empty or (series.min() >= info.min and series.max() <= info.max):
+                df[col] = series.astype(dtype)
+        elif pd.api.types.is_float_dtype(dtype) and pd.api.types.is_float_dtype(series):
+            converted = series.astype(dtype)
+            if np.array_equal(converted.to_numpy(dtype=series.dtype), series.to_numpy(), equal_nan=True):
+                df[col] = converted
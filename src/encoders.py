@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from inplace import drop_columns
+
+
+def category_codes(series, categories):
+    """Vectorized lookup of the position of every value in categories (-1 for missing or unknown values)."""
+    return pd.Index(categories).get_indexer(series)
+
+
+class OrdinalEncoder:
+    """Replace the values of a column with their position in a fixed order (NaN for missing or unknown values)."""
+
+    def __init__(self, column, order=None):
+        self.column = column
+        self.order = order
+        self.categories_ = None
+
+    def fit(self, df, target=None):
+        """Learn the order of the values (sorted values unless an order was given)."""
+        if self.order is not None:
+            self.categories_ = pd.Index(self.order)
+        else:
+            self.categories_ = pd.Index(np.sort(df[self.column].dropna().unique()))
+        return self
+
+    def transform(self, df):
+        """Encode the column of df in place."""
+        codes = category_codes(df[self.column], self.categories_)
+        if (codes < 0).any():
+            df[self.column] = np.where(codes < 0, np.nan, codes)
+        else:
+            df[self.column] = codes.astype(np.min_scalar_type(max(len(self.categories_) - 1, 0)))
+        return df
+
+
+class OneHotEncoder:
+    """Replace a column with one 0/1 column per category seen during fitting."""
+
+    def __init__(self, column, max_categories=None):
+        self.column = column
+        self.max_categories = max_categories
+        self.categories_ = None
+
+    def fit(self, df, target=None):
+        """Learn the categories (the max_categories most frequent ones, if given)."""
+        counts = df[self.column].value_counts()
+        if self.max_categories is not None:
+            counts = counts.iloc[:self.max_categories]
+        self.categories_ = pd.Index(np.sort(counts.index.to_numpy()))
+        return self
+
+    def output_columns(self):
+        """Names of the columns that replace the encoded column."""
+        return [f"{self.column}_{value}" for value in self.categories_]
+
+    def transform(self, df):
+        """Replace the column of df in place with its indicator columns."""
+        codes = category_codes(df[self.column], self.categories_)
+        position = df.columns.get_loc(self.column)
+        drop_columns(df, [self.column])
+        for i, name in enumerate(self.output_columns()):
+            df.insert(position + i, name, (codes == i).astype(np.uint8))
+        return df
+
+
+class HashingEncoder:
+    """Replace a high-cardinality column with n_components 0/1 columns chosen by hashing the value."""
+
+    def __init__(self, column, n_components=16):
+        self.column = column
+        self.n_components = n_components
+
+    def fit(self, df, target=None):
+        """Nothing to learn: the buckets only depend on the hash of the value."""
+        return self
+
+    def output_columns(self):
+        """Names of the columns that replace the encoded column."""
+        return [f"{self.column}_hash_{i}" for i in range(self.n_components)]
+
+    def transform(self, df):
+        """Replace the column of df in place with its hash bucket indicator columns."""
+        values = df[self.column]
+        buckets = (pd.util.hash_pandas_object(values, index=False).to_numpy() % self.n_components).astype(np.int64)
+        buckets[values.isnull().to_numpy()] = -1
+        position = df.columns.get_loc(self.column)
+        drop_columns(df, [self.column])
+        for i, name in enumerate(self.output_columns()):
+            df.insert(position + i, name, (buckets == i).astype(np.uint8))
+        return df
+
+
+class TargetEncoder:
+    """
+        Replace the values of a high-cardinality column with the mean of the target for that value,
+        shrunk towards the global mean for rare values. Unknown values get the global mean.
+    """
+
+    def __init__(self, column, target, smoothing=10.0):
+        self.column = column
+        self.target = target
+        self.smoothing = smoothing
+        self.categories_ = None
+        self.means_ = None
+        self.global_mean_ = None
+
+    def fit(self, df, target=None):
+        """Learn the smoothed target mean of every value."""
+        y = df[target or self.target]
+        stats = y.groupby(df[self.column], observed=True).agg(["sum", "count"])
+        self.global_mean_ = float(y.mean())
+        self.categories_ = stats.index
+        self.means_ = ((stats["sum"] + self.smoothing * self.global_mean_)
+                       / (stats["count"] + self.smoothing)).to_numpy(dtype=float)
+        return self
+
+    def transform(self, df):
+        """Encode the column of df in place."""
+        codes = category_codes(df[self.column], self.categories_)
+        df[self.column] = np.where(codes < 0, self.global_mean_, self.means_[codes])
+        return df
+
+
+ENCODERS = {
+    "ordinal": OrdinalEncoder,
+    "onehot": OneHotEncoder,
+    "hashing": HashingEncoder,
+    "target": TargetEncoder
+}
+
+
+class EncoderRegistry:
+    """Fitted encoders by column, fitted once and re-applied to later frames or files."""
+
+    def __init__(self):
+        self.encoders = {}
+
+    def __contains__(self, column):
+        return column in self.encoders
+
+    def add(self, encoder):
+        """Register a fitted encoder under its column."""
+        self.encoders[encoder.column] = encoder
+        return encoder
+
+    def transform(self, df, columns=None):
+        """Encode the given columns (all registered columns by default) in place with the fitted encoders."""
+        for column in columns or list(self.encoders):
+            if column in df.columns:
+                self.encoders[column].transform(df)
+        return df
+
+    def save(self, filename):
+        """Save the fitted encoders with joblib."""
+        import joblib
+        joblib.dump(self, filename)
+
+    @staticmethod
+    def load(filename):
+        """Load encoders saved with EncoderRegistry.save."""
+        import joblib
+        return joblib.load(filename)
@@ -0,0 +1,134 @@
+from termcolor import cprint
+from dtype_optimizer import apply_dtypes
+from dedupe import drop_duplicate_rows, drop_rows, row_hashes
+from inplace import drop_columns
+from keys import generate_uids
+from casting import cast_columns
+
+ALL_COLUMNS = None
+
+
+class FittedPipeline:
+    """
+        The preprocessing operations performed on a DataFrame, recorded together with everything they
+        learned (fill values, fitted encoders, dropped columns, dtypes) so they can be replayed on other
+        files in one pass, without prompts and without fitting anything again.
+    """
+
+    def __init__(self):
+        self.steps = []
+
+    def __len__(self):
+        return len(self.steps)
+
+    def record(self, op, **state):
+        """Append an operation and the fitted state needed to replay it."""
+        previous = self.steps[-1] if self.steps else None
+        if op == "drop" and previous is not None and previous["op"] == "drop":
+            previous["columns"] = previous["columns"] + [col for col in state["columns"]
+                                                         if col not in previous["columns"]]
+            return
+        self.steps.append({"op": op, **state})
+
+    def record_dtypes(self, df):
+        """Record the current dtypes of df (after optimize_dtypes) so later files are converted to them directly."""
+        self.record("astype", dtypes=dict(df.dtypes))
+
+    @staticmethod
+    def _reads(step):
+        """Columns whose values a step depends on (ALL_COLUMNS if it depends on every column)."""
+        op = step["op"]
+        if op == "fill":
+            imputer = step["imputer"]
+            if not hasattr(imputer, "statistics_"):
+                return set(imputer.means_)
+            # Columns fitted without gaps only matter for later files, the fill never reads them
+            return set(imputer.statistics_) - set(getattr(imputer, "spare_", ()))
+        if op == "encode":
+            return {step["encoder"].column}
+        if op in ("dropna", "dedupe"):
+            return set(step["subset"]) if step["subset"] else ALL_COLUMNS
+        if op == "astype":
+            return set(step["dtypes"])
+        if op == "cast":
+            return set(step["casts"])
+        if op == "add_uid":
+            return set(step["key"] or ())
+        return set()
+
+    def excluded_columns(self):
+        """Columns that are dropped before any step reads them, so they never need to be loaded."""
+        excluded = set()
+        for i, step in enumerate(self.steps):
+            if step["op"] != "drop":
+                continue
+            earlier = [self._reads(previous) for previous in self.steps[:i]]
+            excluded.update(col for col in step["columns"]
+                            if all(reads is not ALL_COLUMNS and col not in reads for reads in earlier))
+        return excluded
+
+    def transform(self, df, hash_store=None, start=0, source=None, removed=None):
+        """
+            Replay the recorded operations on df in place and return df. When df is one chunk of a larger
+            file, a shared HashStore removes duplicates across chunks and start is the number of rows
+            already output, so a recorded index column keeps counting. source is the name of the file
+            df comes from, which positional UID columns are hashed with. removed, if given, is a dict
+            that collects the number of rows dropped by each operation ('dropna', 'dedupe').
+        """
+        removed = {} if removed is None else removed
+        for step in self.steps:
+            op = step["op"]
+            if op == "fill":
+                step["imputer"].transform(df)
+            elif op == "encode":
+                if step["encoder"].column in df.columns:
+                    step["encoder"].transform(df)
+            elif op == "drop":
+                drop_columns(df, [col for col in step["columns"] if col in df.columns])
+            elif op == "dropna":
+                rows = len(df)
+                df.dropna(subset=step["subset"], inplace=True)
+                removed[op] = removed.get(op, 0) + rows - len(df)
+            elif op == "dedupe":
+                if hash_store is not None:
+                    mask = hash_store.filter_new(row_hashes(df, step["subset"]))
+                    drop_rows(df, mask)
+                    count = int(mask.sum())
+                else:
+                    count = drop_duplicate_rows(df, step["subset"])
+                removed[op] = removed.get(op, 0) + count
+            elif op == "add_index":
+                df.insert(0, step["column"], range(start + 1, start + 1 + len(df)))
+            elif op == "add_uid":
+                df.insert(0, step["column"], generate_uids(df, start, source, step["key"]))
+            elif op == "astype":
+                apply_dtypes(df, step["dtypes"])
+            elif op == "cast":
+                cast_columns(df, step["casts"], report=False)
+        return df
+
+    def save(self, filename):
+        """Save the fitted pipeline with joblib."""
+        import joblib
+        joblib.dump(self, filename)
+        cprint(f"[+] Fitted pipeline with {len(self)} steps saved to '{filename}'!", "green")
+
+    @staticmethod
+    def load(filename):
+        """Load a pipeline saved with FittedPipeline.save."""
+        import joblib
+        return joblib.load(filename)
+
+
+def save_pipeline(pipeline, filename=None):
+    """Prompt for a file name (unless given) and save the fitted pipeline there."""
+    if len(pipeline) == 0:
+        cprint("[!] No preprocessing operations have been recorded yet.", "yellow")
+        return
+    if filename is None:
+        filename = input("Enter the filename to save the fitted pipeline (default: pipeline.joblib): ") \
+            or "pipeline.joblib"
+    try:
+        pipeline.save(filename)
+    except Exception as e:
+        cprint(f"[-] An error occurred while saving the fitted pipeline: {e}", "red")
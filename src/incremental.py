@@ -0,0 +1,138 @@
+import time
+from termcolor import cprint
+import numpy as np
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from data_loader import read_data
+from dedupe import row_hashes
+
+INCREMENTAL_MODELS = {
+    "sgd_classifier": SGDClassifier,
+    "naive_bayes": GaussianNB,
+    "sgd_regressor": SGDRegressor
+}
+
+INCREMENTAL_REGRESSION_MODELS = ("sgd_regressor",)
+
+SCALED_MODELS = ("sgd_classifier", "sgd_regressor")
+
+HOLDOUT_BUCKETS = 1_000_000
+
+
+def holdout_mask(chunk, test_size=0.2, key=None):
+    """
+        Deterministic hash-based test split: a row is held out if the hash of its key columns (all columns
+        by default) falls in the first test_size share of the buckets. Every pass over the file puts the
+        same rows on the same side, so the test set is never stored or materialized next to the training set.
+    """
+    return row_hashes(chunk, key) % HOLDOUT_BUCKETS < test_size * HOLDOUT_BUCKETS
+
+
+def iter_training_chunks(filename, chunksize, target, features, test_size=0.2, key=None, filters=None, casts=None):
+    """
+        Yield (X, y, holdout) for every chunk of the file, skipping rows with a missing target or feature
+        (values that fail the casts, if given, are missing).
+    """
+    columns = list(dict.fromkeys(list(features) + [target] + list(key or [])))
+    for chunk in read_data(filename, chunksize=chunksize, columns=columns, filters=filters, casts=casts):
+        chunk = chunk.dropna(subset=list(features) + [target])
+        if chunk.empty:
+            continue
+        holdout = holdout_mask(chunk, test_size, key)
+        yield chunk[features].to_numpy(dtype=float), chunk[target].to_numpy(), holdout
+
+
+def train_incremental(filename, model_name, target, features, chunksize=100_000, test_size=0.2, key=None,
+                      epochs=1, filters=None, random_state=0, casts=None):
+    """
+        Train one of the INCREMENTAL_MODELS out of core with partial_fit, streaming the file chunk by chunk.
+        A first pass fits the feature scaler and collects the classes, then every epoch streams the training
+        rows (shuffled within each chunk) and a last pass scores the hash-selected holdout rows.
+        Returns the fitted model (with its scaler, if any) and a report of the holdout metrics.
+    """
+    if model_name not in INCREMENTAL_MODELS:
+        raise ValueError(f"Unknown incremental model '{model_name}', expected one of {', '.join(INCREMENTAL_MODELS)}")
+    start = time.perf_counter()
+    regression = model_name in INCREMENTAL_REGRESSION_MODELS
+    model = INCREMENTAL_MODELS[model_name]()
+    if "random_state" in model.get_params():
+        model.set_params(random_state=random_state)
+    scaler = StandardScaler() if model_name in SCALED_MODELS else None
+
+    def chunks():
+        return iter_training_chunks(filename, chunksize, target, features, test_size, key, filters, casts)
+
+    classes = set()
+    if scaler is not None or not regression:
+        for X, y, holdout in chunks():
+            if scaler is not None and (~holdout).any():
+                scaler.partial_fit(X[~holdout])
+            if not regression:
+                classes.update(np.unique(y[~holdout]).tolist())
+    classes = np.array(sorted(classes))
+
+    rng = np.random.default_rng(random_state)
+    train_rows = 0
+    for epoch in range(epochs):
+        train_rows = 0
+        for X, y, holdout in chunks():
+            X, y = X[~holdout], y[~holdout]
+            if len(y) == 0:
+                continue
+            order = rng.permutation(len(y))
+            X, y = X[order], y[order]
+            if scaler is not None:
+                X = scaler.transform(X)
+            if regression:
+                model.partial_fit(X, y)
+            else:
+                model.partial_fit(X, y, classes=classes)
+            train_rows += len(y)
+        cprint(f"[*] Epoch {epoch + 1}/{epochs}: trained on {train_rows} rows.", "blue")
+    if train_rows == 0:
+        raise ValueError(f"No complete training rows found in '{filename}'")
+
+    predictor = make_pipeline(scaler, model) if scaler is not None else model
+    sums = {"rows": 0, "correct": 0, "abs_error": 0.0, "squared_error": 0.0, "y": 0.0, "y_squared": 0.0}
+    for X, y, holdout in chunks():
+        X, y = X[holdout], y[holdout]
+        if len(y) == 0:
+            continue
+        y_pred = predictor.predict(X)
+        sums["rows"] += len(y)
+        if regression:
+            y = y.astype(float)
+            sums["abs_error"] += float(np.abs(y - y_pred).sum())
+            sums["squared_error"] += float(((y - y_pred) ** 2).sum())
+            sums["y"] += float(y.sum())
+            sums["y_squared"] += float((y ** 2).sum())
+        else:
+            sums["correct"] += int((y_pred == y).sum())
+
+    report = {"model": model_name, "train_rows": train_rows, "test_rows": sums["rows"], "epochs": epochs}
+    if sums["rows"]:
+        n = sums["rows"]
+        if regression:
+            total = sums["y_squared"] - sums["y"] ** 2 / n
+            report["mae"] = sums["abs_error"] / n
+            report["mse"] = sums["squared_error"] / n
+            report["r2"] = 1 - sums["squared_error"] / total if total else float("nan")
+        else:
+            report["accuracy"] = sums["correct"] / n
+    report["seconds"] = time.perf_counter() - start
+    print_incremental_report(report)
+    return predictor, report
+
+
+def print_incremental_report(report):
+    """Print the holdout metrics of a report returned by train_incremental."""
+    cprint(f"[+] {report['model']} trained on {report['train_rows']} rows in {report['epochs']} epochs, "
+           f"evaluated on {report['test_rows']} holdout rows ({report['seconds']:.2f}s).", "green")
+    if "accuracy" in report:
+        cprint(f"Accuracy: {report['accuracy']}", "green")
+    elif "mae" in report:
+        cprint(f"Mean Absolute Error: {report['mae']}", "green")
+        cprint(f"Mean Squared Error: {report['mse']}", "green")
+        cprint(f"R2 Score: {report['r2']}", "green")
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+
+
+def column_buffer(series):
+    """Address of the data buffer of a column (None if it cannot be read without converting the column)."""
+    values = series.array
+    if isinstance(values, pd.Categorical):
+        data = values.codes
+    elif isinstance(series.dtype, np.dtype):
+        data = np.asarray(values)
+    elif isinstance(values, (pd.arrays.ArrowExtensionArray, pd.arrays.ArrowStringArray)):
+        chunks = values.__arrow_array__().chunks
+        buffers = [buffer for buffer in chunks[0].buffers() if buffer is not None] if chunks else []
+        return buffers[-1].address if buffers else None
+    else:
+        return None
+    return data.__array_interface__["data"][0] if data.size else None
+
+
+def column_buffers(df):
+    """Buffer address and size in bytes of every column of df."""
+    return {col: (column_buffer(df[col]), df[col].array.nbytes) for col in df.columns}
+
+
+class CopyLog:
+    """
+        Bytes of column data copied by each operation on a frame: a column that is still there after the
+        operation but whose buffer moved was copied (or rewritten with a new dtype) rather than updated in place.
+    """
+
+    def __init__(self):
+        self.operations = []
+
+    @contextmanager
+    def track(self, df, operation):
+        """Record the bytes copied by the operations run in the with block."""
+        before = column_buffers(df)
+        yield
+        copied = 0
+        for col in df.columns:
+            if col in before and before[col][0] is not None and column_buffer(df[col]) != before[col][0]:
+                copied += df[col].array.nbytes
+        self.operations.append((operation, copied))
+
+    def total(self):
+        """Bytes copied by all the tracked operations."""
+        return sum(copied for _, copied in self.operations)
+
+    def report(self, df):
+        """Print the bytes copied by every tracked operation next to the size of the frame."""
+        size = df.memory_usage(index=False).sum()
+        for operation, copied in self.operations:
+            cprint(f"[*] {operation}: {copied / 2**20:.2f} MB of column data copied "
+                   f"(frame: {size / 2**20:.2f} MB).", "blue")
+
+
+def set_values(df, col, rows, values):
+    """
+        Write values at the row positions of a column straight into its array. The column is only rebuilt,
+        with a dtype that holds the values, when its own dtype cannot.
+    """
+    if len(rows) == 0:
+        return
+    try:
+        df.iloc[rows, df.columns.get_loc(col)] = values
+    except (TypeError, ValueError):
+        updated = df[col].astype(object)
+        updated.iloc[rows] = values
+        df[col] = updated.infer_objects()
+
+
+def fill_column(df, col, value):
+    """
+        Fill the missing values of a column with value, written into its array when the column is backed by
+        NumPy (or is categorical) and can hold the value; other columns (e.g. Arrow strings) are rebuilt by fillna.
+    """
+    missing = df[col].isnull().to_numpy()
+    if not missing.any():
+        return
+    # No Series of the column may be alive here, or copy-on-write copies the whole block on the write
+    if isinstance(df[col].dtype, (np.dtype, pd.CategoricalDtype)):
+        try:
+            df.iloc[np.flatnonzero(missing), df.columns.get_loc(col)] = value
+            return
+        except (TypeError, ValueError):
+            pass
+    try:
+        df[col] = df[col].fillna(value)
+    except (TypeError, ValueError):
+        # e.g. a fractional mean in a nullable integer column
+        df[col] = df[col].astype(object).fillna(value).infer_objects()
+
+
+def drop_columns(df, columns):
+    """Drop columns without copying the columns that stay (DataFrame.drop copies their whole block)."""
+    for col in columns:
+        del df[col]
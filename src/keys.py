@@ -0,0 +1,99 @@
+import hashlib
+import os
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from dedupe import row_hashes
+
+KEY_NAME_HINTS = ("index", "idx", "id", "key")
+# Uniqueness is checked on prefixes growing by GROWTH from PREFIX_ROWS, so an early repeat stops the check
+PREFIX_ROWS = 1024
+GROWTH = 4
+# Composite keys are only searched among this many columns (the ones with key-like names first)
+MAX_COMPOSITE_COLUMNS = 10
+
+
+def has_key_name(col):
+    """Whether a column name looks like an identifier (contains id, key, index or idx)."""
+    return any(hint in str(col).lower() for hint in KEY_NAME_HINTS)
+
+
+def has_repeats(values):
+    """
+        Whether a column (or the rows of a frame) repeats a value. Growing prefixes are checked in turn,
+        so a repeat near the top is found after hashing a few rows instead of the whole column; a column
+        without repeats costs about 4/3 of one hash pass.
+    """
+    size = PREFIX_ROWS
+    while True:
+        if values.iloc[:size].duplicated().any():
+            return True
+        if size >= len(values):
+            return False
+        size *= GROWTH
+
+
+def is_unique(series):
+    """
+        Whether a column has no missing and no repeated values. A sorted column only needs its neighbours
+        compared; the sortedness check stops at the first value out of order.
+    """
+    if series.isnull().any():
+        return False
+    if series.is_monotonic_increasing or series.is_monotonic_decreasing:
+        values = series.array
+        return not (values[1:] == values[:-1]).any()
+    return not has_repeats(series)
+
+
+def _may_be_key(series, profile=None):
+    """Floats, booleans and columns with missing values are never keys."""
+    if pd.api.types.is_float_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return False
+    if profile is not None and series.name in profile.columns:
+        return profile.columns[series.name]["nulls"] == 0
+    return not series.isnull().any()
+
+
+def find_keys(df, columns=None, max_width=2, profile=None):
+    """
+        Find the keys of df: single columns, then combinations of up to max_width columns, whose values never
+        repeat. Composite keys are minimal (they contain no smaller key). A DataProfile of the frame, if given,
+        rules out columns and combinations with too few distinct values without scanning them.
+        Returns a list of column lists, the single-column keys first.
+    """
+    candidates = [col for col in (df.columns if columns is None else columns) if _may_be_key(df[col], profile)]
+    keys = []
+    for col in candidates:
+        if (profile is None or profile.may_be_unique(col)) and is_unique(df[col]):
+            keys.append([col])
+    rest = sorted((col for col in candidates if [col] not in keys), key=lambda col: not has_key_name(col))
+    rest = rest[:MAX_COMPOSITE_COLUMNS]
+    for width in range(2, max_width + 1):
+        for combination in combinations(rest, width):
+            if any(set(key) <= set(combination) for key in keys):
+                continue
+            if profile is not None and np.prod([profile.distinct(col) for col in combination]) < 0.9 * len(df):
+                continue
+            if not has_repeats(df[list(combination)]):
+                keys.append(list(combination))
+    return keys
+
+
+def _source_salt(source):
+    """64-bit salt derived from the name (without the directory) of a source file."""
+    return np.uint64(int(hashlib.md5(os.path.basename(source or "").encode()).hexdigest()[:16], 16))
+
+
+def generate_uids(df, start=0, source=None, key=None):
+    """
+        64-bit UIDs of the rows of df, computed without a Python loop. With key columns the UID is a hash of
+        their values, so a row gets the same UID in every chunk, file and run. Otherwise it is a hash of the
+        source file name and the row's position in it (start is the number of rows before df, for chunks),
+        so UIDs are stable across chunks and runs and do not collide between files.
+    """
+    if key:
+        return row_hashes(df, key)
+    # The integer hash is a bijection, so positions salted per file never collide within a file
+    positions = np.arange(start, start + len(df), dtype=np.uint64)
+    return pd.util.hash_array(positions ^ _source_salt(source))
@@ -6,34 +6,243 @@ Date: 2024-09-04
 Version: 1.1
 """
 
+import argparse
+import os
 import sys
 import warnings
 from termcolor import cprint
 warnings.filterwarnings("ignore")
 
-from data_loader import load_data
-from missing_data import handle_missing_data
+from data_loader import expand_files, load_data, load_union, parse_filter, read_columns
+from missing_data import IMPUTATION_METHODS, handle_missing_data
 from utils import safe_import, remove_duplicates, inspect_data
 from menu import menu
+from streaming import stream_file
+from dtype_optimizer import optimize_dtypes
+from batch import run_batch, prepare_imputer
+from dedupe import HashStore, dedupe_files
+from pipeline import load_spec, run_pipeline
+from fitted_pipeline import FittedPipeline, save_pipeline
+from correlation import CorrelationCache
+from casting import CAST_TYPES, parse_cast
+from snapshots import SNAPSHOT_DIR, SnapshotCache, pipeline_checkpoint, resume_snapshot
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        usage="python main.py <input_file_names_separated_with_space> [options]",
+        description="A data analysis and preprocessing script."
+    )
+    parser.add_argument("files", nargs="*", help="input files to preprocess (glob patterns like 'shards/*.parquet' are expanded)")
+    parser.add_argument("--union", action="store_true",
+                        help="load all the input files in parallel as one table with aligned columns and dtypes "
+                             "(interactive mode only)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the input files in chunks of this many rows instead of loading them into memory")
+    parser.add_argument("--columns", type=lambda value: [col.strip() for col in value.split(",")], default=None,
+                        help="comma separated list of the only columns to read from the input files")
+    parser.add_argument("--filter", dest="filters", action="append", type=parse_filter, default=None,
+                        help="row filter like 'age>=30' (repeatable), pushed down to Parquet/Feather row groups")
+    parser.add_argument("--cast", dest="casts", action="append", type=parse_cast, default=None,
+                        help="convert a column while loading, like 'age:integer' or 'when:datetime:%%Y-%%m-%%d' "
+                             f"(repeatable; types: {', '.join(CAST_TYPES)}); values that do not parse become missing")
+    parser.add_argument("--optimize", action="store_true",
+                        help="downcast numeric columns, parse dates and convert low-cardinality strings to category")
+    parser.add_argument("--pipeline", default=None,
+                        help="run a JSON/YAML pipeline spec without prompts (input files default to the spec's 'input')")
+    parser.add_argument("--replay", default=None,
+                        help="apply a fitted pipeline saved from the menu to the files, in parallel and without prompts")
+    parser.add_argument("--save-pipeline", default=None,
+                        help="save the operations performed interactively on the first file as a fitted pipeline")
+    parser.add_argument("--batch", action="store_true",
+                        help="process the files in parallel without prompts (load, impute, dedupe, save)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes in batch mode (reading threads with --union)")
+    parser.add_argument("--impute", choices=list(IMPUTATION_METHODS), default="mean",
+                        help="imputation method in batch mode")
+    parser.add_argument("--fill-value", default=None, help="value used by the 'custom' imputation method")
+    parser.add_argument("--imputer", default=None,
+                        help="apply the fill values saved in this file in batch mode (fitted on the first file and "
+                             "saved there if it does not exist yet)")
+    parser.add_argument("--approximate", action="store_true",
+                        help="estimate median and mode fill values with mergeable sketches (streaming, and batch mode "
+                             "where all the files are sketched in parallel); without it, streaming keeps exact counts "
+                             "of up to 1,000,000 distinct values per column and sketches columns with more")
+    parser.add_argument("--epsilon", type=float, default=0.001,
+                        help="rank/frequency error of the --approximate sketches")
+    parser.add_argument("--keep-duplicates", action="store_true", help="do not remove duplicates in batch mode")
+    parser.add_argument("--dedupe-subset", type=lambda value: [col.strip() for col in value.split(",")], default=None,
+                        help="comma separated list of the columns compared when removing duplicates")
+    parser.add_argument("--dedupe-across-files", action="store_true",
+                        help="also remove rows that duplicate a row of an earlier file (streaming and batch mode)")
+    parser.add_argument("--train", default=None, choices=["sgd_classifier", "naive_bayes", "sgd_regressor"],
+                        help="train a model out of core on the files, streaming them in --chunksize rows")
+    parser.add_argument("--target", default=None, help="target column of --train")
+    parser.add_argument("--features", type=lambda value: [col.strip() for col in value.split(",")], default=None,
+                        help="comma separated feature columns of --train (default: every other column)")
+    parser.add_argument("--test-size", type=float, default=0.2, help="share of the rows held out by --train")
+    parser.add_argument("--epochs", type=int, default=1, help="number of passes over the training rows in --train")
+    parser.add_argument("--save-model", default=None,
+                        help="save the model trained by --train on every file to this path ({stem} is the file name)")
+    parser.add_argument("--score", default=None,
+                        help="stream the files through a saved model (and its preprocessing) and write the predictions")
+    parser.add_argument("--export-plots", default=None,
+                        help="render histograms, boxplots, scatter plots and a heatmap of the files to this directory")
+    parser.add_argument("--plot-kinds", type=lambda value: [kind.strip() for kind in value.split(",")],
+                        default=None, help="comma separated plot types for --export-plots (default: all)")
+    parser.add_argument("--plot-format", choices=["png", "svg"], default="png", help="image format of --export-plots")
+    parser.add_argument("--save-profile", default=None,
+                        help="save the profile of every file as JSON to this path ({stem} is the file name)")
+    parser.add_argument("--snapshots", nargs="?", const=SNAPSHOT_DIR, default=None,
+                        help=f"snapshot the frame after every operation to this directory (default: {SNAPSHOT_DIR}) "
+                             "and offer to resume from it; pipeline specs skip the steps already snapshotted")
+    parser.add_argument("--output-dir", default="processed", help="directory of the processed files in batch mode")
+    return parser.parse_args(argv)
 
 def main():
     if len(sys.argv) < 2:
         print("[-] Usage:\npython main.py <input_file_names_separated_with_space>")
         sys.exit(1)
 
+    args = parse_args()
     safe_import()
-    
-    files = sys.argv[1:]
-    for file in files:
-        df = load_data(file)
-        inspect_data(df)
-        handle_missing_data(df)
-        remove_duplicates(df)
-        cprint("[*] Initial preprocessing complete!", "green")
-        if  file == files[-1]:
-            menu(df, is_last=True)
+
+    files = expand_files(args.files)
+    if args.union:
+        modes = {"--pipeline": args.pipeline is not None, "--replay": args.replay is not None, "--batch": args.batch,
+                 "--train": args.train is not None, "--export-plots": args.export_plots is not None,
+                 "--score": args.score is not None, "--chunksize": args.chunksize is not None}
+        combined = [flag for flag, used in modes.items() if used]
+        if combined:
+            cprint(f"[-] --union only applies to interactive mode and cannot be combined with {', '.join(combined)}.",
+                   "red")
+            sys.exit(1)
+    if args.pipeline is not None:
+        try:
+            run_pipeline(load_spec(args.pipeline), files,
+                         SnapshotCache(args.snapshots) if args.snapshots is not None else None)
+        except Exception as e:
+            cprint(f"[-] Pipeline failed: {e}", "red")
+            sys.exit(1)
+        return
+    if not files:
+        print("[-] Usage:\npython main.py <input_file_names_separated_with_space>")
+        sys.exit(1)
+
+    read_options = {"columns": args.columns, "filters": args.filters,
+                    "casts": {col: (kind, fmt) for col, kind, fmt in args.casts} if args.casts else None}
+    if args.replay is not None:
+        try:
+            results = run_batch(files, args.output_dir, args.workers, pipeline=FittedPipeline.load(args.replay),
+                                optimize=args.optimize, read_options=read_options)
+        except ValueError as e:
+            cprint(f"[-] {e}", "red")
+            sys.exit(1)
+        if any(result["status"] != "ok" for result in results):
+            sys.exit(1)
+        return
+    if args.batch:
+        imputer = None
+        if args.imputer is not None or args.approximate:
+            if args.impute in ("drop_rows", "drop_columns", "regression"):
+                cprint("[-] --imputer and --approximate need a mean, median, mode or custom imputation method.", "red")
+                sys.exit(1)
+            imputer = prepare_imputer(args.imputer, files, args.impute, args.fill_value, read_options,
+                                      args.approximate, args.workers, args.epsilon)
+        try:
+            results = run_batch(files, args.output_dir, args.workers, method=args.impute, value=args.fill_value,
+                                dedupe=not args.keep_duplicates, optimize=args.optimize, read_options=read_options,
+                                imputer=imputer, subset=args.dedupe_subset)
+        except ValueError as e:
+            cprint(f"[-] {e}", "red")
+            sys.exit(1)
+        if args.dedupe_across_files and not args.keep_duplicates:
+            dedupe_files([result["output"] for result in results if result["status"] == "ok"], args.dedupe_subset)
+        if any(result["status"] != "ok" for result in results):
+            sys.exit(1)
+        return
+
+    if args.train is not None:
+        from incremental import train_incremental
+        if args.target is None:
+            cprint("[-] --train needs a --target column.", "red")
+            sys.exit(1)
+        stems = [os.path.splitext(os.path.basename(file))[0] for file in files]
+        if args.save_model is not None and len({args.save_model.format(stem=stem) for stem in stems}) < len(files):
+            cprint("[-] --save-model would save several models to the same file, use {stem} in its path.", "red")
+            sys.exit(1)
+        for file, stem in zip(files, stems):
+            features = args.features or [col for col in read_columns(file) if col != args.target]
+            try:
+                model, _ = train_incremental(file, args.train, args.target, features, args.chunksize or 100_000,
+                                             args.test_size, epochs=args.epochs, filters=args.filters,
+                                             casts=read_options["casts"])
+            except Exception as e:
+                cprint(f"[-] Training on '{file}' failed: {e}", "red")
+                sys.exit(1)
+            if args.save_model is not None:
+                from scoring import save_model
+                save_model(model, features, args.target, filename=args.save_model.format(stem=stem))
+        return
+
+    if args.export_plots is not None:
+        from plot_export import PLOT_KINDS, export_plots
+        for file in files:
+            df = load_data(file, **read_options)
+            stem = os.path.splitext(os.path.basename(file))[0]
+            export_plots(df, os.path.join(args.export_plots, stem), args.plot_kinds or PLOT_KINDS,
+                         fmt=args.plot_format, workers=args.workers)
+        return
+
+    if args.score is not None:
+        from scoring import ModelBundle, score_file, predictions_path
+        bundle = ModelBundle.load(args.score)
+        os.makedirs(args.output_dir, exist_ok=True)
+        for file in files:
+            score_file(bundle, file, predictions_path(file, args.output_dir), args.chunksize or 100_000,
+                       **read_options)
+        return
+
+    if args.chunksize is not None:
+        with HashStore() as hash_store:
+            for file in files:
+                stream_file(file, args.chunksize, hash_store=hash_store if args.dedupe_across_files else None,
+                            subset=args.dedupe_subset, approximate=args.approximate, **read_options)
+        return
+
+    if args.union:
+        sources = [("union", files, lambda: load_union(files, workers=args.workers, **read_options))]
+    else:
+        sources = [(file, [file], lambda file=file: load_data(file, **read_options)) for file in files]
+    snapshots = SnapshotCache(args.snapshots) if args.snapshots is not None else None
+    for i, (file, inputs, load) in enumerate(sources):
+        resumed = resume_snapshot(snapshots, inputs, read_options) if snapshots is not None else None
+        correlations = CorrelationCache()
+        if resumed is not None:
+            df, pipeline = resumed
+        else:
+            pipeline = FittedPipeline()
+            df = load()
+            if args.optimize:
+                optimize_dtypes(df)
+                pipeline.record_dtypes(df)
+            profile = inspect_data(df)
+            if args.save_profile is not None:
+                profile.save(args.save_profile.format(stem=os.path.splitext(os.path.basename(file))[0]))
+            handle_missing_data(df, pipeline, profile, correlations)
+            remove_duplicates(df, pipeline=pipeline, profile=profile if profile.null_count() == 0 else None,
+                              correlations=correlations)
+            cprint("[*] Initial preprocessing complete!", "green")
+        checkpoint = None
+        if snapshots is not None:
+            checkpoint = pipeline_checkpoint(snapshots, inputs, pipeline, read_options)
+            checkpoint(df)
+        if i == len(sources) - 1:
+            menu(df, is_last=True, pipeline=pipeline, correlations=correlations, checkpoint=checkpoint,
+                 source=file)
         else:
-            menu(df)
+            menu(df, pipeline=pipeline, correlations=correlations, checkpoint=checkpoint, source=file)
+        if args.save_pipeline is not None and i == 0:
+            save_pipeline(pipeline, args.save_pipeline)
 
 if __name__ == "__main__":
     main()
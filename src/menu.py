@@ -1,64 +1,96 @@
 from termcolor import cprint
 from utils import inspect_data
 from data_loader import save_dataframe
-from column_operations import index_column, remove_column
-from plot_menu import plot_menu
-from model_menu import model_menu
+from column_operations import cast_column, index_column, remove_column
 from categorical_data import handle_non_ordinal_column, choose_column
+from dtype_optimizer import optimize_dtypes
+from fitted_pipeline import save_pipeline
+from correlation import CorrelationCache
 
-def menu(df, is_last=False):
-    """Display a menu to the user to perform various operations on the DataFrame."""
-    
-    if is_last:
-        choices = [
-            "Add or remove index column",
-            "Remove a column",
-            "Deal with categorical data",
-            "Train a classification model",
-            "Save the dataframe",
-            "Inspect data",
-            "Plot menu",
-            "Exit"
-        ]
-    else:
-        choices = [
-            "Add or remove index column",
-            "Remove a column",
-            "Deal with categorical data",
-            "Train a classification model",
-            "Save the dataframe",
-            "Inspect data",
-            "Plot menu",
+def menu(df, is_last=False, pipeline=None, correlations=None, checkpoint=None, source=None):
+    """
+        Display a menu to the user to perform various operations on the DataFrame.
+        The preprocessing operations are recorded in the FittedPipeline, if given, and kept in sync
+        with the CorrelationCache shared by the heatmap and the feature selection.
+        checkpoint, if given, is called with df after every operation that changes it (to snapshot it).
+        source is the name of the file df was loaded from, which positional UID columns are hashed with.
+    """
+
+    choices = [
+        "Add or remove index column",
+        "Remove a column",
+        "Cast columns to a type",
+        "Deal with categorical data",
+        "Optimize memory usage",
+        "Train a classification model",
+        "Save the dataframe",
+        "Inspect data",
+        "Plot menu"
+    ]
+    if pipeline is not None:
+        choices.append("Save the fitted pipeline")
+    if not is_last:
+        choices += [
             "Save and continue to next file",
-            "Continue to next file without saving",
-            "Exit"
+            "Continue to next file without saving"
         ]
-    
+    choices.append("Exit")
+
+    profile = None
+    if correlations is None:
+        correlations = CorrelationCache()
     while True:
         cprint("\n[*] Menu:", "yellow")
         for i, choice in enumerate(choices, 1):
             cprint(f"[{i}] {choice}", "yellow")
         try:
             choice = int(input("Select an option: "))
-            if choice == 1:
-                index_column(df)
-            elif choice == 2:
-                remove_column(df)
-            elif choice == 3:
+            if not 1 <= choice <= len(choices):
+                cprint("[-] Invalid choice. Please try again!", "red")
+                continue
+            selected = choices[choice - 1]
+            mutating = selected in ("Add or remove index column", "Remove a column", "Cast columns to a type",
+                                    "Deal with categorical data", "Optimize memory usage")
+            if selected == "Add or remove index column":
+                index_column(df, pipeline, profile, source)
+                profile = None
+            elif selected == "Remove a column":
+                remove_column(df, pipeline, correlations)
+                profile = None
+            elif selected == "Cast columns to a type":
+                cast_column(df, pipeline, correlations)
+                profile = None
+            elif selected == "Deal with categorical data":
                 col = choose_column(df)
-                handle_non_ordinal_column(df, col)
-            elif choice == 4:
-                model_menu(df)
-            elif choice == 5:
+                handle_non_ordinal_column(df, col, pipeline)
+                correlations.refresh_columns(df, [col])
+                profile = None
+            elif selected == "Optimize memory usage":
+                optimize_dtypes(df)
+                profile = None
+                if pipeline is not None:
+                    pipeline.record_dtypes(df)
+            elif selected == "Train a classification model":
+                from model_menu import model_menu
+                model_menu(df, pipeline, correlations)
+            elif selected == "Save the dataframe":
                 save_dataframe(df)
-            elif choice == 6:
-                inspect_data(df)
-            elif choice == 7:
-                plot_menu(df)
-            elif choice == 8:
-                cprint("[*] Exiting...", "green")
+            elif selected == "Inspect data":
+                profile = inspect_data(df)
+            elif selected == "Plot menu":
+                from plot_menu import plot_menu
+                plot_menu(df, correlations)
+            elif selected == "Save the fitted pipeline":
+                save_pipeline(pipeline)
+            elif selected == "Save and continue to next file":
+                save_dataframe(df)
+                return
+            elif selected == "Continue to next file without saving":
                 return
             else:
-                cprint("[-] Invalid choice. Please try again!", "red")
+                cprint("[*] Exiting...", "green")
+                return
+            if mutating and checkpoint is not None:
+                checkpoint(df)
         except ValueError:
-            cprint("[-] Invalid input. Please enter a number.", "red")
\ No newline at end of file
+            cprint("[-] Invalid input. Please enter a number.", "red")
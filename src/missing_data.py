@@ -1,18 +1,32 @@
 from termcolor import cprint
 import numpy as np
 from categorical_data import handle_non_ordinal_column
-from sklearn.linear_model import LinearRegression
+from utils import is_text_column
+from chained_imputer import ChainedImputer
+from sketches import CountMinSketch, KLLSketch, TopK, value_hashes
+from inplace import CopyLog, drop_columns, fill_column
 import pandas as pd
 
-def handle_missing_data(df):
-    """Handle missing data in the DataFrame."""
-    null_count = df.isnull().sum().sum()
+def handle_missing_data(df, pipeline=None, profile=None, correlations=None):
+    """
+        Handle missing data in the DataFrame. Returns the fitted Imputer if fill values were computed.
+        The operations are recorded in the FittedPipeline, if given, and the null counts are taken
+        from the DataProfile of the current frame, if given. A CorrelationCache of the frame, if given,
+        is used by regression imputation and updated for the dropped rows and filled columns.
+    """
+    null_count = profile.null_count() if profile is not None else df.isnull().sum().sum()
     if null_count == 0:
         cprint("[+] No missing data found!", "green")
     else:
         cprint(f"\n[-] {null_count} missing values found!\n", "red")
         method_choice = get_imputation_method()
-        impute_missing_data(df, method_choice)
+        missing = list(df.columns[df.isnull().any().to_numpy()]) if correlations is not None else []
+        if correlations is not None and correlations.built and method_choice == 1:
+            correlations.remove_rows(df[df.isnull().any(axis=1)])
+        imputer = impute_missing_data(df, method_choice, pipeline=pipeline, correlations=correlations)
+        if correlations is not None and method_choice != 1:
+            correlations.refresh_columns(df, missing)
+        return imputer
 
 def get_imputation_method(individual=False):
     """Prompt the user to select a method for handling missing data."""
@@ -50,83 +64,382 @@ def get_imputation_method(individual=False):
         except ValueError:
             cprint("[-] Invalid input. Please enter a number.", "red")
             
-def impute_missing_data(df:pd.DataFrame, method_choice, column=None):
-    """Impute missing data in the DataFrame based on the selected method."""
+def impute_missing_data(df:pd.DataFrame, method_choice, column=None, pipeline=None, correlations=None):
+    """
+        Impute missing data in the DataFrame based on the selected method. Returns the fitted Imputer, if any.
+        The operations are recorded in the FittedPipeline, if given. Regression imputation picks its
+        predictors from the CorrelationCache of the frame, if given, instead of correlating a sample.
+        Fills are written into the columns' own arrays; the bytes of column data copied are reported.
+    """
+    if method_choice == 8 and column is None:
+        return individual_imputation(df, pipeline)
+    log = CopyLog()
+    with log.track(df, METHOD_LABELS[method_choice] + (f" of '{column}'" if column is not None else "")):
+        if column is None:
+            imputer = impute_frame(df, method_choice, pipeline, correlations)
+        else:
+            imputer = impute_column(df, column, method_choice, pipeline, correlations)
+    log.report(df)
+    return imputer
+
+def impute_frame(df, method_choice, pipeline=None, correlations=None):
+    """Apply one imputation method to every column with missing values."""
     if method_choice == 1:
         df.dropna(axis=0, inplace=True)
         cprint("[+] Rows with missing values dropped!", "green")
-    elif method_choice == 2:
-        df.dropna(axis=1, inplace=True)
+        if pipeline is not None:
+            pipeline.record("dropna", subset=None)
+        return None
+    missing = list(df.columns[df.isnull().any().to_numpy()])
+    if method_choice == 2:
+        drop_columns(df, missing)
         cprint("[+] Columns with missing values dropped!", "green")
+        if pipeline is not None:
+            pipeline.record("drop", columns=missing)
+        return None
+    if method_choice in (3, 4, 5):
+        for col in missing:
+            if is_text_column(df[col]):
+                handle_non_ordinal_column(df, col, pipeline)
+        missing = [col for col in missing if col in df.columns and df[col].isnull().any()]
+    if method_choice == 3:
+        imputer = ChainedImputer(columns=[col for col in missing if not is_text_column(df[col])])
+        imputer.fit_transform(df, correlations.sync(df).corr() if correlations is not None else None)
+        if pipeline is not None:
+            pipeline.record("fill", imputer=imputer)
+        return imputer
+    if method_choice == 7:
+        columns = {col: {"custom": input(f"Provide a value to fill missing data in '{col}': ")} for col in missing}
+        imputer = Imputer(strategy=None, columns=columns)
     else:
-        if column is None:
-            columns = df.columns   
-            for col in columns:
-                if df[col].isnull().sum() > 0:
-                    if df[col].dtype == 'object':
-                        handle_non_ordinal_column(df, col)
-                    if method_choice == 3:
-                        regression_imputation(df, col)
-                    elif method_choice == 4:
-                        df[col].fillna(df[col].mean(), inplace=True)
-                        cprint(f"[+] Filled missing values in '{col}' with mean!", "green")
-                    elif method_choice == 5:
-                        df[col].fillna(df[col].median(), inplace=True)
-                        cprint(f"[+] Filled missing values in '{col}' with median!", "green")
-                    elif method_choice == 6:
-                        df[col].fillna(df[col].mode()[0], inplace=True)
-                        cprint(f"[+] Filled missing values in '{col}' with mode!", "green")
-                    elif method_choice == 7:
-                        value = input(f"Provide a value to fill missing data in '{col}': ")
-                        df[col].fillna(value, inplace=True)
-                        cprint(f"[+] Filled missing values in '{col}' with custom value!", "green")
-                    elif method_choice == 8:
-                        individual_imputation(df)
-        else:
-            if df[column].dtype == 'object':
-                handle_non_ordinal_column(df, column)
-            if method_choice == 1:
-                df[column].dropna(axis=0, inplace=True)
-                cprint(f"[+] Rows with missing values in '{column}' dropped!", "green")
-            elif method_choice == 2:
-                df.drop(columns=[column], inplace=True)
-                cprint(f"[+] Column '{column}' dropped!", "green")    
-            elif method_choice == 3:
-                regression_imputation(df, column)
-            elif method_choice == 4:
-                df[column].fillna(df[column].mean(), inplace=True)
-                cprint(f"[+] Filled missing values in '{column}' with mean!", "green")
-            elif method_choice == 5:
-                df[column].fillna(df[column].median(), inplace=True)
-                cprint(f"[+] Filled missing values in '{column}' with median!", "green")
-            elif method_choice == 6:
-                df[column].fillna(df[column].mode()[0], inplace=True)
-                cprint(f"[+] Filled missing values in '{column}' with mode!", "green")
-            elif method_choice == 7:
-                value = input(f"Provide a value to fill missing data in '{column}': ")
-                df[column].fillna(value, inplace=True)
-                cprint(f"[+] Filled missing values in '{column}' with custom value!", "green")
-
-def regression_imputation(df, col):
-    """Perform regression imputation on the specified column."""
-    not_null_df = df[df[col].notnull()]
-    null_df = df[df[col].isnull()]
-    
-    X_train = not_null_df.drop(columns=[col])
-    for column in X_train.columns:
-        if X_train[column].dtype == 'object':
-            handle_non_ordinal_column(X_train, column)
-    y_train = not_null_df[col]
-    
-    reg_model = LinearRegression()
-    reg_model.fit(X_train, y_train)
-    
-    df.loc[df[col].isnull(), col] = reg_model.predict(null_df.drop(columns=[col]))
-    cprint(f"[+] Filled missing values in '{col}' using regression imputation!", "green")
+        imputer = Imputer(strategy=METHOD_NAMES[method_choice])
+    imputer.fit_transform(df)
+    report_imputation(imputer)
+    if pipeline is not None:
+        # The recorded fill also covers the gaps later files have in the other columns
+        pipeline.record("fill", imputer=imputer.fit_spare(df))
+    return imputer
+
+def impute_column(df, column, method_choice, pipeline=None, correlations=None):
+    """Apply one imputation method (numbered as in the individual menu) to a single column."""
+    if method_choice == 1:
+        df.dropna(subset=[column], inplace=True)
+        cprint(f"[+] Rows with missing values in '{column}' dropped!", "green")
+        if pipeline is not None:
+            pipeline.record("dropna", subset=[column])
+        return None
+    if method_choice == 2:
+        drop_columns(df, [column])
+        cprint(f"[+] Column '{column}' dropped!", "green")
+        if pipeline is not None:
+            pipeline.record("drop", columns=[column])
+        return None
+    if is_text_column(df[column]) and method_choice in (3, 4, 5):
+        handle_non_ordinal_column(df, column, pipeline)
+        if column not in df.columns or not df[column].isnull().any():
+            return None
+    if method_choice == 3:
+        imputer = regression_imputation(df, column, correlations.sync(df).corr() if correlations is not None else None)
+        if pipeline is not None:
+            pipeline.record("fill", imputer=imputer)
+        return imputer
+    if method_choice == 7:
+        strategy = {"custom": input(f"Provide a value to fill missing data in '{column}': ")}
+    else:
+        strategy = METHOD_NAMES[method_choice]
+    imputer = Imputer(strategy=None, columns={column: strategy})
+    imputer.fit_transform(df)
+    report_imputation(imputer)
+    if pipeline is not None:
+        pipeline.record("fill", imputer=imputer.fit_spare(df))
+    return imputer
+
+def report_imputation(imputer):
+    """Print which columns were filled by an imputer and which were skipped."""
+    for col, strategy in imputer.strategies_.items():
+        name = "custom value" if strategy == "custom" else strategy
+        cprint(f"[+] Filled missing values in '{col}' with {name}!", "green")
+    for col in imputer.skipped_:
+        cprint(f"[!] Non-numeric column '{col}' was not imputed.", "yellow")
+
+def regression_imputation(df, col, correlation=None):
+    """Perform regression imputation on the specified column (with a precomputed correlation matrix, if given)."""
+    imputer = ChainedImputer(columns=[col])
+    imputer.fit_transform(df, correlation)
+    return imputer
     
-def individual_imputation(df):
-    for col in df:
-        if df[col].isnull().sum() > 0:
+def individual_imputation(df, pipeline=None):
+    """Prompt for an imputation method for every column with missing values."""
+    for col in list(df.columns):
+        if col in df.columns and df[col].isnull().any():
             cprint(f"\n[*] Current column: '{col}'.", "yellow")
             method_choice = get_imputation_method(individual=True)
-            impute_missing_data(df, method_choice, column=col)
\ No newline at end of file
+            impute_missing_data(df, method_choice, column=col, pipeline=pipeline)
+
+IMPUTATION_METHODS = {
+    "drop_rows": 1,
+    "drop_columns": 2,
+    "regression": 3,
+    "mean": 4,
+    "median": 5,
+    "mode": 6,
+    "custom": 7
+}
+
+METHOD_NAMES = {number: name for name, number in IMPUTATION_METHODS.items()}
+
+METHOD_LABELS = {
+    1: "Drop rows with missing values",
+    2: "Drop columns with missing values",
+    3: "Regression imputation",
+    4: "Mean imputation",
+    5: "Median imputation",
+    6: "Mode imputation",
+    7: "Custom value imputation"
+}
+
+FILL_STRATEGIES = ("mean", "median", "mode", "custom")
+
+class Imputer:
+    """
+        Compute the fill values of many columns at once (one median or mode reduction per group of columns
+        sharing a strategy; means column by column, which needs no copy of the group) and write them into
+        the missing positions of every column's own array. The fitted
+        statistics_ can be saved and applied to later files without being recomputed.
+        strategy applies to every column not listed in columns (None leaves them alone).
+    """
+
+    def __init__(self, strategy="mean", columns=None, fill_value=None):
+        self.strategy = strategy
+        self.columns = columns or {}
+        self.fill_value = fill_value
+        self.statistics_ = {}
+        self.strategies_ = {}
+        self.skipped_ = []
+        self.spare_ = []
+
+    def fit(self, df, missing_only=True):
+        """Compute the fill values of the columns of df (only those with missing values if missing_only)."""
+        if missing_only:
+            columns = df.columns[df.isnull().any().to_numpy()]
+        else:
+            columns = df.columns
+        return self._fit_columns(df, columns)
+
+    def fit_spare(self, df):
+        """
+            Also compute the fill values of the columns of df without missing values, so later files with gaps
+            there are filled too. They are listed in spare_, as filling df never needed them.
+        """
+        columns = [col for col in df.columns[df.notnull().all().to_numpy()] if col not in self.statistics_]
+        skipped = list(self.skipped_)
+        self._fit_columns(df, columns)
+        self.skipped_ = skipped
+        self.spare_ += [col for col in columns if col in self.statistics_]
+        return self
+
+    def _fit_columns(self, df, columns):
+        groups = {}
+        for col in columns:
+            strategy = self.columns.get(col, self.strategy)
+            if strategy is None:
+                continue
+            if isinstance(strategy, dict):
+                self.statistics_[col] = strategy["custom"]
+                self.strategies_[col] = "custom"
+            elif strategy not in FILL_STRATEGIES:
+                raise ValueError(f"Unknown imputation method '{strategy}' for column '{col}'")
+            elif strategy == "custom":
+                self.statistics_[col] = self.fill_value
+                self.strategies_[col] = "custom"
+            elif strategy in ("mean", "median") and is_text_column(df[col]):
+                self.skipped_.append(col)
+            else:
+                groups.setdefault(strategy, []).append(col)
+
+        for strategy, group in groups.items():
+            if strategy == "mean":
+                # Column by column: selecting the group would copy it first. Object dtype keeps the mean of
+                # a datetime column a Timestamp
+                values = pd.Series({col: df[col].mean() for col in group}, dtype=object)
+            elif strategy == "median":
+                values = df[group].median()
+            else:
+                modes = df[group].mode()
+                values = modes.iloc[0] if len(modes) else pd.Series(dtype=float)
+            values = values.dropna()
+            self.statistics_.update(values.to_dict())
+            self.strategies_.update({col: strategy for col in values.index})
+        return self
+
+    def transform(self, df):
+        """Fill the missing values of df in place with the fitted statistics and return df."""
+        values = {col: value for col, value in self.statistics_.items() if col in df.columns}
+        for col, value in values.items():
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and value not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories([value])
+        for col, value in values.items():
+            fill_column(df, col, value)
+        return df
+
+    def fit_transform(self, df, missing_only=True):
+        """Fit the imputer on df and fill its missing values in place."""
+        return self.fit(df, missing_only).transform(df)
+
+    def save(self, filename):
+        """Save the fitted imputer with joblib."""
+        import joblib
+        joblib.dump(self, filename)
+
+    @staticmethod
+    def load(filename):
+        """Load an imputer saved with Imputer.save."""
+        import joblib
+        return joblib.load(filename)
+
+class ApproximateImputer(Imputer):
+    """
+        Imputer whose median and mode are estimated with mergeable sketches (KLL quantiles for the median,
+        a top-k summary refined by a count-min sketch for the mode) with a rank or frequency error of about
+        epsilon. It is fitted chunk by chunk with partial_fit, sketches of other chunks, files or workers are
+        combined with merge, and finalize turns them into the fill values applied by transform.
+    """
+
+    def __init__(self, strategy="median", columns=None, fill_value=None, epsilon=0.001):
+        super().__init__(strategy, columns, fill_value)
+        self.epsilon = epsilon
+        self.sketches_ = {}
+
+    def _sketch(self, col, strategy):
+        if col not in self.sketches_:
+            if strategy == "mean":
+                self.sketches_[col] = [0.0, 0]
+            elif strategy == "median":
+                self.sketches_[col] = KLLSketch.for_error(self.epsilon)
+            else:
+                self.sketches_[col] = (TopK.for_error(self.epsilon), CountMinSketch(self.epsilon))
+        return self.sketches_[col]
+
+    def partial_fit(self, chunk):
+        """Add a chunk of rows to the sketches of every column (columns are not known to have gaps yet)."""
+        for col in chunk.columns:
+            strategy = self.columns.get(col, self.strategy)
+            if strategy is None:
+                continue
+            if isinstance(strategy, dict) or strategy == "custom":
+                self.statistics_[col] = strategy["custom"] if isinstance(strategy, dict) else self.fill_value
+                self.strategies_[col] = "custom"
+                continue
+            if strategy not in FILL_STRATEGIES:
+                raise ValueError(f"Unknown imputation method '{strategy}' for column '{col}'")
+            if strategy in ("mean", "median") and is_text_column(chunk[col]):
+                if col not in self.skipped_:
+                    self.skipped_.append(col)
+                continue
+            sketch = self._sketch(col, strategy)
+            if strategy == "mean":
+                sketch[0] += float(chunk[col].sum())
+                sketch[1] += int(chunk[col].count())
+            elif strategy == "median":
+                sketch.update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+            else:
+                sketch[0].update(chunk[col])
+                sketch[1].add(value_hashes(chunk[col]))
+        return self
+
+    def merge(self, other):
+        """Merge the sketches of an imputer fitted on other chunks, files or workers with the same settings."""
+        for col, theirs in other.sketches_.items():
+            if col not in self.sketches_:
+                self.sketches_[col] = theirs
+            elif isinstance(theirs, list):
+                self.sketches_[col][0] += theirs[0]
+                self.sketches_[col][1] += theirs[1]
+            elif isinstance(theirs, tuple):
+                self.sketches_[col][0].merge(theirs[0])
+                self.sketches_[col][1].merge(theirs[1])
+            else:
+                self.sketches_[col].merge(theirs)
+        self.statistics_.update({col: value for col, value in other.statistics_.items() if col not in self.statistics_})
+        self.strategies_.update({col: "custom" for col, strategy in other.strategies_.items() if strategy == "custom"})
+        self.skipped_ += [col for col in other.skipped_ if col not in self.skipped_]
+        return self
+
+    def finalize(self):
+        """Compute the fill values from the sketches."""
+        for col, sketch in self.sketches_.items():
+            if isinstance(sketch, list):
+                if sketch[1]:
+                    self.statistics_[col], self.strategies_[col] = sketch[0] / sketch[1], "mean"
+            elif isinstance(sketch, tuple):
+                candidates = sketch[0].counts
+                if len(candidates):
+                    upper = sketch[1].estimate(value_hashes(pd.Series(candidates.index)))
+                    estimates = np.minimum(upper, candidates.to_numpy() + sketch[0].error)
+                    self.statistics_[col], self.strategies_[col] = candidates.index[int(np.argmax(estimates))], "mode"
+            elif sketch.count:
+                self.statistics_[col], self.strategies_[col] = sketch.quantile(0.5), "median"
+        return self
+
+    def fit(self, df, missing_only=True, chunksize=1_000_000):
+        """Fit the sketches on df in slices of chunksize rows (on the columns with missing values if missing_only)."""
+        if missing_only:
+            df = df[df.columns[df.isnull().any().to_numpy()]]
+        for start in range(0, len(df), chunksize):
+            self.partial_fit(df.iloc[start:start + chunksize])
+        return self.finalize()
+
+def fill_missing(df, method, value=None):
+    """
+        Impute missing data without prompting, using one of the IMPUTATION_METHODS names.
+        Mean, median and regression skip non-numeric columns. Returns the list of skipped columns.
+    """
+    if method not in IMPUTATION_METHODS:
+        raise ValueError(f"Unknown imputation method '{method}'")
+    if method == "drop_rows":
+        df.dropna(axis=0, inplace=True)
+        return []
+    if method == "drop_columns":
+        drop_columns(df, df.columns[df.isnull().any().to_numpy()])
+        return []
+
+    strategy = method if method != "custom" else {"custom": value}
+    strategies = {col: strategy for col in df.columns[df.isnull().any().to_numpy()]}
+    return fill_columns(df, strategies)
+
+def fill_columns(df, strategies):
+    """
+        Impute missing data without prompting, with a method per column: one of the IMPUTATION_METHODS
+        names or {"custom": value}. All fill values are computed first and written in place,
+        then the regression columns are imputed together by a ChainedImputer.
+        Mean, median and regression skip non-numeric columns. Returns the list of skipped columns.
+    """
+    fill_strategies = {}
+    regression = []
+    drop_rows = []
+    dropped = []
+    for col, strategy in strategies.items():
+        if isinstance(strategy, dict) or strategy in FILL_STRATEGIES:
+            if strategy == "custom":
+                raise ValueError(f"Custom imputation of column '{col}' needs a value: {{\"custom\": value}}")
+            fill_strategies[col] = strategy
+        elif strategy == "regression":
+            regression.append(col)
+        elif strategy == "drop_rows":
+            drop_rows.append(col)
+        elif strategy == "drop_columns":
+            dropped.append(col)
+        else:
+            raise ValueError(f"Unknown imputation method '{strategy}' for column '{col}'")
+    imputer = Imputer(strategy=None, columns=fill_strategies)
+    if fill_strategies:
+        imputer.fit_transform(df)
+    skipped = imputer.skipped_ + [col for col in regression if is_text_column(df[col])]
+    regression = [col for col in regression if col not in skipped]
+    if regression:
+        ChainedImputer(columns=regression).fit_transform(df)
+    if drop_rows:
+        df.dropna(subset=drop_rows, inplace=True)
+    if dropped:
+        drop_columns(df, dropped)
+    return skipped
@@ -1,21 +1,27 @@
+import time
+import tracemalloc
 from termcolor import cprint
 import pandas as pd
 from sklearn.metrics import classification_report
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from scoring import offer_save_model
 
-def model_menu(df):
+def model_menu(df, pipeline=None, correlations=None):
     """
         Prompt the user to train a classification model on the current DataFrame.
+        Saved models include the FittedPipeline of the preprocessing, if given, and the feature
+        selection shows the correlations with the target from the CorrelationCache, if given.
     """
     
     choices = [
         "Train a Decision Tree Classifier",
         "Train a Random Forest Classifier",
         "Train a Linear Regression Model",
+        "Compare the classifiers (cross-validated, timed)",
         "Back"
     ]
     
@@ -26,81 +32,174 @@ def model_menu(df):
         try:
             choice = int(input("Select an option: "))
             if choice == 1:
-                train_decision_tree(df)
+                train_decision_tree(df, pipeline, correlations)
             elif choice == 2:
-                train_random_forest(df)
+                train_random_forest(df, pipeline, correlations)
             elif choice == 3:
-                train_linear_regression(df)
+                train_linear_regression(df, pipeline, correlations)
             elif choice == 4:
+                target = select_target(df)
+                features = select_features(df, target, correlations)
+                compare_models(df, target, features, ["decision_tree", "random_forest"])
+            elif choice == 5:
                 return
             else:
                 cprint("[-] Invalid choice. Please try again!", "red")
         except ValueError:
             cprint("[-] Invalid input. Please enter a number.", "red")
             
-def train_decision_tree(df):
+MODELS = {
+    "decision_tree": DecisionTreeClassifier,
+    "random_forest": RandomForestClassifier,
+    "linear_regression": LinearRegression
+}
+
+REGRESSION_MODELS = ("linear_regression",)
+
+PARALLEL_MODELS = ("random_forest",)
+
+MAX_RANKED_FEATURES = 10
+
+PARAM_GRIDS = {
+    "decision_tree": {"max_depth": [None, 5, 10, 20], "min_samples_leaf": [1, 5, 20]},
+    "random_forest": {"n_estimators": [100, 300], "max_depth": [None, 10, 20]},
+    "linear_regression": {"fit_intercept": [True, False]}
+}
+
+def build_model(model_name, n_jobs=-1, **params):
+    """Create one of the MODELS, spreading the work of the parallel ones over n_jobs cores."""
+    if model_name in PARALLEL_MODELS:
+        params.setdefault("n_jobs", n_jobs)
+    return MODELS[model_name](**params)
+
+def timed(function, *args):
+    """Call function and return its result, the wall time in seconds and the peak traced memory in bytes."""
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    if not tracing:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+def evaluate_model(df, model_name, target, features, cv=5, search=False, n_jobs=-1):
     """
-        Train a Decision Tree Classifier on the DataFrame.
+        Train one of the MODELS on an 80/20 split and return the fitted model and a report with the
+        k-fold cross-validation score on the training rows (cv=None skips it), the parameters found by a
+        parallel grid search (if search), the test predictions and the fit/predict wall time and peak memory.
+        Cross-validation folds and search candidates run in parallel on n_jobs cores.
     """
-    
-    target = select_target(df)
-    features = select_features(df, target)
-    
     X = df[features]
     y = df[target]
-    
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    report = {"model": model_name, "params": {}, "cv_scores": None}
+
+    if search:
+        grid = GridSearchCV(build_model(model_name, n_jobs=1), PARAM_GRIDS[model_name], cv=cv or 5,
+                            n_jobs=n_jobs, refit=False)
+        grid.fit(X_train, y_train)
+        report["params"] = grid.best_params_
+        report["cv_scores"] = [grid.cv_results_[f"split{i}_test_score"][grid.best_index_]
+                               for i in range(grid.n_splits_)]
+    elif cv:
+        report["cv_scores"] = list(cross_val_score(build_model(model_name, n_jobs=1), X_train, y_train,
+                                                   cv=cv, n_jobs=n_jobs))
+
+    model = build_model(model_name, n_jobs, **report["params"])
+    _, report["fit_seconds"], fit_peak = timed(model.fit, X_train, y_train)
+    y_pred, report["predict_seconds"], predict_peak = timed(model.predict, X_test)
+    report["peak_memory_mb"] = max(fit_peak, predict_peak) / 2**20
+    report["predict_rows_per_second"] = len(X_test) / report["predict_seconds"] if report["predict_seconds"] else 0.0
+    report["test_score"] = model.score(X_test, y_test)
+    report["y_test"] = y_test
+    report["y_pred"] = y_pred
+    return model, report
+
+def print_timing(report):
+    """Print the cross-validation score and the timing of a report returned by evaluate_model."""
+    if report["params"]:
+        cprint(f"[*] Best parameters: {report['params']}", "blue")
+    if report["cv_scores"] is not None:
+        scores = pd.Series(report["cv_scores"])
+        cprint(f"[*] {len(scores)}-fold cross-validation score: {scores.mean():.4f} (+/- {scores.std():.4f})", "blue")
+    cprint(f"[*] Fit: {report['fit_seconds']:.3f}s, predict: {report['predict_seconds']:.3f}s "
+           f"({report['predict_rows_per_second']:,.0f} rows/s), peak memory: {report['peak_memory_mb']:.1f} MB", "blue")
+
+def train_model(df, model_name, target, features, cv=5, search=False, n_jobs=-1):
+    """
+        Train one of the MODELS on the given target and feature columns without prompting,
+        print its cross-validation score, test metrics and timing and return the fitted model.
+    """
+    model, report = evaluate_model(df, model_name, target, features, cv, search, n_jobs)
+    y_test = report["y_test"]
+    y_pred = report["y_pred"]
+
+    print_timing(report)
+    if model_name in REGRESSION_MODELS:
+        cprint(f"Mean Absolute Error: {mean_absolute_error(y_test, y_pred)}", "green")
+        cprint(f"Mean Squared Error: {mean_squared_error(y_test, y_pred)}", "green")
+        cprint(f"R2 Score: {r2_score(y_test, y_pred)}", "green")
+    else:
+        cprint(classification_report(y_test, y_pred), "green")
+        cprint(f"Accuracy: {report['test_score']}", "green")
+    return model
+
+def compare_models(df, target, features, model_names, cv=5, n_jobs=-1):
+    """Cross-validate and time several MODELS on the same split, print a comparison table and return it."""
+    rows = []
+    for model_name in model_names:
+        cprint(f"[*] Training {model_name}...", "blue")
+        _, report = evaluate_model(df, model_name, target, features, cv, n_jobs=n_jobs)
+        scores = pd.Series(report["cv_scores"])
+        rows.append({"model": model_name, "cv_score": scores.mean(), "cv_std": scores.std(),
+                     "test_score": report["test_score"], "fit_s": report["fit_seconds"],
+                     "predict_s": report["predict_seconds"], "predict_rows_per_s": report["predict_rows_per_second"],
+                     "peak_mb": report["peak_memory_mb"]})
+    table = pd.DataFrame(rows).set_index("model")
+    cprint(table.to_string(float_format=lambda value: f"{value:.4f}"), "green")
+    return table
+
+def select_training_options():
+    """Ask whether to tune the hyperparameters with a parallel cross-validated grid search."""
+    answer = input("Tune hyperparameters with a parallel cross-validated grid search? (y/n): ")
+    return {"search": answer.lower() == 'y'}
+
+def train_decision_tree(df, pipeline=None, correlations=None):
+    """
+        Train a Decision Tree Classifier on the DataFrame.
+    """
     
-    model = DecisionTreeClassifier()
-    model.fit(X_train, y_train)
-    
-    y_pred = model.predict(X_test)
-    
-    cprint(classification_report(y_test, y_pred), "green")
-    cprint(f"Accuracy: {model.score(X_test, y_test)}", "green")
+    target = select_target(df)
+    features = select_features(df, target, correlations)
+    model = train_model(df, "decision_tree", target, features, **select_training_options())
+    offer_save_model(model, features, target, pipeline)
+    return model
     
-def train_random_forest(df):
+def train_random_forest(df, pipeline=None, correlations=None):
     """
         Train a Random Forest Classifier on the DataFrame.
     """
     
     target = select_target(df)
-    features = select_features(df, target)
-    
-    X = df[features]
-    y = df[target]
-    
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    model = RandomForestClassifier()
-    model.fit(X_train, y_train)
+    features = select_features(df, target, correlations)
+    model = train_model(df, "random_forest", target, features, **select_training_options())
+    offer_save_model(model, features, target, pipeline)
+    return model
     
-    y_pred = model.predict(X_test)
-    
-    cprint(classification_report(y_test, y_pred), "green")
-    cprint(f"Accuracy: {model.score(X_test, y_test)}", "green")
-    
-def train_linear_regression(df):
+def train_linear_regression(df, pipeline=None, correlations=None):
     """
         Train a Linear Regression model on the DataFrame.
     """
     
     target = select_target(df)
-    features = select_features(df, target)
-    
-    X = df[features]
-    y = df[target]
-    
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-    
-    y_pred = model.predict(X_test)
-    
-    cprint(f"Mean Absolute Error: {mean_absolute_error(y_test, y_pred)}", "green")
-    cprint(f"Mean Squared Error: {mean_squared_error(y_test, y_pred)}", "green")
-    cprint(f"R2 Score: {r2_score(y_test, y_pred)}", "green")
+    features = select_features(df, target, correlations)
+    model = train_model(df, "linear_regression", target, features, **select_training_options())
+    offer_save_model(model, features, target, pipeline)
+    return model
     
 def select_target(df):
     """
@@ -113,15 +212,28 @@ def select_target(df):
     choice = int(input("Enter the number corresponding to the target column: "))
     return df.columns[choice-1]
 
-def select_features(df, target):
+def select_features(df, target, correlations=None):
     """
         Prompt the user to select the feature columns for the model.
+        With a CorrelationCache of the frame and a numeric target, every column is shown with its absolute
+        correlation with the target and an empty answer selects the most correlated columns.
     """
     
+    ranked = None
+    if correlations is not None and target in correlations.sync(df).columns:
+        ranked = correlations.correlated_with(target)
     cprint("\n[*] Select the feature columns for the model (separate by commas):", "blue")
     for i, col in enumerate(df.columns, 1):
-        cprint(f"[{i}] {col}", "blue")
-    choices = input("Enter column numbers: ").replace(',', ' ').replace(';', ' ').split()
+        if ranked is not None and col in ranked.index:
+            cprint(f"[{i}] {col} (|r| = {ranked[col]:.2f})", "blue")
+        else:
+            cprint(f"[{i}] {col}", "blue")
+    prompt = "Enter column numbers: "
+    if ranked is not None and len(ranked):
+        prompt = f"Enter column numbers (press Enter for the {min(MAX_RANKED_FEATURES, len(ranked))} most correlated): "
+    choices = input(prompt).replace(',', ' ').replace(';', ' ').split()
     choices = [choice.strip() for choice in choices]
+    if not choices and ranked is not None:
+        return list(ranked.index[:MAX_RANKED_FEATURES])
     
     return [df.columns[int(choice)-1] for choice in choices if df.columns[int(choice)-1] != target] 
\ No newline at end of file
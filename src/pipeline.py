@@ -0,0 +1,275 @@
+import json
+import os
+from termcolor import cprint
+from data_loader import read_data, read_columns, write_data
+from missing_data import IMPUTATION_METHODS, fill_columns
+from categorical_data import encode_column
+from encoders import ENCODERS, EncoderRegistry
+from dtype_optimizer import optimize_dtypes
+from utils import is_text_column
+from dedupe import drop_duplicate_rows
+from inplace import drop_columns
+from casting import CAST_TYPES, cast_columns
+
+STEP_OPERATIONS = ("cast", "impute", "encode", "dedupe", "drop", "optimize", "save", "train")
+SINK_OPERATIONS = ("save", "train")
+ALL_COLUMNS = None
+
+
+def load_spec(filename):
+    """Load a pipeline spec from a JSON or YAML file."""
+    with open(filename) as f:
+        if os.path.splitext(filename)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML pipeline specs require pyyaml. Install it with 'pip install pyyaml'.")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    validate_spec(spec)
+    return spec
+
+
+def validate_spec(spec):
+    """Check that every step of the spec is a known operation with its required arguments."""
+    if not isinstance(spec, dict) or not isinstance(spec.get("steps"), list):
+        raise ValueError("A pipeline spec must be a mapping with a 'steps' list")
+    required = {"cast": ("columns",), "encode": ("column",), "drop": ("columns",), "save": ("path",),
+                "train": ("model", "target")}
+    for i, step in enumerate(spec["steps"], 1):
+        op = step.get("op") if isinstance(step, dict) else None
+        if op not in STEP_OPERATIONS:
+            raise ValueError(f"Step {i}: unknown operation '{op}', expected one of {', '.join(STEP_OPERATIONS)}")
+        for key in required.get(op, ()):
+            if key not in step:
+                raise ValueError(f"Step {i}: '{op}' needs '{key}'")
+        if op == "encode" and step.get("method", "ordinal") not in ENCODERS:
+            raise ValueError(f"Step {i}: unknown encoding '{step['method']}', expected one of {', '.join(ENCODERS)}")
+        if op == "cast":
+            for col, cast in step["columns"].items():
+                kind = cast if isinstance(cast, str) else cast[0]
+                if kind not in CAST_TYPES:
+                    raise ValueError(f"Step {i}: unknown type '{kind}' for '{col}', "
+                                     f"expected one of {', '.join(CAST_TYPES)}")
+        if op == "impute":
+            strategies = [step.get("strategy")] + list(step.get("columns", {}).values())
+            for strategy in strategies:
+                if strategy is not None and not isinstance(strategy, dict) and strategy not in IMPUTATION_METHODS:
+                    raise ValueError(f"Step {i}: unknown imputation method '{strategy}'")
+
+
+def _reads(step):
+    """Columns whose values a step depends on (ALL_COLUMNS if it depends on every column)."""
+    op = step["op"]
+    if op == "impute":
+        # Regression predicts a column from every other numeric column; other fills only read the column they fill
+        if _drops_rows(step) or _uses_strategy(step, "regression"):
+            return ALL_COLUMNS
+        return {col for layer in step.get("layers", [step]) for col in layer.get("columns", {})}
+    if op == "encode":
+        return {step["column"], step.get("target")} - {None}
+    if op == "cast":
+        return set(step["columns"])
+    if op == "dedupe":
+        return set(step["subset"]) if step.get("subset") else ALL_COLUMNS
+    if op == "save":
+        return ALL_COLUMNS
+    if op == "train":
+        return set(step["features"]) | {step["target"]} if step.get("features") else ALL_COLUMNS
+    return set()
+
+
+def _uses_strategy(step, method):
+    layers = step.get("layers", [step])
+    return any(strategy == method for layer in layers
+               for strategy in [layer.get("strategy")] + list(layer.get("columns", {}).values()))
+
+
+def _drops_rows(step):
+    return _uses_strategy(step, "drop_rows")
+
+
+def _mutates(step):
+    return step["op"] not in ("save", "train", "optimize")
+
+
+def plan_pipeline(steps):
+    """
+        Turn the spec steps into an execution plan. Returns (excluded, planned, notes): the columns
+        that never need to be loaded, the steps to run and a description of every optimization made.
+    """
+    notes = []
+    sinks = [i for i, step in enumerate(steps) if step["op"] in SINK_OPERATIONS]
+    if not sinks:
+        notes.append("no 'save' or 'train' step, the pipeline produces no output")
+        return set(), [], notes
+    if sinks[-1] < len(steps) - 1:
+        notes.append(f"skipped {len(steps) - 1 - sinks[-1]} step(s) after the last save/train step")
+    steps = [dict(step) for step in steps[:sinks[-1] + 1]]
+
+    excluded = set()
+    for i, step in enumerate(steps):
+        if step["op"] != "drop":
+            continue
+        hoisted = []
+        earlier = [_reads(previous) for previous in steps[:i]]
+        for col in step["columns"]:
+            if all(reads is not ALL_COLUMNS and col not in reads for reads in earlier):
+                hoisted.append(col)
+        if hoisted:
+            excluded.update(hoisted)
+            step["columns"] = [col for col in step["columns"] if col not in hoisted]
+            notes.append(f"columns {', '.join(hoisted)} are not loaded at all")
+    steps = [step for step in steps if step["op"] != "drop" or step["columns"]]
+
+    planned = []
+    for step in steps:
+        previous = planned[-1] if planned else None
+        if step["op"] == "impute" and previous is not None and previous["op"] == "impute" \
+                and not _drops_rows(previous):
+            previous["layers"] = previous.get("layers", [previous.copy()]) + [step]
+            notes.append("fused consecutive impute steps into a single fill")
+            continue
+        if step["op"] == "dedupe":
+            last_mutation = next((s for s in reversed(planned) if _mutates(s)), None)
+            if last_mutation is not None and last_mutation["op"] == "dedupe" \
+                    and last_mutation.get("subset") == step.get("subset"):
+                notes.append("skipped a repeated dedupe step")
+                continue
+        planned.append(step)
+    return excluded, planned, notes
+
+
+def resolve_strategies(df, step):
+    """Pick the imputation method of every column with missing data for a (possibly fused) impute step."""
+    null_counts = df.isnull().sum()
+    strategies = {}
+    for col in df.columns[null_counts.to_numpy() > 0]:
+        for layer in step.get("layers", [step]):
+            strategy = layer.get("columns", {}).get(col, layer.get("strategy"))
+            if strategy is None:
+                continue
+            if strategy in ("mean", "median", "regression") and is_text_column(df[col]):
+                continue
+            strategies[col] = strategy
+            break
+    return strategies
+
+
+ENCODER_PARAMETERS = ("order", "target", "max_categories", "n_components", "smoothing")
+
+
+def run_step(df, step, source, encoders):
+    """Execute one planned step on the DataFrame in place (fitted encoders are reused from the registry)."""
+    op = step["op"]
+    if op == "cast":
+        cast_columns(df, step["columns"])
+    elif op == "impute":
+        strategies = resolve_strategies(df, step)
+        skipped = fill_columns(df, strategies)
+        for col in skipped:
+            cprint(f"[!] Non-numeric column '{col}' was not imputed.", "yellow")
+        cprint(f"[+] Imputed {len(strategies) - len(skipped)} columns.", "green")
+    elif op == "encode":
+        column = step["column"]
+        method = step.get("method", "ordinal")
+        if column in encoders:
+            encoders.transform(df, [column])
+        else:
+            params = {key: step[key] for key in ENCODER_PARAMETERS if key in step}
+            encoders.add(encode_column(df, column, method, **params))
+        cprint(f"[+] Column '{column}' has been {method} encoded.", "green")
+    elif op == "dedupe":
+        removed = drop_duplicate_rows(df, step.get("subset"))
+        cprint(f"[+] {removed} duplicate rows removed!", "green")
+    elif op == "drop":
+        drop_columns(df, step["columns"])
+        cprint(f"[+] Columns {', '.join(step['columns'])} dropped!", "green")
+    elif op == "optimize":
+        optimize_dtypes(df)
+    elif op == "save":
+        path = step["path"].format(stem=os.path.splitext(os.path.basename(source))[0])
+        write_data(df, path)
+        cprint(f"[+] DataFrame saved to '{path}'!", "green")
+    elif op == "train":
+        from model_menu import train_model
+        features = step.get("features") or [col for col in df.columns if col != step["target"]]
+        model = train_model(df, step["model"], step["target"], features, cv=step.get("cv", 5),
+                            search=step.get("search", False))
+        if step.get("model_path"):
+            from scoring import save_model
+            path = step["model_path"].format(stem=os.path.splitext(os.path.basename(source))[0])
+            save_model(model, features, step["target"], filename=path)
+
+
+def run_snapshotted(file, planned, encoders, snapshots, read_options):
+    """
+        Run the planned steps on a file, snapshotting the frame after every step that changes it. Steps whose
+        snapshot already exists (same file content, read options, encoders and steps) are skipped and the run
+        continues from the memory-mapped snapshot; save and train steps always run. Returns the encoders.
+    """
+    import joblib
+    fitted = joblib.hash(encoders)
+    df, cached, done, skipped = None, None, [], 0
+    for step in planned:
+        if step["op"] not in SINK_OPERATIONS:
+            done.append(step)
+            key = snapshots.key([file], [fitted, done], read_options)
+            if df is None and key in snapshots:
+                cached, skipped = key, skipped + 1
+                continue
+        if df is None and cached is None:
+            df = read_data(file, **read_options)
+        elif df is None:
+            df, encoders = snapshots.load(cached)
+            cprint(f"[*] Skipped {skipped} step(s) already snapshotted.", "blue")
+        run_step(df, step, file, encoders)
+        if step["op"] not in SINK_OPERATIONS:
+            snapshots.save(key, df, encoders, label=", ".join(done_step["op"] for done_step in done))
+    return encoders
+
+
+def run_pipeline(spec, files=None, snapshots=None):
+    """
+        Run a pipeline spec on its input files (or on the given files) without any prompts.
+        Intermediate frames are cached in the SnapshotCache, if given.
+    """
+    files = files or spec.get("input")
+    if isinstance(files, str):
+        files = [files]
+    if not files:
+        raise ValueError("No input files given for the pipeline")
+
+    excluded, planned, notes = plan_pipeline(spec["steps"])
+    cprint("[*] Pipeline plan:", "blue")
+    for i, step in enumerate(planned, 1):
+        cprint(f"[{i}] {step['op']}", "blue")
+    for note in notes:
+        cprint(f"[!] {note}", "yellow")
+    if not planned:
+        return
+
+    encoders_file = spec.get("encoders")
+    if encoders_file is not None and os.path.exists(encoders_file):
+        encoders = EncoderRegistry.load(encoders_file)
+        cprint(f"[*] Using the encoders saved in '{encoders_file}'.", "blue")
+    else:
+        encoders = EncoderRegistry()
+
+    for file in files:
+        cprint(f"\n[*] Running pipeline on '{file}'...", "blue")
+        columns = spec.get("columns")
+        if excluded:
+            columns = [col for col in columns or read_columns(file) if col not in excluded]
+        read_options = {"columns": columns, "filters": spec.get("filters")}
+        if snapshots is not None:
+            encoders = run_snapshotted(file, planned, encoders, snapshots, read_options)
+            continue
+        df = read_data(file, **read_options)
+        for step in planned:
+            run_step(df, step, file, encoders)
+    if encoders_file is not None and not os.path.exists(encoders_file):
+        encoders.save(encoders_file)
+        cprint(f"[+] Fitted encoders saved to '{encoders_file}'.", "green")
+    cprint("[*] Pipeline complete!", "green")
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+LARGE_FRAME_ROWS = 200_000
+SAMPLE_SIZE = 50_000
+DEFAULT_BINS = 100
+
+
+def reservoir_sample(chunks, size=SAMPLE_SIZE, random_state=0):
+    """
+        Uniform sample of at most size rows from an iterable of DataFrames, read once: every row gets a
+        random key and the rows with the size smallest keys are kept, merged chunk by chunk.
+    """
+    rng = np.random.default_rng(random_state)
+    sample = None
+    keys = np.empty(0)
+    for chunk in chunks:
+        chunk_keys = rng.random(len(chunk))
+        if sample is None:
+            sample, keys = chunk, chunk_keys
+        else:
+            sample, keys = pd.concat([sample, chunk]), np.concatenate([keys, chunk_keys])
+        if len(keys) > size:
+            keep = np.argpartition(keys, size)[:size]
+            sample, keys = sample.iloc[keep], keys[keep]
+    if sample is None:
+        return pd.DataFrame()
+    return sample.iloc[np.argsort(keys, kind="stable")]
+
+
+def sample_rows(df, size=SAMPLE_SIZE, random_state=0):
+    """Uniform sample of at most size rows of an in-memory frame (the frame itself if it is small enough)."""
+    if len(df) <= size:
+        return df
+    rng = np.random.default_rng(random_state)
+    return df.iloc[np.sort(rng.choice(len(df), size, replace=False))]
+
+
+def stratified_sample(df, column, size=SAMPLE_SIZE, random_state=0):
+    """
+        Sample about size rows keeping the share of every value of column, with at least one row per value
+        so that rare groups still show up. Rows are ranked by a random key within their group in one pass.
+    """
+    if len(df) <= size:
+        return df
+    rng = np.random.default_rng(random_state)
+    groups = df[column].astype(object).where(df[column].notnull(), "<missing>")
+    keys = pd.Series(rng.random(len(df)), index=df.index)
+    ranks = keys.groupby(groups.to_numpy()).rank(method="first").to_numpy()
+    sizes = groups.map(groups.value_counts()).to_numpy()
+    quotas = np.maximum(1, np.round(sizes * size / len(df)))
+    return df.iloc[np.flatnonzero(ranks <= quotas)]
+
+
+class BinCache:
+    """
+        Histogram bins of the numeric columns of a frame, computed once with NumPy and shared by every plot:
+        each column is digitized a single time, and 1D and 2D histograms are bincounts of the cached codes.
+    """
+
+    def __init__(self, df, bins=DEFAULT_BINS):
+        self.df = df
+        self.bins = bins
+        self._edges = {}
+        self._codes = {}
+        self._counts = {}
+
+    def edges(self, col):
+        """Bin edges of a column, spanning its finite values."""
+        if col not in self._edges:
+            values = self.df[col].to_numpy(dtype=float, na_value=np.nan)
+            finite = values[np.isfinite(values)]
+            if len(finite) == 0:
+                self._edges[col] = np.linspace(0, 1, self.bins + 1)
+            else:
+                low, high = finite.min(), finite.max()
+                if low == high:
+                    low, high = low - 0.5, high + 0.5
+                self._edges[col] = np.linspace(low, high, self.bins + 1)
+        return self._edges[col]
+
+    def codes(self, col):
+        """Bin index of every row of a column (-1 for missing values)."""
+        if col not in self._codes:
+            edges = self.edges(col)
+            values = self.df[col].to_numpy(dtype=float, na_value=np.nan)
+            codes = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, self.bins - 1)
+            codes[~np.isfinite(values)] = -1
+            self._codes[col] = codes
+        return self._codes[col]
+
+    def histogram(self, col):
+        """Counts per bin of a column and the bin edges."""
+        if col not in self._counts:
+            codes = self.codes(col)
+            self._counts[col] = np.bincount(codes[codes >= 0], minlength=self.bins)
+        return self._counts[col], self.edges(col)
+
+    def histogram2d(self, col1, col2):
+        """Counts per pair of bins of two columns (rows of col1 bins, columns of col2 bins) and both edges."""
+        codes1, codes2 = self.codes(col1), self.codes(col2)
+        valid = (codes1 >= 0) & (codes2 >= 0)
+        counts = np.bincount(codes1[valid] * self.bins + codes2[valid], minlength=self.bins * self.bins)
+        return counts.reshape(self.bins, self.bins), self.edges(col1), self.edges(col2)
+
+
+def binned_kde(counts, edges):
+    """
+        Gaussian KDE of a column evaluated at the bin centres from its histogram (Scott's bandwidth), so the
+        cost depends on the number of bins instead of the number of rows. Returns the centres and the density.
+    """
+    centres = (edges[:-1] + edges[1:]) / 2
+    total = counts.sum()
+    width = edges[1] - edges[0]
+    if total < 2:
+        return centres, np.zeros(len(centres))
+    mean = (counts * centres).sum() / total
+    std = np.sqrt((counts * (centres - mean) ** 2).sum() / (total - 1))
+    bandwidth = max(std * total ** (-1 / 5), width)
+    offsets = np.arange(-len(centres) + 1, len(centres)) * width
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    density = np.convolve(counts, kernel)[len(centres) - 1:2 * len(centres) - 1]
+    density /= density.sum() * width
+    return centres, density
@@ -0,0 +1,182 @@
+import hashlib
+import html
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from termcolor import cprint
+import pandas as pd
+from plot_engine import LARGE_FRAME_ROWS, BinCache, sample_rows
+
+PLOT_KINDS = ("histogram", "boxplot", "scatter", "heatmap")
+PLOT_FORMATS = ("png", "svg")
+CACHE_FILE = ".plot_cache.json"
+# Payloads are built lazily, at most this many per worker waiting to be drawn at a time
+PAYLOADS_PER_WORKER = 2
+
+
+def column_fingerprint(series):
+    """Hash of the name, dtype and values of a column, used to tell whether its plots must be redrawn."""
+    digest = hashlib.sha1(f"{series.name}|{series.dtype}".encode())
+    digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_plot(kind, title, payload, path):
+    """Draw one figure with the Agg backend and save it to path (runs in a worker process)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    fig, ax = plt.subplots(figsize=(10, 8) if kind == "heatmap" else (6.4, 4.8))
+    if kind == "histogram" and "counts" in payload:
+        ax.stairs(payload["counts"], payload["edges"], fill=True)
+    elif kind == "histogram":
+        ax.hist(payload["values"], bins="auto")
+    elif kind == "boxplot":
+        ax.boxplot(payload["values"], orientation="horizontal")
+    elif kind == "scatter" and "counts" in payload:
+        mesh = ax.pcolormesh(payload["edges_x"], payload["edges_y"], payload["counts"].T,
+                             norm=LogNorm(vmin=1), cmap="viridis")
+        fig.colorbar(mesh, ax=ax, label="rows")
+    elif kind == "scatter":
+        ax.scatter(payload["x"], payload["y"], s=4)
+    elif kind == "heatmap":
+        corr = payload["corr"]
+        image = ax.imshow(corr.to_numpy(), cmap="coolwarm", vmin=-1, vmax=1)
+        ax.set_xticks(range(len(corr.columns)), corr.columns, rotation=90)
+        ax.set_yticks(range(len(corr.columns)), corr.columns)
+        for i in range(len(corr)):
+            for j in range(len(corr)):
+                ax.text(j, i, f"{corr.iat[i, j]:.2f}", ha="center", va="center", fontsize=8)
+        fig.colorbar(image, ax=ax)
+    if kind == "scatter":
+        ax.set_xlabel(payload["labels"][0])
+        ax.set_ylabel(payload["labels"][1])
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def plan_plots(df, kinds=PLOT_KINDS, columns=None):
+    """
+        List the figures to export as (kind, columns, title) for the numeric columns among the given ones
+        (all by default): one histogram and boxplot per column, one scatter plot per pair and one heatmap.
+    """
+    columns = [col for col in columns or df.columns
+               if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+    jobs = []
+    for kind in kinds:
+        if kind in ("histogram", "boxplot"):
+            jobs += [(kind, [col], f"{kind.capitalize()} of {col}") for col in columns]
+        elif kind == "scatter":
+            jobs += [(kind, [col1, col2], f"Scatter plot of {col1} vs {col2}")
+                     for i, col1 in enumerate(columns) for col2 in columns[i + 1:]]
+        elif kind == "heatmap" and len(columns) >= 2:
+            jobs.append((kind, columns, "Correlation Heatmap"))
+    return jobs
+
+
+def plot_payload(df, kind, columns, bins=None):
+    """The data a worker needs to draw one figure: binned counts for large frames, values otherwise."""
+    if kind == "histogram" and bins is not None:
+        counts, edges = bins.histogram(columns[0])
+        return {"counts": counts, "edges": edges}
+    if kind == "histogram":
+        return {"values": df[columns[0]].dropna().to_numpy(dtype=float)}
+    if kind == "boxplot":
+        values = df[columns[0]].dropna()
+        return {"values": (sample_rows(values) if bins is not None else values).to_numpy(dtype=float)}
+    if kind == "scatter" and bins is not None:
+        counts, edges_x, edges_y = bins.histogram2d(*columns)
+        return {"counts": counts, "edges_x": edges_x, "edges_y": edges_y, "labels": columns}
+    if kind == "scatter":
+        pair = df[columns].dropna()
+        return {"x": pair[columns[0]].to_numpy(dtype=float), "y": pair[columns[1]].to_numpy(dtype=float),
+                "labels": columns}
+    return {"corr": df[columns].corr()}
+
+
+def plot_filename(kind, columns, fmt):
+    """File name of a figure, made safe for the file system."""
+    name = "heatmap" if kind == "heatmap" else "_".join([kind] + [str(col) for col in columns])
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name) + f".{fmt}"
+
+
+def write_report(output_dir, entries):
+    """Write an index.html showing every exported figure."""
+    rows = "\n".join(f'<figure><img src="{html.escape(os.path.basename(path))}" alt="{html.escape(title)}">'
+                     f'<figcaption>{html.escape(title)}</figcaption></figure>' for title, path in entries)
+    path = os.path.join(output_dir, "index.html")
+    with open(path, "w") as f:
+        f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Plots</title></head>\n<body>\n{rows}\n</body></html>\n")
+    return path
+
+
+def export_plots(df, output_dir="plots", kinds=PLOT_KINDS, columns=None, fmt="png", workers=None, report=True):
+    """
+        Render the selected plots of the numeric columns to files without a display, on a process pool.
+        The data of a figure is only prepared when a worker is about to be free, so few payloads are held at once.
+        A figure is skipped when its file exists and the data of its columns has not changed since it was
+        drawn (fingerprints are kept in a cache file in output_dir). Writes an index.html if report.
+        Returns the number of figures rendered and skipped.
+    """
+    if fmt not in PLOT_FORMATS:
+        raise ValueError(f"Unknown plot format '{fmt}', expected one of {', '.join(PLOT_FORMATS)}")
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    bins = BinCache(df) if len(df) > LARGE_FRAME_ROWS else None
+    fingerprints = {}
+    entries = []
+    pending = []
+    for kind, cols, title in plan_plots(df, kinds, columns):
+        for col in cols:
+            if col not in fingerprints:
+                fingerprints[col] = column_fingerprint(df[col])
+        key = "|".join([kind] + [fingerprints[col] for col in cols])
+        path = os.path.join(output_dir, plot_filename(kind, cols, fmt))
+        entries.append((title, path))
+        if cache.get(path) == key and os.path.exists(path):
+            continue
+        pending.append((kind, cols, title, path, key))
+
+    start = time.perf_counter()
+    skipped = len(entries) - len(pending)
+    rendered = 0
+    if pending:
+        cprint(f"[*] Rendering {len(pending)} plots ({skipped} unchanged plots skipped)...", "blue")
+        workers = workers or os.cpu_count()
+        jobs = iter(pending)
+        futures = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                for kind, cols, title, path, key in islice(jobs, workers * PAYLOADS_PER_WORKER - len(futures)):
+                    payload = plot_payload(df, kind, cols, bins)
+                    futures[executor.submit(render_plot, kind, title, payload, path)] = (path, key)
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, key = futures.pop(future)
+                    try:
+                        future.result()
+                        cache[path] = key
+                        rendered += 1
+                    except Exception as e:
+                        cprint(f"[-] {path}: {type(e).__name__}: {e}", "red")
+        with open(cache_path, "w") as f:
+            json.dump(cache, f, indent=2)
+    if report and entries:
+        write_report(output_dir, entries)
+    cprint(f"[+] {rendered} plots rendered and {skipped} skipped in {time.perf_counter() - start:.2f}s "
+           f"to '{output_dir}'.", "green")
+    return rendered, skipped
@@ -1,6 +1,10 @@
 import matplotlib.pyplot as plt
+import pandas as pd
 from termcolor import cprint
 import seaborn as sns
+from matplotlib.colors import LogNorm
+from plot_engine import LARGE_FRAME_ROWS, BinCache, binned_kde, sample_rows
+from plot_export import PLOT_KINDS, export_plots
 
 
 def select_columns(df):
@@ -34,17 +38,25 @@ def select_columns(df):
             continue
 
 
-def plot_menu(df):
-    """Display a menu to the user to plot various types of graphs."""
+def plot_menu(df, correlations=None):
+    """
+        Display a menu to the user to plot various types of graphs.
+        The heatmap reads the CorrelationCache of the frame, if given, instead of correlating all the rows.
+    """
     
     choices = [
         "Histogram",
         "Boxplot",
         "Scatter plot",
         "Correlation heatmap",
+        "Export plots to files",
         "Back"
     ]
-    
+    bins = None
+    if len(df) > LARGE_FRAME_ROWS:
+        cprint(f"[*] {len(df)} rows: histograms and scatter plots are pre-binned, boxplots use a sample.", "blue")
+        bins = BinCache(df)
+
     while True:
         cprint("\n[*] Plot Menu:", "yellow")
         for i, choice in enumerate(choices, 1):
@@ -52,14 +64,16 @@ def plot_menu(df):
         try:
             choice = int(input("Select an option: ").strip())
             if choice == 1:
-                plot_histogram(df)
+                plot_histogram(df, bins)
             elif choice == 2:
-                plot_boxplot(df)
+                plot_boxplot(df, bins is not None)
             elif choice == 3:
-                plot_scatter(df)
+                plot_scatter(df, bins)
             elif choice == 4:
-                plot_heatmap(df)
+                plot_heatmap(df, correlations)
             elif choice == 5:
+                export_menu(df)
+            elif choice == 6:
                 cprint("[*] Returning to main menu...", "green")
                 return
             else:
@@ -68,49 +82,65 @@ def plot_menu(df):
             cprint("[-] Invalid input. Please enter a number.", "red")
 
 
-def plot_histogram(df):
-    """Plot a histogram for the selected columns in the DataFrame."""
+def plot_histogram(df, bins=None):
+    """Plot a histogram for the selected columns in the DataFrame (from the cached bins of a BinCache, if given)."""
     selected_columns = select_columns(df)
     
     for col in selected_columns:
-        if df[col].dtype in ['int64', 'float64']:
+        if pd.api.types.is_numeric_dtype(df[col]):
             plt.figure()
-            sns.histplot(df[col], kde=True)
+            if bins is not None:
+                counts, edges = bins.histogram(col)
+                centres, density = binned_kde(counts, edges)
+                plt.stairs(counts, edges, fill=True, alpha=0.5)
+                plt.plot(centres, density * counts.sum() * (edges[1] - edges[0]))
+            else:
+                sns.histplot(df[col], kde=True)
             plt.title(f"Histogram of {col}")
             plt.show()
 
 
-def plot_boxplot(df):
-    """Plot a boxplot for the selected columns in the DataFrame."""
+def plot_boxplot(df, sample=False):
+    """Plot a boxplot for the selected columns in the DataFrame (of a uniform sample of the rows, if sample)."""
     selected_columns = select_columns(df)
     
     for col in selected_columns:
-        if df[col].dtype in ['int64', 'float64']:
+        if pd.api.types.is_numeric_dtype(df[col]):
             plt.figure()
-            sns.boxplot(x=df[col])
+            sns.boxplot(x=sample_rows(df[[col]])[col] if sample else df[col])
             plt.title(f"Boxplot of {col}")
             plt.show()
 
 
-def plot_scatter(df):
-    """Plot a scatter plot for a pair of selected columns in the DataFrame."""
+def plot_scatter(df, bins=None):
+    """
+        Plot a scatter plot for a pair of selected columns in the DataFrame. With a BinCache, a 2D histogram
+        of the cached bins is drawn instead of one marker per row.
+    """
     selected_columns = select_columns(df)
     
     if len(selected_columns) >= 2:
         for i, col1 in enumerate(selected_columns):
             for col2 in selected_columns[i+1:]:
-                if df[col1].dtype in ['int64', 'float64'] and df[col2].dtype in ['int64', 'float64']:
+                if pd.api.types.is_numeric_dtype(df[col1]) and pd.api.types.is_numeric_dtype(df[col2]):
                     plt.figure()
-                    sns.scatterplot(x=col1, y=col2, data=df)
+                    if bins is not None:
+                        counts, edges1, edges2 = bins.histogram2d(col1, col2)
+                        plt.pcolormesh(edges1, edges2, counts.T, norm=LogNorm(vmin=1), cmap="viridis")
+                        plt.colorbar(label="rows")
+                        plt.xlabel(col1)
+                        plt.ylabel(col2)
+                    else:
+                        sns.scatterplot(x=col1, y=col2, data=df)
                     plt.title(f"Scatter plot of {col1} vs {col2}")
                     plt.show()
     else:
         cprint("[-] Please select at least two columns for scatter plot.", "red")
 
 
-def plot_heatmap(df):
-    """Plot a correlation heatmap for the DataFrame with only numeric columns."""
-    numeric_df = df.select_dtypes(include=['int64', 'float64'])
+def plot_heatmap(df, correlations=None):
+    """Plot a correlation heatmap for the DataFrame with only numeric columns (from its CorrelationCache, if given)."""
+    numeric_df = df.select_dtypes(include='number')
     
     if numeric_df.empty:
         cprint("[-] No numeric columns found for correlation heatmap.", "red")
@@ -122,8 +152,23 @@ def plot_heatmap(df):
         cprint(F"[!] Warning: {len(df.columns)-len(numeric_df.columns)} non-numeric columns are ignored in correlation heatmap.", "yellow")
 
     plt.figure(figsize=(10, 8))
-    sns.heatmap(numeric_df.corr(), annot=True, cmap='coolwarm', fmt=".2f")
+    corr = correlations.sync(df).corr(list(numeric_df.columns)) if correlations is not None else numeric_df.corr()
+    sns.heatmap(corr, annot=True, cmap='coolwarm', fmt=".2f")
     plt.title("Correlation Heatmap")
     plt.show()
 
 
+def export_menu(df):
+    """Prompt for the plots to export and render them to files without showing them."""
+    columns = select_columns(df)
+    kinds = input(f"Plot types ({', '.join(PLOT_KINDS)}; default: all): ").replace(',', ' ').split() or PLOT_KINDS
+    unknown = [kind for kind in kinds if kind not in PLOT_KINDS]
+    if unknown:
+        cprint(f"[-] Unknown plot types: {', '.join(unknown)}", "red")
+        return
+    output_dir = input("Output directory (default: plots): ") or "plots"
+    fmt = input("Format (png or svg, default: png): ") or "png"
+    try:
+        export_plots(df, output_dir, kinds, columns, fmt)
+    except Exception as e:
+        cprint(f"[-] An error occurred while exporting the plots: {e}", "red")
@@ -0,0 +1,163 @@
+import json
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+from utils import is_text_column
+from sketches import HyperLogLog, KLLSketch, TopK, value_hashes
+from dedupe import HashStore, duplicate_mask, row_hashes
+
+PROFILE_CHUNK_ROWS = 1_000_000
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class DataProfile:
+    """
+        Per-column statistics of a frame or file collected in one pass over its chunks: null counts,
+        distinct counts (HyperLogLog), min/max/mean, quantiles (KLL), the most frequent values and the
+        number of duplicate rows. Profiles of several chunks or files can be merged.
+    """
+
+    def __init__(self, top_k=10, precision=14, kll_k=200):
+        self.top_k = top_k
+        self.precision = precision
+        self.kll_k = kll_k
+        self.rows = 0
+        self.duplicate_rows = 0
+        self.columns = {}
+
+    def _column(self, col, series):
+        if col not in self.columns:
+            numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            self.columns[col] = {
+                "dtype": str(series.dtype),
+                "nulls": 0,
+                "sum": 0.0,
+                "min": None,
+                "max": None,
+                "distinct": HyperLogLog(self.precision),
+                "quantiles": KLLSketch(self.kll_k) if numeric else None,
+                "top": TopK(max(100, 10 * self.top_k))
+            }
+        return self.columns[col]
+
+    def update(self, chunk, hash_store=None):
+        """Add a chunk to the profile (a shared HashStore also counts duplicates across chunks)."""
+        self.rows += len(chunk)
+        hashes = row_hashes(chunk)
+        duplicated = hash_store.filter_new(hashes) if hash_store is not None else duplicate_mask(hashes)
+        self.duplicate_rows += int(duplicated.sum())
+
+        null_counts = chunk.isnull().sum()
+        ordered = [col for col in chunk.columns
+                   if not is_text_column(chunk[col]) and not pd.api.types.is_bool_dtype(chunk[col])]
+        minimums, maximums = chunk[ordered].min(), chunk[ordered].max()
+        for col in chunk.columns:
+            series = chunk[col]
+            stats = self._column(col, series)
+            stats["nulls"] += int(null_counts[col])
+            stats["distinct"].add(value_hashes(series))
+            stats["top"].update(series)
+            if col in minimums.index and pd.notnull(minimums[col]):
+                stats["min"] = minimums[col] if stats["min"] is None else min(stats["min"], minimums[col])
+                stats["max"] = maximums[col] if stats["max"] is None else max(stats["max"], maximums[col])
+            if stats["quantiles"] is not None:
+                values = series.to_numpy(dtype=float, na_value=np.nan)
+                stats["sum"] += float(np.nansum(values))
+                stats["quantiles"].update(values)
+        return self
+
+    def merge(self, other):
+        """Merge the profile of another chunk or file (duplicates are only counted within each profile)."""
+        self.rows += other.rows
+        self.duplicate_rows += other.duplicate_rows
+        for col, theirs in other.columns.items():
+            if col not in self.columns:
+                self.columns[col] = theirs
+                continue
+            stats = self.columns[col]
+            stats["nulls"] += theirs["nulls"]
+            stats["sum"] += theirs["sum"]
+            if theirs["min"] is not None:
+                stats["min"] = theirs["min"] if stats["min"] is None else min(stats["min"], theirs["min"])
+                stats["max"] = theirs["max"] if stats["max"] is None else max(stats["max"], theirs["max"])
+            stats["distinct"].merge(theirs["distinct"])
+            stats["top"].merge(theirs["top"])
+            if stats["quantiles"] is not None and theirs["quantiles"] is not None:
+                stats["quantiles"].merge(theirs["quantiles"])
+        return self
+
+    def null_count(self):
+        """Total number of missing values."""
+        return sum(stats["nulls"] for stats in self.columns.values())
+
+    def missing_columns(self):
+        """Columns with at least one missing value."""
+        return [col for col, stats in self.columns.items() if stats["nulls"] > 0]
+
+    def distinct(self, col):
+        """Estimated number of distinct non-missing values of a column."""
+        return self.columns[col]["distinct"].estimate()
+
+    def may_be_unique(self, col):
+        """False if the column surely has missing or repeated values (allowing for the distinct count error)."""
+        stats = self.columns[col]
+        error = 3 * stats["distinct"].relative_error
+        return stats["nulls"] == 0 and self.distinct(col) >= (1 - error) * self.rows
+
+    def to_dict(self):
+        """The profile as JSON-serializable data."""
+        columns = {}
+        for col, stats in self.columns.items():
+            count = self.rows - stats["nulls"]
+            summary = {"dtype": stats["dtype"], "count": count, "nulls": stats["nulls"],
+                       "distinct": self.distinct(col), "min": stats["min"], "max": stats["max"]}
+            if stats["quantiles"] is not None:
+                summary["mean"] = stats["sum"] / count if count else None
+                for q, value in zip(PROFILE_QUANTILES, stats["quantiles"].quantiles(PROFILE_QUANTILES)):
+                    summary[f"{int(q * 100)}%"] = None if np.isnan(value) else float(value)
+            summary["top"] = stats["top"].top(self.top_k)
+            columns[str(col)] = summary
+        return {"rows": self.rows, "duplicate_rows": self.duplicate_rows, "columns": columns}
+
+    def save(self, filename):
+        """Save the profile as JSON."""
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=_json_value)
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def profile_chunks(chunks, **options):
+    """Profile an iterable of DataFrames in one pass."""
+    profile = DataProfile(**options)
+    with HashStore() as hash_store:
+        for chunk in chunks:
+            profile.update(chunk, hash_store)
+    return profile
+
+
+def profile_frame(df, chunksize=PROFILE_CHUNK_ROWS, **options):
+    """Profile an in-memory DataFrame in one pass over slices of chunksize rows."""
+    if len(df) <= chunksize:
+        return DataProfile(**options).update(df)
+    return profile_chunks((df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize)), **options)
+
+
+def profile_file(filename, chunksize=PROFILE_CHUNK_ROWS, **read_options):
+    """Profile a data file chunk by chunk without loading it into memory."""
+    from data_loader import read_data
+    return profile_chunks(read_data(filename, chunksize=chunksize, **read_options))
+
+
+def print_profile(profile):
+    """Print the profile as a table with one row per column."""
+    summary = profile.to_dict()
+    cprint(f"\n[*] {summary['rows']} rows, {len(summary['columns'])} columns, "
+           f"{summary['duplicate_rows']} duplicate rows.", "blue")
+    table = pd.DataFrame.from_dict(summary["columns"], orient="index")
+    table["top"] = [", ".join(f"{value} ({count})" for value, count in top[:3]) for top in table["top"]]
+    cprint(table.to_string(), "blue")
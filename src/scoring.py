@@ -0,0 +1,93 @@
+import os
+import time
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+from data_loader import read_data, save_chunks
+from dedupe import HashStore
+
+
+class ModelBundle:
+    """
+        A trained model saved together with its feature list, target name and the FittedPipeline of the
+        preprocessing it was trained after (if recorded), so new files can be scored the same way.
+    """
+
+    def __init__(self, model, features, target=None, pipeline=None):
+        self.model = model
+        self.features = list(features)
+        self.target = target
+        self.pipeline = pipeline
+
+    def predict(self, df, prediction_column="prediction"):
+        """
+            Add the predictions for the rows of an already preprocessed df in place. Rows with a
+            missing feature get a missing prediction instead of failing the whole chunk.
+        """
+        X = df[self.features]
+        complete = X.notnull().all(axis=1).to_numpy()
+        if complete.all():
+            df[prediction_column] = self.model.predict(X)
+            return df
+        positions = np.flatnonzero(complete)
+        predictions = self.model.predict(X.iloc[positions]) if len(positions) else []
+        df[prediction_column] = pd.Series(predictions, index=positions).reindex(range(len(df))).to_numpy()
+        return df
+
+    def save(self, filename):
+        """Save the model bundle with joblib."""
+        import joblib
+        joblib.dump(self, filename)
+        cprint(f"[+] Model saved to '{filename}' with {len(self.features)} features!", "green")
+
+    @staticmethod
+    def load(filename):
+        """Load a model saved with ModelBundle.save."""
+        import joblib
+        return joblib.load(filename)
+
+
+def save_model(model, features, target=None, pipeline=None, filename=None):
+    """Prompt for a file name (unless given) and save the model with its features and preprocessing."""
+    if filename is None:
+        filename = input("Enter the filename to save the model (default: model.joblib): ") or "model.joblib"
+    try:
+        ModelBundle(model, features, target, pipeline).save(filename)
+    except Exception as e:
+        cprint(f"[-] An error occurred while saving the model: {e}", "red")
+
+
+def offer_save_model(model, features, target=None, pipeline=None):
+    """Ask whether to save a freshly trained model."""
+    if input("Do you want to save the trained model? (y/n): ").lower() == 'y':
+        save_model(model, features, target, pipeline)
+
+
+def predictions_path(filename, output_dir):
+    """Return the path of the predictions file for an input file."""
+    stem, extension = os.path.splitext(os.path.basename(filename))
+    return os.path.join(output_dir, f"{stem}_predictions{extension or '.csv'}")
+
+
+def score_file(model_file, filename, output=None, chunksize=100_000, prediction_column="prediction", **read_options):
+    """
+        Stream a file through the saved preprocessing and model chunk by chunk and write every row with
+        its prediction to output. Returns the number of rows scored and prints the throughput.
+    """
+    bundle = ModelBundle.load(model_file) if isinstance(model_file, str) else model_file
+    output = output or predictions_path(filename, ".")
+    start = time.perf_counter()
+    with HashStore() as hash_store:
+        def scored(chunks):
+            written = 0
+            for chunk in chunks:
+                if bundle.pipeline is not None:
+                    bundle.pipeline.transform(chunk, hash_store, written, filename)
+                written += len(chunk)
+                yield bundle.predict(chunk, prediction_column)
+
+        rows = save_chunks(scored(read_data(filename, chunksize=chunksize, **read_options)), output)
+    seconds = time.perf_counter() - start
+    cprint(f"[+] Scored {rows} rows of '{filename}' in {seconds:.2f}s "
+           f"({rows / seconds if seconds else 0:,.0f} rows/s), predictions saved to '{output}'.", "green")
+    return rows
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+
+
+def value_hashes(series):
+    """64-bit hash of every non-missing value of a column."""
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy()
+
+
+class HyperLogLog:
+    """
+        Distinct count estimate from 2^precision 6-bit registers (relative error about 1.04 / sqrt(2^precision),
+        0.8% for the default precision). Sketches of chunks, files or workers are merged with a register max.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes):
+        """Add 64-bit hashes to the sketch."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return self
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        rank = np.full(len(hashes), bits + 1, dtype=np.uint8)
+        nonzero = rest > 0
+        rank[nonzero] = bits - np.floor(np.log2(rest[nonzero].astype(float))).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """Merge another sketch of the same precision into this one."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """Estimated number of distinct hashes added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class KLLSketch:
+    """
+        Mergeable quantile sketch (KLL): values are kept in sorted compactors whose capacity shrinks by 2/3
+        per level, and a full compactor promotes every other value to the next level with double weight.
+        With k=200 the rank error is about 1%, whatever the number of values.
+    """
+
+    def __init__(self, k=200, random_state=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(random_state)
+
+    @classmethod
+    def for_error(cls, epsilon, random_state=0):
+        """Sketch sized for a rank error of about epsilon."""
+        return cls(k=int(np.ceil(2 / epsilon)), random_state=random_state)
+
+    def _capacity(self, level):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - level))))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                kept = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(kept)]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        """Add an array of values (missing values are ignored)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Merge another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Approximate quantiles for the probabilities qs (NaN when the sketch is empty)."""
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        result = values[np.minimum(positions, len(values) - 1)]
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+    def quantile(self, q):
+        """Approximate quantile for the probability q."""
+        return float(self.quantiles([q])[0])
+
+
+class TopK:
+    """
+        Frequent values of a column (Misra-Gries summary, the mergeable form of space-saving): at most
+        capacity counters are kept, and a count is underestimated by at most the total error so far,
+        which is bounded by n / (capacity + 1).
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=float)
+        self.error = 0.0
+
+    @classmethod
+    def for_error(cls, epsilon):
+        """Summary whose counts are off by at most epsilon times the number of values."""
+        return cls(capacity=int(np.ceil(1 / epsilon)))
+
+    def _truncate(self):
+        if len(self.counts) > self.capacity:
+            counts = self.counts.sort_values(ascending=False, kind="stable")
+            cut = counts.iloc[self.capacity]
+            self.error += cut
+            counts = counts.iloc[:self.capacity] - cut
+            self.counts = counts[counts > 0]
+
+    def update(self, series):
+        """Count the non-missing values of a chunk of the column."""
+        return self.merge_counts(series.value_counts(sort=False))
+
+    def merge_counts(self, counts):
+        """Add value counts (a Series indexed by value) to the summary."""
+        self.counts = self.counts.add(counts.astype(float), fill_value=0)
+        self._truncate()
+        return self
+
+    def merge(self, other):
+        """Merge another summary into this one."""
+        self.error += other.error
+        return self.merge_counts(other.counts)
+
+    def top(self, k=10):
+        """The k most frequent values with their (lower bound) counts, most frequent first."""
+        counts = self.counts.sort_values(ascending=False, kind="stable").iloc[:k]
+        return [(value, int(count)) for value, count in counts.items()]
+
+
+class CountMinSketch:
+    """
+        Frequency estimates in a depth x width table of counters (width = e / epsilon rounded up to a power
+        of two, depth = ln(1 / delta)): a count is overestimated by more than epsilon times the number of
+        values with probability at most delta. Sketches with the same parameters are merged by addition.
+    """
+
+    def __init__(self, epsilon=0.001, delta=0.01, random_state=0):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.bits = max(1, int(np.ceil(np.log2(np.e / epsilon))))
+        depth = max(1, int(np.ceil(np.log(1 / delta))))
+        rng = np.random.default_rng(random_state)
+        self.multipliers = rng.integers(1, 2**63, depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.table = np.zeros((depth, 1 << self.bits), dtype=np.int64)
+        self.total = 0
+
+    def _buckets(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        return [((hashes * multiplier) >> np.uint64(64 - self.bits)).astype(np.intp) for multiplier in self.multipliers]
+
+    def add(self, hashes):
+        """Count 64-bit value hashes."""
+        for row, buckets in enumerate(self._buckets(hashes)):
+            self.table[row] += np.bincount(buckets, minlength=self.table.shape[1])
+        self.total += len(hashes)
+        return self
+
+    def estimate(self, hashes):
+        """Estimated counts (never underestimated) of the values with the given hashes."""
+        return np.min([self.table[row][buckets] for row, buckets in enumerate(self._buckets(hashes))], axis=0)
+
+    def merge(self, other):
+        """Merge a sketch built with the same parameters and random_state."""
+        self.table += other.table
+        self.total += other.total
+        return self
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import shutil
+import time
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = ".snapshots"
+HASH_BLOCK = 1 << 20
+
+
+def file_digest(filename):
+    """SHA-256 of the content of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """
+        Content-addressed on-disk cache of intermediate frames. A snapshot is keyed by the hash of the input
+        files, the read options and the operations applied to them, so the same operations on unchanged files
+        always map to the same snapshot. NumPy columns are stored as .npy files and memory-mapped copy-on-write
+        on reload (pages are only read, and only copied, when they are used); the other columns are stored in
+        one uncompressed Arrow IPC file whose buffers are memory-mapped as well.
+    """
+
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+        self._digests = {}
+
+    def digest(self, filename):
+        """Content hash of an input file, computed once per file version."""
+        stat = os.stat(filename)
+        version = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+        if version not in self._digests:
+            self._digests[version] = file_digest(filename)
+        return self._digests[version]
+
+    def origin(self, files, read_options=None):
+        """Hash of the input files and the options they are read with."""
+        import joblib
+        return joblib.hash([[self.digest(file) for file in files], read_options or {}])
+
+    def key(self, files, steps, read_options=None):
+        """Key of the snapshot of the files after the given operations."""
+        import joblib
+        return joblib.hash([self.origin(files, read_options), steps])
+
+    def path(self, key):
+        """Directory of a snapshot."""
+        return os.path.join(self.directory, key)
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self.path(key), "meta.joblib"))
+
+    def save(self, key, df, state=None, origin=None, label=None):
+        """
+            Store df (and any state needed to continue from it, like a FittedPipeline) under key. The snapshot is
+            written to a temporary directory and renamed, so an interrupted save never leaves a partial snapshot.
+            Returns False if the snapshot could not be written.
+        """
+        import joblib
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        if key in self:
+            return True
+        target = self.path(key)
+        temporary = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(temporary, exist_ok=True)
+            index = df.index
+            if isinstance(index, pd.RangeIndex):
+                index_meta = ("range", index.start, index.stop, index.step)
+            else:
+                index_meta = ("npy", index.name)
+                np.save(os.path.join(temporary, "index.npy"), index.to_numpy(), allow_pickle=True)
+            kinds, arrow_columns = [], {}
+            for i in range(df.shape[1]):
+                column = df.iloc[:, i]
+                if isinstance(column.dtype, np.dtype):
+                    kind = "pickle" if column.dtype == object else "npy"
+                    np.save(os.path.join(temporary, f"{i}.npy"), column.to_numpy(), allow_pickle=kind == "pickle")
+                else:
+                    kind = "arrow"
+                    arrow_columns[str(i)] = column
+                kinds.append(kind)
+            if arrow_columns:
+                table = pa.Table.from_pandas(pd.DataFrame(arrow_columns, copy=False), preserve_index=False)
+                with ipc.new_file(os.path.join(temporary, "columns.arrow"), table.schema) as writer:
+                    writer.write_table(table)
+            meta = {"columns": list(df.columns), "kinds": kinds, "index": index_meta, "rows": len(df),
+                    "state": state, "origin": origin, "label": label, "created": time.time()}
+            joblib.dump(meta, os.path.join(temporary, "meta.joblib"))
+            os.replace(temporary, target)
+        except Exception as e:
+            shutil.rmtree(temporary, ignore_errors=True)
+            cprint(f"[!] Snapshot not saved: {e}", "yellow")
+            return False
+        return True
+
+    def meta(self, key):
+        """Metadata of a snapshot (columns, state, origin, label and creation time)."""
+        import joblib
+        return joblib.load(os.path.join(self.path(key), "meta.joblib"))
+
+    def load(self, key):
+        """Memory-map a snapshot. Returns (df, state)."""
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        path = self.path(key)
+        meta = self.meta(key)
+        arrow = None
+        if "arrow" in meta["kinds"]:
+            arrow = ipc.open_file(pa.memory_map(os.path.join(path, "columns.arrow"))).read_all().to_pandas()
+        columns = {}
+        for i, kind in enumerate(meta["kinds"]):
+            if kind == "arrow":
+                columns[i] = arrow[str(i)].array
+            else:
+                columns[i] = np.load(os.path.join(path, f"{i}.npy"), mmap_mode="c" if kind == "npy" else None,
+                                     allow_pickle=kind == "pickle")
+        if meta["index"][0] == "range":
+            index = pd.RangeIndex(*meta["index"][1:])
+        else:
+            index = pd.Index(np.load(os.path.join(path, "index.npy"), allow_pickle=True), name=meta["index"][1])
+        df = pd.DataFrame(columns, index=index, copy=False)
+        df.columns = meta["columns"]
+        return df, meta["state"]
+
+    def latest(self, origin):
+        """Key of the most recent snapshot of the given origin (None if there is none)."""
+        if not os.path.isdir(self.directory):
+            return None
+        found = []
+        for key in os.listdir(self.directory):
+            if key in self:
+                meta = self.meta(key)
+                if meta["origin"] == origin:
+                    found.append((meta["created"], key))
+        return max(found)[1] if found else None
+
+
+def resume_snapshot(cache, files, read_options=None):
+    """
+        Offer to continue from the latest snapshot of the files, if there is one.
+        Returns (df, pipeline) of the snapshot or None if the files should be loaded from scratch.
+    """
+    key = cache.latest(cache.origin(files, read_options))
+    if key is None:
+        return None
+    meta = cache.meta(key)
+    operations = len(meta["state"]) if meta["state"] is not None else 0
+    answer = input(f"[?] Resume from the snapshot taken after {operations} operations "
+                   f"({meta['label']})? (y/n): ")
+    if answer.strip().lower() != "y":
+        return None
+    df, pipeline = cache.load(key)
+    cprint(f"[+] Resumed from snapshot '{key}' ({len(df)} rows, {df.shape[1]} columns).", "green")
+    return df, pipeline
+
+
+def pipeline_checkpoint(cache, files, pipeline, read_options=None):
+    """A menu checkpoint that snapshots the frame under the operations recorded in the pipeline so far."""
+    origin = cache.origin(files, read_options)
+
+    def checkpoint(df):
+        label = ", ".join(step["op"] for step in pipeline.steps) or "loaded"
+        cache.save(cache.key(files, pipeline.steps, read_options), df, pipeline, origin, label)
+    return checkpoint
@@ -0,0 +1,177 @@
+from termcolor import cprint
+import numpy as np
+import pandas as pd
+from data_loader import load_data, save_chunks
+from missing_data import ApproximateImputer, METHOD_NAMES, get_imputation_method
+from dedupe import HashStore, row_hashes
+from casting import Caster
+from inplace import fill_column
+
+STREAMABLE_METHODS = (1, 2, 4, 5, 6, 7)
+# Exact median and mode keep one count per distinct value; a column with more values is sketched instead
+MAX_COUNTED_VALUES = 1_000_000
+
+
+def scan_chunks(filename, chunksize, **read_options):
+    """First pass over the file: count rows, missing values and the sums needed for the mean."""
+    rows = 0
+    null_counts = None
+    sums = None
+    counts = None
+    for chunk in load_data(filename, chunksize=chunksize, **read_options):
+        rows += len(chunk)
+        chunk_nulls = chunk.isnull().sum()
+        numeric = chunk.select_dtypes(include="number")
+        chunk_sums = numeric.sum()
+        chunk_counts = numeric.count()
+        if null_counts is None:
+            null_counts, sums, counts = chunk_nulls, chunk_sums, chunk_counts
+        else:
+            null_counts = null_counts.add(chunk_nulls, fill_value=0)
+            sums = sums.add(chunk_sums, fill_value=0)
+            counts = counts.add(chunk_counts, fill_value=0)
+    if null_counts is None:
+        null_counts, sums, counts = pd.Series(dtype=int), pd.Series(dtype=float), pd.Series(dtype=int)
+    return {"rows": rows, "null_counts": null_counts.astype(int), "sums": sums, "counts": counts}
+
+
+def count_values(filename, chunksize, value_columns, max_values=MAX_COUNTED_VALUES, **read_options):
+    """
+        Extra pass over the file: mergeable value counts for the given columns (used for median and mode).
+        A column is no longer counted once it has more than max_values distinct values, so memory stays bounded.
+        Returns the value counts and the columns that were given up.
+    """
+    value_counts = {col: pd.Series(dtype=float) for col in value_columns}
+    overflow = []
+    for chunk in load_data(filename, chunksize=chunksize, **read_options):
+        for col in list(value_counts):
+            counts = value_counts[col].add(chunk[col].value_counts(), fill_value=0)
+            if len(counts) > max_values:
+                del value_counts[col]
+                overflow.append(col)
+            else:
+                value_counts[col] = counts
+    return value_counts, overflow
+
+
+def median_from_counts(counts):
+    """Exact median of a column from its merged value counts."""
+    counts = counts.sort_index()
+    cumulative = counts.cumsum().to_numpy()
+    total = cumulative[-1]
+    lower = counts.index[np.searchsorted(cumulative, (total + 1) // 2)]
+    upper = counts.index[np.searchsorted(cumulative, total // 2 + 1)]
+    return (lower + upper) / 2
+
+
+def mode_from_counts(counts):
+    """Most frequent value of a column from its merged value counts (smallest value wins ties, like Series.mode)."""
+    return counts.sort_index().idxmax()
+
+
+def compute_fill_values(filename, chunksize, stats, method_choice, approximate=False, **read_options):
+    """
+        Compute the global fill value of every column with missing data for the chosen method.
+        With approximate, the median and mode come from sketches of bounded size instead of exact value counts;
+        exact counts are kept for up to MAX_COUNTED_VALUES distinct values per column, then sketched as well.
+    """
+    missing = [col for col, count in stats["null_counts"].items() if count > 0]
+    numeric = set(stats["sums"].index)
+    if method_choice in (4, 5):
+        skipped = [col for col in missing if col not in numeric]
+        for col in skipped:
+            cprint(f"[!] Skipping non-numeric column '{col}', it cannot be imputed in streaming mode.", "yellow")
+        missing = [col for col in missing if col in numeric]
+
+    if method_choice == 4:
+        return {col: stats["sums"][col] / stats["counts"][col] for col in missing if stats["counts"][col] > 0}
+    if method_choice == 7:
+        return {col: input(f"Provide a value to fill missing data in '{col}': ") for col in missing}
+
+    if approximate:
+        return sketch_fill_values(filename, chunksize, missing, method_choice, **read_options)
+
+    value_counts, overflow = count_values(filename, chunksize, missing, MAX_COUNTED_VALUES, **read_options)
+    reduce = median_from_counts if method_choice == 5 else mode_from_counts
+    fill_values = {col: reduce(counts) for col, counts in value_counts.items() if not counts.empty}
+    if overflow:
+        cprint(f"[!] {', '.join(map(str, overflow))}: more than {MAX_COUNTED_VALUES} distinct values, the "
+               f"{METHOD_NAMES[method_choice]} is estimated with a sketch instead.", "yellow")
+        fill_values.update(sketch_fill_values(filename, chunksize, overflow, method_choice, **read_options))
+    return fill_values
+
+
+def sketch_fill_values(filename, chunksize, columns, method_choice, **read_options):
+    """Median or mode of the given columns estimated with sketches of bounded size, in one pass over the file."""
+    imputer = ApproximateImputer(METHOD_NAMES[method_choice])
+    for chunk in load_data(filename, chunksize=chunksize, **read_options):
+        imputer.partial_fit(chunk[columns])
+    return imputer.finalize().statistics_
+
+
+def process_chunks(filename, chunksize, method_choice=None, fill_values=None, drop_columns=(), remove_duplicates=False,
+                   hash_store=None, subset=None, **read_options):
+    """
+        Second pass over the file: impute and deduplicate every chunk with the global statistics.
+        Pass a shared HashStore to also remove rows already seen in earlier files.
+    """
+    store = hash_store if hash_store is not None else HashStore()
+    for chunk in load_data(filename, chunksize=chunksize, **read_options):
+        if drop_columns:
+            chunk = chunk.drop(columns=list(drop_columns))
+        if method_choice == 1:
+            chunk = chunk.dropna(axis=0)
+        elif fill_values:
+            for col, value in fill_values.items():
+                fill_column(chunk, col, value)
+        if remove_duplicates:
+            # Rows are hashed by value, so a chunk read as floats because of a gap still matches an int chunk
+            chunk = chunk[~store.filter_new(row_hashes(chunk, subset))]
+        yield chunk
+    if hash_store is None:
+        store.close()
+
+
+def stream_file(filename, chunksize, output=None, hash_store=None, subset=None, approximate=False, **read_options):
+    """
+        Run the initial preprocessing (missing data, duplicates, saving) on a data file chunk by chunk.
+        Extra keyword arguments (columns, filters, casts) are passed to load_data on every pass.
+        Duplicates are compared on the subset columns (all columns by default), and a shared
+        hash_store removes duplicates across files as well. With approximate, median and mode
+        imputation use sketches instead of exact value counts.
+    """
+    cprint(f"[*] Streaming '{filename}' in chunks of {chunksize} rows...", "blue")
+    stats = scan_chunks(filename, chunksize, **read_options)
+    null_count = int(stats["null_counts"].sum())
+    cprint(f"[*] {stats['rows']} rows, {len(stats['null_counts'])} columns.", "blue")
+
+    method_choice = None
+    fill_values = {}
+    drop_columns = []
+    if null_count == 0:
+        cprint("[+] No missing data found!", "green")
+    else:
+        cprint(f"\n[-] {null_count} missing values found!\n", "red")
+        while True:
+            method_choice = get_imputation_method()
+            if method_choice in STREAMABLE_METHODS:
+                break
+            cprint("[-] This method needs the whole dataset in memory and is not available in streaming mode.", "red")
+        if method_choice == 2:
+            drop_columns = [col for col, count in stats["null_counts"].items() if count > 0]
+        elif method_choice != 1:
+            fill_values = compute_fill_values(filename, chunksize, stats, method_choice, approximate, **read_options)
+
+    remove_duplicates = input("Do you want to remove duplicate data? (y/n): ").lower() == 'y'
+    caster = None
+    if read_options.get("casts"):
+        # The output pass counts the values that failed to parse over all the chunks
+        caster = read_options["casts"] = Caster(read_options["casts"])
+    chunks = process_chunks(filename, chunksize, method_choice, fill_values, drop_columns, remove_duplicates,
+                            hash_store, subset, **read_options)
+    rows = save_chunks(chunks, output)
+    if caster is not None:
+        caster.report()
+    if method_choice == 1 or remove_duplicates:
+        cprint(f"[+] {stats['rows'] - rows} rows removed!", "green")
+    cprint("[*] Streaming preprocessing complete!", "green")
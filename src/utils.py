@@ -1,28 +1,21 @@
+import importlib.util
 import subprocess
 import sys
 from termcolor import cprint
 
+REQUIRED_PACKAGES = ("numpy", "pandas", "matplotlib", "seaborn", "sklearn", "joblib", "pyarrow", "termcolor")
+
 def safe_import():
-    """Import required packages and install them if they are missing."""
-    try:
-        import numpy as np
-        import pandas as pd
-        import matplotlib.pyplot as plt
-        import seaborn as sns
-        from sklearn.model_selection import train_test_split
-        from sklearn.tree import DecisionTreeClassifier
-        from sklearn.ensemble import RandomForestClassifier
-        from sklearn.linear_model import LinearRegression
-        from sklearn.metrics import (accuracy_score, confusion_matrix, classification_report, 
-                                     roc_curve, roc_auc_score, precision_recall_curve, auc, f1_score,
-                                     mean_absolute_error, mean_squared_error, log_loss)
-        import joblib
-        from termcolor import cprint
-        from sklearn.preprocessing import OrdinalEncoder
-        cprint("[+] Packages imported successfully!", "green")
-    except ImportError:
-        cprint("[-] Package requirements unsatisfied. Downloading necessary packages...", "red")
+    """
+        Check that the required packages are installed and install them if they are missing.
+        The packages are only located, not imported: plotting and model training import them when first used.
+    """
+    missing = [name for name in REQUIRED_PACKAGES if importlib.util.find_spec(name) is None]
+    if missing:
+        cprint(f"[-] Package requirements unsatisfied ({', '.join(missing)}). Downloading necessary packages...", "red")
         install_requirements()
+    else:
+        cprint("[+] Required packages found!", "green")
 
 def install_requirements():
     """Install missing Python packages."""
@@ -33,22 +26,45 @@ def install_requirements():
         cprint(f"[-] Failed to install packages: {e}", "red")
         sys.exit(1)
 
-def remove_duplicates(df):
-    """Prompt the user to remove duplicate rows."""
-    if df.duplicated().sum() == 0:
+def is_text_column(series):
+    """Return True if the column holds strings or categories rather than numbers, dates or booleans."""
+    import pandas as pd
+    dtype = series.dtype
+    return (isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(dtype)
+            or pd.api.types.is_string_dtype(dtype))
+
+def remove_duplicates(df, subset=None, pipeline=None, profile=None, correlations=None):
+    """
+        Prompt the user to remove duplicate rows (compared on the subset columns only, if given).
+        The removal is recorded in the FittedPipeline, if given. A DataProfile of the current frame
+        saves hashing the rows again when it found no duplicates. The removed rows are subtracted
+        from the CorrelationCache of the frame, if given.
+    """
+    from dedupe import row_hashes, duplicate_mask, drop_rows
+    if profile is not None and subset is None and profile.duplicate_rows == 0:
+        cprint("[+] No duplicate data found!", "green")
+        return
+    mask = duplicate_mask(row_hashes(df, subset))
+    duplicates = int(mask.sum())
+    if duplicates == 0:
         cprint("[+] No duplicate data found!", "green")
         return
+    cprint(f"[!] {duplicates} duplicate rows found!", "yellow")
     if input("Do you want to remove duplicate data? (y/n): ").lower() == 'y':
-        df.drop_duplicates(inplace=True)
+        if correlations is not None:
+            correlations.remove_rows(df[mask])
+        drop_rows(df, mask)
         cprint("[+] Duplicate data removed!", "green")
+        if pipeline is not None:
+            pipeline.record("dedupe", subset=subset)
     else:
         cprint("[+] Duplicate data not removed.", "blue")
 
 def inspect_data(df):
-    """Print a preview, information, and description of the DataFrame."""
+    """Print a preview of the DataFrame and its one-pass profile. Returns the DataProfile."""
+    from profiling import profile_frame, print_profile
     cprint("[*] Preview of dataset:", "blue")
     cprint(df.head(), "blue")
-    cprint("\n\n[*] Data info:", "blue")
-    cprint(df.info(), "blue")
-    cprint("\n\n[*] Data description:", "blue")
-    cprint(df.describe(), "blue")
\ No newline at end of file
+    profile = profile_frame(df)
+    print_profile(profile)
+    return profile
\ No newline at end of file
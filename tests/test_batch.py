@@ -0,0 +1,55 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import unittest
+import numpy as np
+import pandas as pd
+from src.batch import output_paths, process_file, run_batch
+from src.fitted_pipeline import FittedPipeline
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        """Create two valid shard files and one broken file."""
+        self.files = ['test_shard_1.csv', 'test_shard_2.csv', 'test_missing_shard.csv']
+        self.output_dir = 'test_batch_output'
+        pd.DataFrame({'a': [1.0, np.nan, 3.0, 3.0], 'b': [1, 2, 4, 4]}).to_csv(self.files[0], index=False)
+        pd.DataFrame({'a': [np.nan, 2.0], 'b': [5, 6]}).to_csv(self.files[1], index=False)
+
+    def tearDown(self):
+        """Remove the shard files and the output directory."""
+        for filename in self.files:
+            if os.path.exists(filename):
+                os.remove(filename)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_run_batch_isolates_failures(self):
+        """Valid files are processed even though another file in the batch fails."""
+        results = run_batch(self.files, self.output_dir, workers=2, method='mean')
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok', 'failed'])
+        self.assertEqual(results[0]['duplicates'], 1)
+        self.assertEqual(results[0]['missing'], 1)
+        processed = pd.read_csv(results[0]['output'])
+        np.testing.assert_allclose(processed['a'], [1.0, 7 / 3, 3.0])
+        self.assertIn('FileNotFoundError', results[2]['error'])
+
+    def test_replayed_duplicates_are_counted(self):
+        """Rows removed by a recorded dedupe step are reported as duplicates."""
+        pipeline = FittedPipeline()
+        pipeline.record('dedupe', subset=None)
+        result = process_file(self.files[0], self.output_dir, pipeline=pipeline)
+        self.assertEqual((result['rows'], result['duplicates']), (3, 1))
+
+    def test_output_paths_are_unique(self):
+        """Files with the same name in different directories get different outputs; the same file twice fails."""
+        paths = output_paths([os.path.join('d1', 'part.csv'), os.path.join('d2', 'part.csv'), 'other.csv'], 'out')
+        self.assertEqual(paths, [os.path.join('out', 'd1_part_processed.csv'),
+                                 os.path.join('out', 'd2_part_processed.csv'),
+                                 os.path.join('out', 'other_processed.csv')])
+        with self.assertRaises(ValueError):
+            output_paths(['part.csv', os.path.join('.', 'part.csv')], 'out')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import unittest
+from synthetic import make_frame
+from run_benchmarks import compare, run_benchmarks
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_make_frame(self):
+        """The generated frame has the requested shape, gaps and duplicates."""
+        df = make_frame(5000, numeric=3, categorical=2, null_ratio=0.1, cardinality=20)
+        self.assertEqual(list(df.columns), ['num_0', 'num_1', 'num_2', 'cat_0', 'cat_1', 'label'])
+        self.assertAlmostEqual(df['num_0'].isnull().mean(), 0.1, delta=0.02)
+        self.assertLessEqual(df['cat_0'].nunique(), 20)
+        self.assertEqual(df['label'].isnull().sum(), 0)
+        self.assertGreater(df.duplicated().sum(), 0)
+
+    def test_run_and_compare(self):
+        """Stages are measured and compared with a baseline, ignoring differences below the noise floor."""
+        results = run_benchmarks(2000, ['fill_mean', 'remove_duplicates'], repeat=1)
+        self.assertEqual(set(results), {'fill_mean', 'remove_duplicates'})
+        self.assertGreater(results['fill_mean']['peak_mb'], 0)
+        baseline = {'fill_mean': {'seconds': 1e-4, 'peak_mb': 1e-3}}
+        self.assertEqual(compare(results, baseline), [])
+        slow = {'fill_mean': {'seconds': 10.0, 'peak_mb': 0.0}}
+        regressions = compare(slow, {'fill_mean': {'seconds': 1.0, 'peak_mb': 0.0}})
+        self.assertEqual(regressions, [('fill_mean', 'seconds', 10.0, 1.0)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.casting import Caster, cast_columns, cast_series, parse_cast
+from src.data_loader import read_data
+
+class TestCasting(unittest.TestCase):
+
+    def test_numbers(self):
+        """Numbers are parsed exactly, failures become missing and are counted."""
+        series = pd.Series([' 1', '2', 'x', None, '3.0', '12345678901234567'])
+        converted, failed = cast_series(series, 'integer')
+        self.assertEqual(str(converted.dtype), 'Int64')
+        self.assertEqual(converted.tolist(), [1, 2, pd.NA, pd.NA, 3, 12345678901234567])
+        self.assertEqual(failed, 1)
+        converted, failed = cast_series(pd.Series(['1.5', '-2e3', 'inf', '']), 'numeric')
+        np.testing.assert_array_equal(converted, [1.5, -2000.0, np.inf, np.nan])
+        self.assertEqual(failed, 1)
+        converted, failed = cast_series(pd.Series([1.0, 2.5, np.nan]), 'integer')
+        self.assertEqual(converted.tolist(), [1, pd.NA, pd.NA])
+        self.assertEqual(failed, 1)
+
+    def test_dates_booleans_and_categories(self):
+        """Dates (with a given or guessed format), booleans and categories are converted."""
+        converted, failed = cast_series(pd.Series(['02/01/2020', '31/12/2021', 'never']), 'datetime', '%d/%m/%Y')
+        self.assertEqual(converted.tolist()[:2], [pd.Timestamp('2020-01-02'), pd.Timestamp('2021-12-31')])
+        self.assertEqual(failed, 1)
+        converted, failed = cast_series(pd.Series(['2020-01-02 10:00:00.5', 'bad']), 'datetime')
+        self.assertEqual(converted[0], pd.Timestamp('2020-01-02 10:00:00.5'))
+        self.assertEqual(failed, 1)
+        converted, failed = cast_series(pd.Series(['Yes', 'no', '1', 'maybe']), 'bool')
+        self.assertEqual(converted.tolist(), [True, False, True, pd.NA])
+        self.assertEqual(failed, 1)
+        converted, failed = cast_series(pd.Series([1.0, 0.0, np.nan]), 'bool')
+        self.assertEqual(converted.tolist(), [True, False, pd.NA])
+        self.assertEqual(failed, 0)
+        self.assertEqual(cast_series(pd.Series([0, 2]), 'bool')[0].dtype, bool)
+        converted, failed = cast_series(pd.Series(['a', 'b', 'a']), 'category')
+        self.assertIsInstance(converted.dtype, pd.CategoricalDtype)
+        self.assertEqual(failed, 0)
+
+    def test_cast_columns_and_parse_cast(self):
+        """Several columns are cast in place and the command line syntax keeps the date format."""
+        df = pd.DataFrame({'a': ['1', '2'], 'b': ['t', 'f'], 'c': ['x', 'y']}, index=[5, 7])
+        failures = cast_columns(df, {'a': 'integer', 'b': ('bool', None), 'missing': 'float'}, report=False)
+        self.assertEqual(failures, {'a': 0, 'b': 0})
+        self.assertEqual(df['a'].dtype, np.int64)
+        self.assertEqual(df['b'].dtype, bool)
+        self.assertEqual(list(df.index), [5, 7])
+        self.assertEqual(parse_cast('when:datetime:%Y-%m-%d %H:%M'), ('when', 'datetime', '%Y-%m-%d %H:%M'))
+        with self.assertRaises(ValueError):
+            parse_cast('a:decimal')
+
+    def test_streaming_load(self):
+        """Chunks are cast as they are read and the failures are counted over the whole file."""
+        filename = 'test_casting_input.csv'
+        pd.DataFrame({'a': ['1', 'x', '3', 'y', '5'], 'b': ['2020-01-01'] * 5}).to_csv(filename, index=False)
+        try:
+            caster = Caster({'a': 'integer', 'b': 'datetime'})
+            chunks = list(read_data(filename, chunksize=2, casts=caster))
+            self.assertTrue(all(pd.api.types.is_datetime64_any_dtype(chunk['b']) for chunk in chunks))
+            self.assertEqual(pd.concat(chunks)['a'].tolist(), [1, pd.NA, 3, pd.NA, 5])
+            self.assertEqual(caster.failures, {'a': 2, 'b': 0})
+            df = read_data(filename, casts={'a': 'integer'}, filters=[('a', '>', 2)])
+            self.assertEqual(df['a'].tolist(), [3, 5])
+        finally:
+            os.remove(filename)
+
+if __name__ == '__main__':
+    unittest.main()
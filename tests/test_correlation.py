@@ -0,0 +1,75 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.correlation import CorrelationCache
+from src.chained_imputer import ChainedImputer
+
+class TestCorrelationCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up correlated numeric columns with large offsets, gaps and a text column."""
+        rng = np.random.default_rng(0)
+        a = rng.normal(size=2000)
+        self.df = pd.DataFrame({'a': a + 1e6, 'b': 3 * a + rng.normal(size=2000), 'c': rng.normal(size=2000) * 100,
+                                'text': ['x'] * 2000})
+        self.df.loc[rng.random(2000) < 0.1, 'c'] = np.nan
+
+    def assertMatches(self, cache, df):
+        numeric = df.select_dtypes(include='number')
+        pd.testing.assert_frame_equal(cache.corr(list(numeric.columns)), numeric.corr(), atol=1e-9)
+
+    def test_matches_pandas(self):
+        """The pairwise correlations and covariances equal DataFrame.corr and DataFrame.cov."""
+        cache = CorrelationCache().sync(self.df)
+        self.assertEqual(cache.columns, ['a', 'b', 'c'])
+        self.assertMatches(cache, self.df)
+        numeric = self.df[['a', 'b', 'c']]
+        pd.testing.assert_frame_equal(cache.cov(), numeric.cov(), rtol=1e-9)
+
+    def test_chunks_are_merged(self):
+        """Adding chunks one by one gives the statistics of the whole frame."""
+        cache = CorrelationCache()
+        for start in range(0, len(self.df), 300):
+            cache.update(self.df.iloc[start:start + 300])
+        self.assertMatches(cache, self.df)
+
+    def test_incremental_updates(self):
+        """Removed rows, dropped, changed and added columns are applied without a rebuild."""
+        cache = CorrelationCache().sync(self.df)
+        mask = np.zeros(len(self.df), dtype=bool)
+        mask[:250] = True
+        cache.remove_rows(self.df[mask])
+        df = self.df[~mask].copy()
+        self.assertMatches(cache, df)
+
+        df['c'] = df['c'].fillna(0)
+        cache.refresh_columns(df, ['c'])
+        self.assertMatches(cache, df)
+
+        df.drop(columns=['b'], inplace=True)
+        cache.drop_columns(['b'])
+        df['d'] = df['a'] ** 2
+        cache.sync(df)
+        self.assertEqual(cache.columns, ['a', 'c', 'd'])
+        self.assertMatches(cache, df)
+
+    def test_untracked_row_change_rebuilds(self):
+        """Rows removed behind the cache's back are detected by the row count."""
+        cache = CorrelationCache().sync(self.df)
+        df = self.df.iloc[100:]
+        self.assertMatches(cache.sync(df), df)
+
+    def test_chained_imputer_uses_matrix(self):
+        """The imputer accepts the cached correlation matrix for its predictor selection."""
+        df = self.df.drop(columns=['text'])
+        expected = df.copy()
+        ChainedImputer(columns=['c']).fit_transform(expected)
+        ChainedImputer(columns=['c']).fit_transform(df, CorrelationCache().sync(df).corr())
+        pd.testing.assert_frame_equal(df, expected)
+
+if __name__ == '__main__':
+    unittest.main()
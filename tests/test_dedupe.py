@@ -0,0 +1,80 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.dedupe import HashStore, drop_duplicate_rows, row_hashes, dedupe_chunks, dedupe_files
+
+class TestDedupe(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a frame with duplicate rows."""
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'a': rng.integers(0, 5, 200), 'b': rng.integers(0, 5, 200), 'c': rng.random(200).round(1)})
+        self.files = ['test_dedupe_1.csv', 'test_dedupe_2.csv']
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        for filename in self.files:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_drop_duplicate_rows(self):
+        """Hash-based deduplication matches drop_duplicates, also on a subset of columns and a non-unique index."""
+        for subset in (None, ['a', 'b']):
+            df = self.df.copy()
+            df.index = np.arange(len(df)) % 7
+            expected = df.drop_duplicates(subset=subset)
+            removed = drop_duplicate_rows(df, subset)
+            self.assertEqual(removed, len(self.df) - len(expected))
+            pd.testing.assert_frame_equal(df, expected)
+
+    def test_hash_store_spills_to_disk(self):
+        """Lookups give the same answer after the runs are spilled to memory-mapped files."""
+        hashes = row_hashes(self.df)
+        with HashStore(max_memory_rows=20) as store:
+            duplicated = np.concatenate([store.filter_new(hashes[i:i + 30]) for i in range(0, len(hashes), 30)])
+            self.assertTrue(store.disk_runs)
+            np.testing.assert_array_equal(duplicated, self.df.duplicated().to_numpy())
+            self.assertEqual(len(store), len(self.df.drop_duplicates()))
+
+    def test_dedupe_files(self):
+        """Rows duplicating a row of an earlier file are removed."""
+        self.df.iloc[:100].to_csv(self.files[0], index=False)
+        self.df.iloc[100:].to_csv(self.files[1], index=False)
+        dedupe_files(self.files, chunksize=25)
+        combined = pd.concat([pd.read_csv(filename) for filename in self.files], ignore_index=True)
+        expected = self.df.drop_duplicates().reset_index(drop=True)
+        pd.testing.assert_frame_equal(combined, expected)
+
+    def test_dedupe_files_across_dtypes(self):
+        """An int column in one file matches the same column read as floats (because of a gap) in another."""
+        with open(self.files[0], 'w') as f:
+            f.write('a,b\n1,x\n2,y\n')
+        with open(self.files[1], 'w') as f:
+            f.write('a,b\n1,x\n,z\n')
+        removed = dedupe_files(self.files)
+        self.assertEqual(removed, {self.files[0]: 0, self.files[1]: 1})
+        with open(self.files[0]) as f:
+            self.assertEqual(f.read(), 'a,b\n1,x\n2,y\n')
+        self.assertEqual(pd.read_csv(self.files[1])['b'].tolist(), ['z'])
+
+    def test_failed_rewrite_keeps_input(self):
+        """A file whose rewrite fails part way is left untouched and the error is raised."""
+        with open(self.files[0], 'w') as f:
+            f.write('a\n1\n1\n2\n3\n')
+
+        def failing(chunks, store, subset=None):
+            yield next(dedupe_chunks(chunks, store, subset))
+            raise OSError('disk full')
+        with mock.patch('src.dedupe.dedupe_chunks', side_effect=failing), self.assertRaises(OSError):
+            dedupe_files(self.files[:1], chunksize=2)
+        with open(self.files[0]) as f:
+            self.assertEqual(f.read(), 'a\n1\n1\n2\n3\n')
+        self.assertFalse(os.path.exists('test_dedupe_1.dedupe.csv'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.dtype_optimizer import optimize_dtypes
+
+class TestDtypeOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a frame with pandas default dtypes."""
+        n = 1000
+        self.df = pd.DataFrame({
+            'small_int': np.arange(n) % 100,
+            'negative_int': np.arange(n) - 500,
+            'half': np.arange(n) / 2,
+            'precise': np.arange(n) / 3,
+            'city': np.array(['Paris', 'Rome', 'Berlin', None], dtype=object)[np.arange(n) % 4],
+            'name': np.array([f'user{i}' for i in range(n)], dtype=object),
+            'date': pd.date_range('2024-01-01', periods=n).strftime('%Y-%m-%d').astype(object),
+        })
+        self.original = self.df.copy()
+
+    def test_optimize_dtypes(self):
+        """Columns are downcast without changing their values, and memory is saved."""
+        saved = optimize_dtypes(self.df, report=False)
+        self.assertGreater(saved, 0)
+        self.assertEqual(self.df['small_int'].dtype, np.uint8)
+        self.assertEqual(self.df['negative_int'].dtype, np.int16)
+        self.assertEqual(self.df['half'].dtype, np.float32)
+        self.assertEqual(self.df['precise'].dtype, np.float64)
+        self.assertIsInstance(self.df['city'].dtype, pd.CategoricalDtype)
+        self.assertFalse(isinstance(self.df['name'].dtype, pd.CategoricalDtype))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(self.df['date']))
+        for col in ('small_int', 'negative_int', 'half', 'precise'):
+            np.testing.assert_array_equal(self.df[col].to_numpy(dtype=float), self.original[col].to_numpy(dtype=float))
+        self.assertEqual(self.df['city'].isnull().sum(), self.original['city'].isnull().sum())
+
+if __name__ == '__main__':
+    unittest.main()
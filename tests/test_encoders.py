@@ -0,0 +1,55 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.encoders import EncoderRegistry, OneHotEncoder, OrdinalEncoder, TargetEncoder
+from src.categorical_data import ordinal_encode
+
+class TestEncoders(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a frame with a categorical column."""
+        self.df = pd.DataFrame({'size': ['M', 'S', 'L', 'M', None], 'city': ['a', 'b', 'a', 'c', 'a'],
+                                'y': [1.0, 0.0, 1.0, 0.0, 1.0]})
+        self.filename = 'test_encoders.joblib'
+
+    def tearDown(self):
+        """Remove the saved encoders."""
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_ordinal_order_and_unknown_values(self):
+        """Values are encoded by their position in the order, unknown and missing values become NaN."""
+        encoder = ordinal_encode(self.df, 'size', ['S', 'M', 'L'])
+        np.testing.assert_array_equal(self.df['size'], [1, 0, 2, 1, np.nan])
+        later = pd.DataFrame({'size': ['L', 'XL']})
+        encoder.transform(later)
+        np.testing.assert_array_equal(later['size'], [2, np.nan])
+
+    def test_onehot_columns(self):
+        """One-hot encoding replaces the column with one indicator column per fitted category."""
+        OneHotEncoder('city').fit(self.df).transform(self.df)
+        self.assertEqual(list(self.df.columns), ['size', 'city_a', 'city_b', 'city_c', 'y'])
+        self.assertEqual(self.df['city_a'].tolist(), [1, 0, 1, 0, 1])
+
+    def test_target_smoothing(self):
+        """Target means are shrunk towards the global mean, unknown values get the global mean."""
+        encoder = TargetEncoder('city', 'y', smoothing=1.0).fit(self.df)
+        later = pd.DataFrame({'city': ['a', 'z']})
+        encoder.transform(later)
+        np.testing.assert_allclose(later['city'], [(3 + 0.6) / 4, 0.6])
+
+    def test_registry_save_and_load(self):
+        """Saved encoders give the same encoding when applied to a new frame."""
+        registry = EncoderRegistry()
+        registry.add(OrdinalEncoder('size', ['S', 'M', 'L']).fit(self.df))
+        registry.add(OneHotEncoder('city').fit(self.df))
+        registry.save(self.filename)
+        expected = registry.transform(self.df.copy())
+        pd.testing.assert_frame_equal(EncoderRegistry.load(self.filename).transform(self.df.copy()), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import unittest
 import pandas as pd
-from src.data_loader import load_data, save_dataframe
+import numpy as np
+from src.data_loader import load_data, save_dataframe, save_chunks, parse_filter, expand_files, read_union, union_dtype
 from termcolor import cprint
 
 class TestDataLoader(unittest.TestCase):
@@ -53,5 +54,45 @@ class TestDataLoader(unittest.TestCase):
         # Clean up
         os.remove(output_file)
 
+    def test_columnar_round_trip(self):
+        """Test saving and loading Parquet and Feather files, detected by extension."""
+        for output_file in ('output_test_data.parquet', 'output_test_data.feather'):
+            save_dataframe(self.test_data, output_file)
+            df = load_data(output_file)
+            pd.testing.assert_frame_equal(df, self.test_data, check_dtype=False)
+            os.remove(output_file)
+
+    def test_column_projection_and_filters(self):
+        """Test that only the requested columns and matching rows are loaded."""
+        output_file = 'output_test_data.parquet'
+        save_dataframe(self.test_data, output_file)
+        expected = self.test_data[self.test_data['Age'] >= 30][['Name']].reset_index(drop=True)
+        for filename in (self.test_file, output_file):
+            df = load_data(filename, columns=['Name'], filters=[parse_filter('Age>=30')])
+            pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+        os.remove(output_file)
+
+    def test_save_chunks(self):
+        """Test writing chunks into a single Parquet file."""
+        output_file = 'output_test_data.parquet'
+        rows = save_chunks(load_data(self.test_file, chunksize=2), output_file)
+        self.assertEqual(rows, len(self.test_data))
+        pd.testing.assert_frame_equal(load_data(output_file), self.test_data, check_dtype=False)
+        os.remove(output_file)
+
+    def test_union_of_files(self):
+        """Test loading a glob of files as one table with aligned columns and promoted dtypes."""
+        shard = 'test_data_shard.parquet'
+        pd.DataFrame({'Age': [40.5], 'Name': ['Dana'], 'Team': ['A']}).to_parquet(shard, index=False)
+        files = expand_files(['test_data*'])
+        self.assertEqual(files, [self.test_file, shard])
+        df = read_union(files)
+        os.remove(shard)
+        self.assertEqual(list(df.columns), ['Name', 'Age', 'Occupation', 'Team'])
+        self.assertEqual(df['Age'].tolist(), [25.0, 30.0, 35.0, 40.5])
+        self.assertEqual(df['Team'].isnull().tolist(), [True, True, True, False])
+        self.assertEqual(union_dtype([np.dtype('int64')], complete=False), np.dtype(float))
+        self.assertEqual(union_dtype([np.dtype('int64'), pd.StringDtype(na_value=np.nan)]), np.dtype(object))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.fitted_pipeline import FittedPipeline
+from src.missing_data import Imputer
+from src.categorical_data import encode_column
+from src.dtype_optimizer import optimize_dtypes
+from src.batch import process_file
+
+class TestFittedPipeline(unittest.TestCase):
+
+    def setUp(self):
+        """Record a pipeline on a sample frame."""
+        sample = pd.DataFrame({'a': [1.0, np.nan, 3.0], 'size': ['S', 'L', 'M'], 'n': [1, 2, 3],
+                               'notes': ['x', 'y', 'z']})
+        self.pipeline = FittedPipeline()
+        self.pipeline.record("drop", columns=['notes'])
+        sample.drop(columns=['notes'], inplace=True)
+        self.pipeline.record("fill", imputer=Imputer('mean').fit(sample))
+        self.pipeline.record("encode", encoder=encode_column(sample, 'size', order=['S', 'M', 'L']))
+        self.pipeline.record("dedupe", subset=None)
+        optimize_dtypes(sample, report=False)
+        self.pipeline.record_dtypes(sample)
+        self.files = ['test_replay.csv', 'test_pipeline.joblib']
+        self.output_dir = 'test_replay_output'
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        for filename in self.files + [os.path.join(self.output_dir, 'test_replay_processed.csv')]:
+            if os.path.exists(filename):
+                os.remove(filename)
+        if os.path.exists(self.output_dir):
+            os.rmdir(self.output_dir)
+
+    def test_replay_without_refitting(self):
+        """A saved pipeline applies the fitted fill values, encodings and dtypes to a new frame."""
+        self.pipeline.save(self.files[1])
+        df = pd.DataFrame({'a': [np.nan, 5.0, 5.0], 'size': ['M', 'XL', 'XL'], 'n': [7, 9, 9], 'notes': ['', '', '']})
+        FittedPipeline.load(self.files[1]).transform(df)
+        self.assertEqual(list(df.columns), ['a', 'size', 'n'])
+        np.testing.assert_array_equal(df['a'], [2.0, 5.0])
+        np.testing.assert_array_equal(df['size'], [1, np.nan])
+        self.assertEqual(df['n'].dtype, np.uint8)
+
+    def test_dropped_columns_are_not_loaded(self):
+        """Columns dropped before any step reads them are excluded when replaying a file."""
+        self.assertEqual(self.pipeline.excluded_columns(), {'notes'})
+        pd.DataFrame({'a': [np.nan, 1.0], 'size': ['L', 'S'], 'n': [1, 2], 'notes': ['', '']}).to_csv(self.files[0], index=False)
+        os.makedirs(self.output_dir, exist_ok=True)
+        result = process_file(self.files[0], self.output_dir, pipeline=self.pipeline)
+        self.assertEqual(result['status'], 'ok')
+        output = pd.read_csv(result['output'])
+        self.assertEqual(list(output.columns), ['a', 'size', 'n'])
+        self.assertEqual(output['size'].tolist(), [2, 0])
+
+if __name__ == '__main__':
+    unittest.main()
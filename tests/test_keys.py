@@ -0,0 +1,61 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.keys import find_keys, generate_uids, has_repeats, is_unique
+from src.fitted_pipeline import FittedPipeline
+
+class TestKeys(unittest.TestCase):
+
+    def setUp(self):
+        """Create a frame with a shuffled id, a composite key and a few non-key columns."""
+        rng = np.random.default_rng(0)
+        n = 5000
+        self.df = pd.DataFrame({
+            'id': rng.permutation(n),
+            'order': np.repeat(np.arange(n // 5), 5),
+            'line': np.tile(np.arange(5), n // 5),
+            'city': pd.Series(rng.choice(['a', 'b', 'c'], n)),
+            'price': rng.normal(size=n),
+        })
+
+    def test_uniqueness(self):
+        """Sorted, shuffled, repeated and incomplete columns are told apart."""
+        self.assertTrue(is_unique(self.df['id']))
+        self.assertTrue(is_unique(pd.Series(['a', 'b', 'c'])))
+        self.assertFalse(is_unique(self.df['order']))
+        self.assertFalse(is_unique(pd.Series([3, 2, 2, 1])))
+        self.assertFalse(is_unique(pd.Series([1.0, np.nan, 2.0])))
+        late_repeat = pd.Series(np.append(np.arange(10_000), 5))
+        self.assertTrue(has_repeats(late_repeat))
+
+    def test_find_keys(self):
+        """Single keys come first and composite keys are minimal."""
+        keys = find_keys(self.df)
+        self.assertEqual(keys, [['id'], ['order', 'line']])
+        self.assertEqual(find_keys(self.df, ['order', 'line', 'city'], max_width=3), [['order', 'line']])
+
+    def test_uids_are_stable_across_chunks_and_files(self):
+        """Positional UIDs of chunks match those of the whole file; key UIDs only depend on the key."""
+        whole = generate_uids(self.df, source='data/a.csv')
+        chunks = np.concatenate([generate_uids(self.df.iloc[start:start + 1000], start, 'other/a.csv')
+                                 for start in range(0, len(self.df), 1000)])
+        np.testing.assert_array_equal(whole, chunks)
+        self.assertEqual(len(np.unique(whole)), len(self.df))
+        self.assertFalse(np.isin(generate_uids(self.df, source='b.csv'), whole).any())
+        by_key = generate_uids(self.df, key=['order', 'line'])
+        np.testing.assert_array_equal(generate_uids(self.df.iloc[::-1], key=['order', 'line'])[::-1], by_key)
+
+    def test_replay_uid_column(self):
+        """A recorded UID column is added again by the fitted pipeline."""
+        pipeline = FittedPipeline()
+        pipeline.record('add_uid', column='uid', key=None)
+        df = pipeline.transform(self.df.copy(), source='a.csv')
+        np.testing.assert_array_equal(df['uid'], generate_uids(self.df, source='a.csv'))
+        self.assertEqual(df.columns[0], 'uid')
+
+if __name__ == '__main__':
+    unittest.main()
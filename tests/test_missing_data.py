@@ -0,0 +1,146 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.missing_data import ApproximateImputer, Imputer, fill_columns, impute_missing_data
+from src.inplace import CopyLog, column_buffer
+from src.chained_imputer import ChainedImputer
+from src.fitted_pipeline import FittedPipeline
+
+class TestImputer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a frame with missing values in numeric and text columns."""
+        self.df = pd.DataFrame({
+            'a': [1.0, np.nan, 3.0, 10.0],
+            'b': [1, 2, 2, 5],
+            'c': [np.nan, 4.0, 4.0, 8.0],
+            'city': ['Paris', None, 'Rome', 'Rome'],
+        })
+
+    def test_fit_matches_column_statistics(self):
+        """Block statistics are the same as the per-column pandas statistics."""
+        imputer = Imputer('median', columns={'city': 'mode'}).fit(self.df)
+        self.assertEqual(imputer.statistics_, {'a': self.df['a'].median(), 'c': self.df['c'].median(), 'city': 'Rome'})
+        imputer.transform(self.df)
+        self.assertEqual(self.df.isnull().sum().sum(), 0)
+
+    def test_text_columns_are_skipped_by_mean(self):
+        """Mean imputation leaves text columns untouched."""
+        imputer = Imputer('mean')
+        imputer.fit_transform(self.df)
+        self.assertEqual(imputer.skipped_, ['city'])
+        self.assertEqual(self.df['city'].isnull().sum(), 1)
+
+    def test_mean_of_datetime_column(self):
+        """A datetime column with gaps is filled with its own mean next to the numeric columns."""
+        df = pd.DataFrame({'a': [1, np.nan, 3],
+                           'd': pd.to_datetime(['2020-01-01', None, '2020-01-03'])})
+        Imputer('mean').fit_transform(df)
+        self.assertEqual(df['a'].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(df['d'][1], pd.Timestamp('2020-01-02'))
+
+    def test_saved_statistics_apply_to_later_files(self):
+        """Statistics fitted on all columns fill a later file without being recomputed."""
+        filename = 'test_imputer.joblib'
+        Imputer('mean').fit(self.df, missing_only=False).save(filename)
+        later = pd.DataFrame({'a': [np.nan], 'b': [np.nan], 'c': [np.nan], 'city': ['Oslo']})
+        Imputer.load(filename).transform(later)
+        os.remove(filename)
+        self.assertEqual(later.iloc[0].tolist(), [self.df['a'].mean(), 2.5, self.df['c'].mean(), 'Oslo'])
+
+    def test_fill_columns(self):
+        """Per-column strategies, including dropping rows, are applied without prompts."""
+        skipped = fill_columns(self.df, {'a': {'custom': 0}, 'c': 'mode', 'city': 'drop_rows'})
+        self.assertEqual(skipped, [])
+        self.assertEqual(self.df['a'].tolist(), [1.0, 3.0, 10.0])
+        self.assertEqual(self.df['c'].tolist(), [4.0, 4.0, 8.0])
+
+    def test_fill_writes_in_place(self):
+        """Numeric fills are written into the columns' own arrays without copying them."""
+        buffer = column_buffer(self.df['a'])
+        log = CopyLog()
+        with log.track(self.df, 'mean'):
+            Imputer('mean').fit_transform(self.df)
+        self.assertEqual(log.total(), 0)
+        self.assertEqual(column_buffer(self.df['a']), buffer)
+        self.assertEqual(self.df[['a', 'c']].isnull().sum().sum(), 0)
+
+    def test_individual_methods_only_touch_their_column(self):
+        """Dropping rows or the column in the per-column menu leaves the other columns' gaps alone."""
+        impute_missing_data(self.df, 1, column='city')
+        self.assertEqual(len(self.df), 3)
+        self.assertTrue(self.df['c'].isnull().any())
+        impute_missing_data(self.df, 2, column='c')
+        self.assertEqual(list(self.df.columns), ['a', 'b', 'city'])
+
+    def test_recorded_fill_covers_columns_without_gaps(self):
+        """Only columns with gaps are fitted, unless a pipeline is recorded, whose fill then covers them all."""
+        df = self.df.drop(columns='city')
+        self.assertEqual(set(impute_missing_data(df.copy(), 4).statistics_), {'a', 'c'})
+        pipeline = FittedPipeline()
+        imputer = impute_missing_data(df, 4, pipeline=pipeline)
+        self.assertEqual(df['b'].tolist(), [1, 2, 2, 5])
+        self.assertEqual(imputer.spare_, ['b'])
+        pipeline.record('drop', columns=['b'])
+        self.assertEqual(pipeline.excluded_columns(), {'b'})
+        later = pd.DataFrame({'a': [np.nan], 'b': [np.nan], 'c': [1.0]})
+        imputer.transform(later)
+        self.assertEqual(later['b'][0], 2.5)
+
+class TestApproximateImputer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a large frame split in two parts, as if read by two workers."""
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'x': rng.exponential(size=200_000), 'city': rng.choice(['a', 'b', 'c'], 200_000, p=[0.2, 0.5, 0.3])})
+        self.df.loc[::10, 'x'] = np.nan
+        self.df.loc[::7, 'city'] = None
+
+    def test_merged_sketches_match_exact_statistics(self):
+        """Sketches fitted on separate parts and merged give the median and mode within the error bound."""
+        parts = [ApproximateImputer(strategy=None, columns={'x': 'median', 'city': 'mode'}, epsilon=0.005)
+                 .partial_fit(part) for part in (self.df.iloc[:80_000], self.df.iloc[80_000:])]
+        imputer = parts[0].merge(parts[1]).finalize()
+        x = self.df['x'].dropna()
+        self.assertLess(abs((x < imputer.statistics_['x']).mean() - 0.5), 0.01)
+        self.assertEqual(imputer.statistics_['city'], 'b')
+        df = imputer.transform(self.df.copy())
+        self.assertEqual(int(df.isnull().sum().sum()), 0)
+
+class TestChainedImputer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up linearly related columns with missing values in two of them."""
+        rng = np.random.default_rng(0)
+        n = 5000
+        x = rng.normal(size=n)
+        noise = rng.normal(size=n)
+        self.truth = pd.DataFrame({'x': x, 'y': 2 * x + 1, 'z': -x + 0.5 * noise, 'noise': noise})
+        self.df = self.truth.copy()
+        self.df.loc[rng.choice(n, 500, replace=False), 'y'] = np.nan
+        self.df.loc[rng.choice(n, 500, replace=False), 'z'] = np.nan
+        self.df.loc[rng.choice(n, 100, replace=False), 'x'] = np.nan
+
+    def test_fit_transform(self):
+        """Several incomplete columns are imputed together from their correlated predictors."""
+        imputer = ChainedImputer(n_predictors=2, max_fit_rows=2000, chunk_size=700)
+        imputer.fit_transform(self.df)
+        self.assertEqual(self.df.isnull().sum().sum(), 0)
+        self.assertEqual(imputer.order_, ['x', 'y', 'z'])
+        mask = self.truth['y'] != self.df['y']
+        self.assertLess(np.abs(self.df['y'] - self.truth['y'])[mask].mean(), 0.2)
+
+    def test_transform_reuses_fitted_models(self):
+        """A fitted imputer fills a later frame without refitting."""
+        imputer = ChainedImputer(columns=['y'])
+        imputer.fit_transform(self.truth.assign(y=self.df['y']))
+        later = pd.DataFrame({'x': [1.0, 2.0], 'y': [np.nan, np.nan], 'z': [-1.0, -2.0], 'noise': [0.0, 0.0]})
+        imputer.transform(later)
+        np.testing.assert_allclose(later['y'], [3.0, 5.0], atol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
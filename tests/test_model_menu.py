@@ -0,0 +1,37 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.model_menu import evaluate_model, compare_models, PARAM_GRIDS
+
+class TestModelMenu(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small classification problem."""
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(300, 2))
+        self.df = pd.DataFrame({'x1': x[:, 0], 'x2': x[:, 1], 'label': (x[:, 0] + x[:, 1] > 0).astype(int)})
+
+    def test_cross_validation_and_timing(self):
+        """The report holds one score per fold and the fit/predict timing."""
+        _, report = evaluate_model(self.df, 'decision_tree', 'label', ['x1', 'x2'], cv=3, n_jobs=2)
+        self.assertEqual(len(report['cv_scores']), 3)
+        self.assertGreater(report['fit_seconds'], 0)
+        self.assertGreater(report['peak_memory_mb'], 0)
+
+    def test_grid_search(self):
+        """The search picks parameters from the grid and refits the model with them."""
+        model, report = evaluate_model(self.df, 'decision_tree', 'label', ['x1', 'x2'], cv=3, search=True, n_jobs=2)
+        self.assertIn(report['params']['max_depth'], PARAM_GRIDS['decision_tree']['max_depth'])
+        self.assertEqual(model.get_params()['max_depth'], report['params']['max_depth'])
+
+    def test_compare_models(self):
+        """The comparison has one row per model."""
+        table = compare_models(self.df, 'label', ['x1', 'x2'], ['decision_tree', 'random_forest'], cv=3, n_jobs=2)
+        self.assertEqual(list(table.index), ['decision_tree', 'random_forest'])
+
+if __name__ == '__main__':
+    unittest.main()
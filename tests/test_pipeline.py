@@ -0,0 +1,88 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from src.pipeline import load_spec, plan_pipeline, run_pipeline
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        """Create an input file and a pipeline spec."""
+        self.input_file = 'test_pipeline_input.csv'
+        self.spec_file = 'test_pipeline_spec.json'
+        self.output_file = 'test_pipeline_input_out.csv'
+        pd.DataFrame({
+            'a': [1.0, np.nan, 3.0, 3.0],
+            'b': [10.0, 20.0, np.nan, np.nan],
+            'size': ['S', 'L', 'M', 'M'],
+            'notes': ['x', 'y', 'z', 'w'],
+        }).to_csv(self.input_file, index=False)
+        self.spec = {
+            'input': self.input_file,
+            'steps': [
+                {'op': 'impute', 'strategy': 'mean'},
+                {'op': 'impute', 'columns': {'b': {'custom': 0}}},
+                {'op': 'encode', 'column': 'size', 'order': ['S', 'M', 'L']},
+                {'op': 'drop', 'columns': ['notes']},
+                {'op': 'dedupe'},
+                {'op': 'dedupe'},
+                {'op': 'save', 'path': '{stem}_out.csv'},
+                {'op': 'optimize'},
+            ]
+        }
+        with open(self.spec_file, 'w') as f:
+            json.dump(self.spec, f)
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        for filename in (self.input_file, self.spec_file, self.output_file):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_plan_pipeline(self):
+        """Unused columns are not loaded, impute steps are fused and redundant steps are skipped."""
+        excluded, planned, notes = plan_pipeline(self.spec['steps'])
+        self.assertEqual(excluded, {'notes'})
+        self.assertEqual([step['op'] for step in planned], ['impute', 'encode', 'dedupe', 'save'])
+        self.assertEqual(len(planned[0]['layers']), 2)
+        self.assertEqual(len(notes), 4)
+
+    def test_drop_after_full_row_dependency_is_not_hoisted(self):
+        """A column read by an earlier dedupe on all columns is still loaded."""
+        steps = [{'op': 'dedupe'}, {'op': 'drop', 'columns': ['notes']}, {'op': 'save', 'path': 'x.csv'}]
+        excluded, planned, _ = plan_pipeline(steps)
+        self.assertEqual(excluded, set())
+        self.assertEqual([step['op'] for step in planned], ['dedupe', 'drop', 'save'])
+
+    def test_drop_after_regression_is_not_hoisted(self):
+        """A column that may predict a regression imputation is still loaded, whether fused or listed per column."""
+        for impute in ({'op': 'impute', 'strategy': 'regression'}, {'op': 'impute', 'columns': {'a': 'regression'}}):
+            steps = [{'op': 'impute', 'strategy': 'mean'}, impute, {'op': 'drop', 'columns': ['c']},
+                     {'op': 'save', 'path': 'x.csv'}]
+            excluded, planned, _ = plan_pipeline(steps)
+            self.assertEqual(excluded, set())
+            self.assertEqual([step['op'] for step in planned], ['impute', 'drop', 'save'])
+
+    def test_drop_of_encoding_target_is_not_hoisted(self):
+        """The target of a target encoding is still loaded when it is dropped afterwards."""
+        steps = [{'op': 'encode', 'column': 'size', 'target': 'a'}, {'op': 'drop', 'columns': ['a']},
+                 {'op': 'save', 'path': 'x.csv'}]
+        excluded, planned, _ = plan_pipeline(steps)
+        self.assertEqual(excluded, set())
+        self.assertEqual([step['op'] for step in planned], ['encode', 'drop', 'save'])
+
+    def test_run_pipeline(self):
+        """The spec runs end to end without prompts."""
+        run_pipeline(load_spec(self.spec_file))
+        result = pd.read_csv(self.output_file)
+        self.assertEqual(list(result.columns), ['a', 'b', 'size'])
+        np.testing.assert_allclose(result['a'], [1.0, 7 / 3, 3.0])
+        self.assertEqual(result['b'].tolist(), [10.0, 20.0, 15.0])
+        self.assertEqual(result['size'].tolist(), [0, 2, 1])
+
+if __name__ == '__main__':
+    unittest.main()
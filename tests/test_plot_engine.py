@@ -0,0 +1,48 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.plot_engine import BinCache, binned_kde, reservoir_sample, stratified_sample
+
+class TestPlotEngine(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a frame with two numeric columns and a rare group."""
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'x': rng.normal(size=10_000), 'y': rng.exponential(size=10_000),
+                                'group': np.where(np.arange(10_000) < 20, 'rare', 'common')})
+        self.df.loc[5, 'x'] = np.nan
+
+    def test_reservoir_sample(self):
+        """Sampling chunks gives the requested number of distinct rows."""
+        chunks = (self.df.iloc[i:i + 999] for i in range(0, len(self.df), 999))
+        sample = reservoir_sample(chunks, 500)
+        self.assertEqual(len(sample), 500)
+        self.assertTrue(sample.index.is_unique)
+
+    def test_stratified_sample_keeps_rare_groups(self):
+        """Every group is represented in proportion, with at least one row."""
+        sample = stratified_sample(self.df, 'group', 100)
+        self.assertEqual(sample['group'].value_counts().to_dict(), {'common': 100, 'rare': 1})
+
+    def test_cached_histograms_match_numpy(self):
+        """1D and 2D counts from the cached codes match NumPy's histograms."""
+        bins = BinCache(self.df, bins=20)
+        counts, edges = bins.histogram('x')
+        np.testing.assert_array_equal(counts, np.histogram(self.df['x'].dropna(), edges)[0])
+        counts, edges_x, edges_y = bins.histogram2d('x', 'y')
+        valid = self.df['x'].notnull()
+        expected = np.histogram2d(self.df['x'][valid], self.df['y'][valid], [edges_x, edges_y])[0]
+        np.testing.assert_array_equal(counts, expected)
+
+    def test_binned_kde_is_a_density(self):
+        """The binned KDE integrates to one."""
+        counts, edges = BinCache(self.df).histogram('y')
+        _, density = binned_kde(counts, edges)
+        self.assertAlmostEqual(density.sum() * (edges[1] - edges[0]), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.plot_export import export_plots, plot_payload
+
+class TestPlotExport(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a frame with numeric and text columns."""
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'a': rng.normal(size=500), 'b': rng.normal(size=500), 'c': ['x'] * 500})
+        self.output_dir = 'test_plots'
+
+    def tearDown(self):
+        """Remove the exported plots."""
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_export_and_skip_unchanged(self):
+        """All plots are rendered once and only the plots of a changed column are redrawn."""
+        rendered, skipped = export_plots(self.df, self.output_dir, workers=2)
+        self.assertEqual((rendered, skipped), (6, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'scatter_a_b.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'index.html')))
+        self.df['b'] = self.df['b'] * 2
+        rendered, skipped = export_plots(self.df, self.output_dir, workers=2)
+        self.assertEqual((rendered, skipped), (4, 2))
+
+    def test_payloads_are_built_lazily(self):
+        """With one payload per worker, each figure's data is only built once the previous figure is drawn."""
+        drawn_before = []
+
+        def payload(*args):
+            drawn_before.append(len([name for name in os.listdir(self.output_dir) if name.endswith('.png')]))
+            return plot_payload(*args)
+        with mock.patch('src.plot_export.plot_payload', side_effect=payload), \
+                mock.patch('src.plot_export.PAYLOADS_PER_WORKER', 1):
+            export_plots(self.df, self.output_dir, workers=1, report=False)
+        self.assertEqual(drawn_before, list(range(6)))
+
+if __name__ == '__main__':
+    unittest.main()
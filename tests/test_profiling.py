@@ -0,0 +1,71 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from src.profiling import profile_frame, profile_file
+from src.sketches import CountMinSketch, HyperLogLog, KLLSketch, TopK, value_hashes
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a frame with missing values, a skewed text column and duplicate rows."""
+        rng = np.random.default_rng(0)
+        n = 20_000
+        self.df = pd.DataFrame({'id': np.arange(n), 'x': rng.normal(size=n),
+                                'city': rng.choice(['a', 'b', 'c'], n, p=[0.7, 0.2, 0.1])})
+        self.df.loc[:99, 'x'] = np.nan
+        self.df = pd.concat([self.df, self.df.iloc[:50]], ignore_index=True)
+        self.files = ['test_profile.csv', 'test_profile.json']
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        for filename in self.files:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_sketches(self):
+        """Distinct counts, quantiles and frequent values are within their error bounds after merging."""
+        values = np.random.default_rng(1).normal(size=100_000)
+        halves = [pd.Series(values[:50_000]), pd.Series(values[50_000:])]
+        hll = HyperLogLog().add(value_hashes(halves[0])).merge(HyperLogLog().add(value_hashes(halves[1])))
+        self.assertAlmostEqual(hll.estimate() / len(values), 1, delta=4 * hll.relative_error)
+        kll = KLLSketch().update(halves[0].to_numpy()).merge(KLLSketch().update(halves[1].to_numpy()))
+        np.testing.assert_allclose(kll.quantiles([0.1, 0.5, 0.9]), np.quantile(values, [0.1, 0.5, 0.9]), atol=0.05)
+        top = TopK(2).update(self.df['city'])
+        self.assertEqual(top.top(1)[0][0], 'a')
+        counts = CountMinSketch(epsilon=0.01).add(value_hashes(self.df['city']))
+        estimates = counts.estimate(value_hashes(pd.Series(['a', 'b', 'c'])))
+        exact = self.df['city'].value_counts()[['a', 'b', 'c']].to_numpy()
+        self.assertTrue(np.all(estimates >= exact) and np.all(estimates <= exact + 0.01 * len(self.df)))
+
+    def test_profile_frame(self):
+        """Null counts and duplicates are exact, and chunked profiling gives the same counts."""
+        profile = profile_frame(self.df)
+        chunked = profile_frame(self.df, chunksize=3000)
+        for result in (profile, chunked):
+            self.assertEqual(result.rows, len(self.df))
+            self.assertEqual(result.duplicate_rows, 50)
+            self.assertEqual(result.missing_columns(), ['x'])
+            self.assertEqual(result.null_count(), 150)
+        summary = chunked.to_dict()['columns']
+        self.assertEqual(summary['id']['max'], 19_999)
+        self.assertAlmostEqual(summary['x']['50%'], self.df['x'].median(), delta=0.05)
+        self.assertTrue(profile_frame(self.df.iloc[:20_000]).may_be_unique('id'))
+        self.assertFalse(profile.may_be_unique('city'))
+
+    def test_profile_file_saved_as_json(self):
+        """A file is profiled chunk by chunk and the profile is saved as JSON."""
+        self.df.to_csv(self.files[0], index=False)
+        profile_file(self.files[0], chunksize=5000).save(self.files[1])
+        with open(self.files[1]) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['rows'], len(self.df))
+        self.assertEqual(saved['columns']['city']['distinct'], 3)
+        self.assertEqual(saved['columns']['city']['top'][0][0], 'a')
+
+if __name__ == '__main__':
+    unittest.main()
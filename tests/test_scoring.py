@@ -0,0 +1,49 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from src.scoring import ModelBundle, score_file
+from src.fitted_pipeline import FittedPipeline
+from src.missing_data import Imputer
+
+class TestScoring(unittest.TestCase):
+
+    def setUp(self):
+        """Save a linear model trained after a mean imputation."""
+        train = pd.DataFrame({'x': [1.0, 2.0, np.nan, 4.0], 'z': [0.0, 1.0, 0.0, 1.0]})
+        pipeline = FittedPipeline()
+        pipeline.record("fill", imputer=Imputer('mean', columns={'z': None}).fit(train))
+        pipeline.transform(train)
+        model = LinearRegression().fit(train[['x']], 2 * train['x'])
+        self.files = ['test_model.joblib', 'test_score.parquet', 'test_score_predictions.parquet']
+        ModelBundle(model, ['x'], 'y', pipeline).save(self.files[0])
+        pd.DataFrame({'x': [np.nan, 5.0, 6.0, 1.0], 'z': [1.0, np.nan, 0.0, 0.0]}).to_parquet(self.files[1], index=False)
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        for filename in self.files:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_score_file_in_chunks(self):
+        """Every row is preprocessed with the saved fill values and scored, chunk by chunk."""
+        rows = score_file(self.files[0], self.files[1], self.files[2], chunksize=3)
+        self.assertEqual(rows, 4)
+        scored = pd.read_parquet(self.files[2])
+        np.testing.assert_allclose(scored['prediction'], [2 * 7 / 3, 10.0, 12.0, 2.0])
+        self.assertTrue(np.isnan(scored['z'][1]))
+
+    def test_missing_features_get_missing_predictions(self):
+        """Rows with a missing feature are kept with a missing prediction."""
+        bundle = ModelBundle.load(self.files[0])
+        bundle.pipeline = None
+        df = bundle.predict(pd.DataFrame({'x': [np.nan, 3.0]}))
+        self.assertTrue(np.isnan(df['prediction'][0]))
+        self.assertAlmostEqual(df['prediction'][1], 6.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.snapshots import SnapshotCache
+from src.fitted_pipeline import FittedPipeline
+from src.pipeline import run_pipeline
+
+class TestSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        """Create a snapshot directory and an input file."""
+        self.directory = tempfile.mkdtemp()
+        self.cache = SnapshotCache(os.path.join(self.directory, 'snapshots'))
+        self.input_file = os.path.join(self.directory, 'input.csv')
+        pd.DataFrame({'a': [1.0, np.nan, 3.0, 3.0], 'size': ['S', 'L', 'M', 'M']}).to_csv(self.input_file, index=False)
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """Every kind of column comes back unchanged, NumPy columns memory-mapped and writable."""
+        df = pd.DataFrame({
+            'num': np.arange(6, dtype=float),
+            'text': pd.Series(['x', None, 'y', 'x', 'z', 'y']),
+            'cat': pd.Categorical(['u', 'v'] * 3),
+            'mixed': pd.Series([1, 'a', 2.0, None, 'b', 3], dtype=object),
+            'nullable': pd.array([1, None, 3, 4, 5, 6], dtype='Int64'),
+        }).iloc[::2]
+        pipeline = FittedPipeline()
+        pipeline.record('dedupe', subset=None)
+        self.assertTrue(self.cache.save('key', df, pipeline))
+        loaded, state = self.cache.load('key')
+        pd.testing.assert_frame_equal(loaded, df)
+        self.assertEqual(state.steps, pipeline.steps)
+        self.assertIsInstance(loaded['num'].values.base, np.memmap)
+        loaded.iloc[0, 0] = 100.0
+        self.assertEqual(self.cache.load('key')[0].iloc[0, 0], 0.0)
+
+    def test_keys_follow_content_and_steps(self):
+        """The key depends on the file content and the operations, not on the file's path or age."""
+        steps = [{'op': 'dedupe', 'subset': None}]
+        key = self.cache.key([self.input_file], steps)
+        copy = os.path.join(self.directory, 'copy.csv')
+        shutil.copy(self.input_file, copy)
+        self.assertEqual(self.cache.key([copy], steps), key)
+        self.assertNotEqual(self.cache.key([self.input_file], steps + steps), key)
+        with open(copy, 'a') as f:
+            f.write('4.0,S\n')
+        self.assertNotEqual(self.cache.key([copy], steps), key)
+
+    def test_pipeline_resumes_from_snapshots(self):
+        """A second run of the same spec loads the last snapshot instead of the input file."""
+        output = os.path.join(self.directory, 'out.csv')
+        spec = {'input': self.input_file, 'steps': [
+            {'op': 'impute', 'strategy': 'mean'},
+            {'op': 'encode', 'column': 'size', 'order': ['S', 'M', 'L']},
+            {'op': 'dedupe'},
+            {'op': 'save', 'path': output},
+        ]}
+        run_pipeline(spec, snapshots=self.cache)
+        expected = pd.read_csv(output)
+        os.remove(output)
+        with mock.patch('src.pipeline.read_data', side_effect=AssertionError('input file read')):
+            run_pipeline(spec, snapshots=self.cache)
+        pd.testing.assert_frame_equal(pd.read_csv(output), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import subprocess
+import unittest
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'sklearn', 'scipy')
+STARTUP_BUDGET = 1.5
+
+def import_times(module):
+    """Import a module in a fresh interpreter with -X importtime and return the cumulative seconds per module."""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], env=env,
+                            capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+class TestStartup(unittest.TestCase):
+
+    def test_main_does_not_import_heavy_modules(self):
+        """Starting the script does not import plotting or model training libraries."""
+        times = import_times('main')
+        self.assertEqual([name for name in times if name.split('.')[0] in HEAVY_MODULES], [])
+
+    def test_startup_time(self):
+        """Importing the script stays within the startup budget (slowest imports are listed on failure)."""
+        times = import_times('main')
+        slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+        report = '\n'.join(f'{seconds:8.3f}s  {name}' for name, seconds in slowest)
+        self.assertLess(times['main'], STARTUP_BUDGET, f'Slowest imports:\n{report}')
+
+if __name__ == '__main__':
+    unittest.main()
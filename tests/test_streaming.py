@@ -0,0 +1,79 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from src.streaming import scan_chunks, compute_fill_values, count_values, process_chunks, stream_file
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        """Create a CSV file with missing values and duplicates."""
+        self.test_file = 'test_stream.csv'
+        self.output_file = 'test_stream_out.csv'
+        self.test_data = pd.DataFrame({
+            'a': [1.0, np.nan, 3.0, 4.0, 1.0, 10.0, np.nan],
+            'b': ['x', 'y', None, 'y', 'x', 'z', 'y'],
+        })
+        self.test_data.to_csv(self.test_file, index=False)
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        for filename in (self.test_file, self.output_file):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_scan_chunks(self):
+        """Chunked statistics match the statistics of the whole frame."""
+        stats = scan_chunks(self.test_file, chunksize=2)
+        self.assertEqual(stats['rows'], len(self.test_data))
+        pd.testing.assert_series_equal(stats['null_counts'], self.test_data.isnull().sum())
+        self.assertAlmostEqual(stats['sums']['a'] / stats['counts']['a'], self.test_data['a'].mean())
+
+    def test_fill_values_match_in_memory_statistics(self):
+        """Median and mode computed from merged chunk counts are exact."""
+        stats = scan_chunks(self.test_file, chunksize=3)
+        median = compute_fill_values(self.test_file, 3, stats, 5)
+        mode = compute_fill_values(self.test_file, 3, stats, 6)
+        self.assertEqual(median, {'a': self.test_data['a'].median()})
+        self.assertEqual(mode['a'], self.test_data['a'].mode()[0])
+        self.assertEqual(mode['b'], self.test_data['b'].mode()[0])
+
+    def test_high_cardinality_columns_are_sketched(self):
+        """Columns with more distinct values than the count limit get an estimated median instead."""
+        value_counts, overflow = count_values(self.test_file, 3, ['a', 'b'], max_values=3)
+        self.assertEqual((list(value_counts), overflow), (['b'], ['a']))
+        stats = scan_chunks(self.test_file, chunksize=3)
+        with patch('src.streaming.MAX_COUNTED_VALUES', 2):
+            median = compute_fill_values(self.test_file, 3, stats, 5)
+        self.assertAlmostEqual(median['a'], self.test_data['a'].median(), delta=1.0)
+
+    def test_duplicates_removed_across_chunks(self):
+        """Rows duplicated in different chunks are removed."""
+        chunks = process_chunks(self.test_file, 2, fill_values={'a': 0.0, 'b': 'y'}, remove_duplicates=True)
+        result = pd.concat(chunks, ignore_index=True)
+        expected = self.test_data.fillna({'a': 0.0, 'b': 'y'}).drop_duplicates().reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_duplicates_found_across_chunk_dtypes(self):
+        """A chunk read as floats (because of a gap) still matches the rows of an int chunk."""
+        with open(self.test_file, 'w') as f:
+            f.write('a,b\n1,x\n2,y\n1,x\n,w\n')
+        chunks = list(process_chunks(self.test_file, 2, fill_values={'a': 5.0}, remove_duplicates=True))
+        result = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(result['a'].tolist(), [1, 2, 5])
+        self.assertEqual(result['b'].tolist(), ['x', 'y', 'w'])
+
+    def test_stream_file(self):
+        """Streaming mean imputation writes the same result as the in-memory pipeline."""
+        with patch('builtins.input', side_effect=['4', 'n']):
+            stream_file(self.test_file, 2, self.output_file)
+        result = pd.read_csv(self.output_file)
+        self.assertEqual(result['a'].isnull().sum(), 0)
+        self.assertAlmostEqual(result['a'][1], self.test_data['a'].mean())
+
+if __name__ == '__main__':
+    unittest.main()